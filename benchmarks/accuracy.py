@@ -0,0 +1,299 @@
+#!/usr/local/bin/python
+# UTF-8
+'''
+Evaluates the models against the reference data bundled in the package,
+reports the maximum and mean relative error of each author, and checks
+that these errors have not drifted from those in a baseline.
+
+    python benchmarks/accuracy.py [--baseline accuracy_baseline.json]
+                                  [--tolerance 1e-6] [--update]
+
+The errors are compared to the baseline, rather than to a fixed limit,
+as some authors do not agree closely with the reference data. A change
+that is meant to give the same values, such as a faster path, should
+leave the errors unchanged. The script exits with a non zero status if
+any error has changed by more than the tolerance, an author in the
+baseline could not be evaluated, or a check fails that did not fail for
+the baseline. --update writes the current errors as the baseline.
+
+The baseline records the commit of the package it was made from, and
+the checks that failed for it, which are skipped. The bundled baseline
+was made from the first commit of the repository, with
+
+    git worktree add /tmp/baseline $(git rev-list --max-parents=0 HEAD)
+    PYTHONPATH=/tmp/baseline/src python benchmarks/accuracy.py --update
+'''
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import warnings
+
+import numpy as np
+
+import semiconductor
+from semiconductor.electrical.ionisation import Ionisation
+from semiconductor.electrical.mobility import Mobility
+from semiconductor.material.bandgap_intrinsic import IntrinsicBandGap
+from semiconductor.material.bandgap_narrowing import BandGapNarrowing
+from semiconductor.material.intrinsic_carrier_density import (
+    IntrinsicCarrierDensity)
+
+
+baseline_file = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), 'accuracy_baseline.json')
+
+
+def _data(*path):
+    '''
+    returns the address of a file bundled in the package
+    '''
+    return os.path.join(os.path.dirname(semiconductor.__file__), *path)
+
+
+# Each check yields the name of the reference data, the author, and the
+# calculated and reference values.
+
+def intrinsic_carrier_density():
+    model = IntrinsicCarrierDensity()
+    data = np.genfromtxt(
+        _data('material', 'Si', 'check data', 'ni.csv'), delimiter=',',
+        names=True, skip_header=1, filling_values=np.nan)
+
+    # each column is measured data for the authors starting with its name
+    for name in data.dtype.names[1:]:
+        index = ~np.isnan(data[name])
+        for author in model.available_models():
+            if author.startswith(name):
+                yield ('ni.csv ' + name, author,
+                       model.update(temp=data['Temp'][index], author=author),
+                       data[name][index])
+
+
+def intrinsic_bandgap():
+    model = IntrinsicBandGap()
+    data = np.genfromtxt(
+        _data('material', 'Si', 'check data', 'iBg.csv'), delimiter=',',
+        names=True, skip_header=1)
+
+    yield ('iBg.csv', 'Passler2002',
+           model.update(temp=data['temp'], author='Passler2002',
+                        multiplier=1.),
+           data['Passler'])
+
+
+def bandgap_narrowing():
+    model = BandGapNarrowing()
+    data = np.genfromtxt(
+        _data('material', 'Si', 'check data', 'BGN_Schenk_asN-dn-1e14.csv'),
+        delimiter=',', names=True, skip_header=1)
+
+    for temp in data.dtype.names[1:]:
+        yield ('BGN_Schenk_asN-dn-1e14.csv {0} K'.format(temp),
+               'Schenk_1988fer',
+               model.update(Na=data['N'], Nd=0, nxc=1e14, temp=float(temp),
+                            author='Schenk_1988fer'),
+               data[temp])
+
+
+def ionisation():
+    model = Ionisation()
+    donors = np.genfromtxt(
+        _data('electrical', 'Si', 'check data', 'donors.csv'),
+        delimiter=',', names=True)
+    boron = np.genfromtxt(
+        _data('electrical', 'Si', 'check data', 'Boron.csv'),
+        delimiter=',')
+
+    for name, impurity, N, fraction in [
+            ('donors.csv P', 'phosphorous', donors['Imp_P'], donors['P']),
+            ('donors.csv As', 'arsenic', donors['Imp_As'], donors['As']),
+            ('Boron.csv', 'boron', boron[:, 0], boron[:, 1])]:
+        index = ~np.isnan(N)
+        for author in ['Altermatt_2006_table1', 'Altermatt_2006_table3']:
+            yield (name, author,
+                   model.update_dopant_ionisation(
+                       N[index], 1e10, impurity, author=author) / N[index],
+                   fraction[index])
+
+
+def mobility():
+    model = Mobility()
+    folder = ('electrical', 'Si', 'test_mobility_files')
+
+    # the file, the authors, and the conditions of the data
+    files = [
+        ('Klassen_1e14_dopants.dat', ['Klaassen_1992', 'Schindler_2014'],
+         dict(Na=0, Nd=1e14, temp=300.)),
+        ('Klassen_1e14_temp-450.dat', ['Klaassen_1992', 'Schindler_2014'],
+         dict(Na=0, Nd=1e14, temp=450.)),
+        ('Klassen_1e14_carriers.dat', ['Klaassen_1992', 'Schindler_2014'],
+         dict(Nd=0, nxc=1e14, temp=300.)),
+        ('dorkel_1e14_carriers.dat', ['Dorkel_1981'],
+         dict(Na=0, Nd=1e14, temp=300.)),
+        ('dorkel_1e14_temp-450.dat', ['Dorkel_1981'],
+         dict(Na=0, Nd=1e14, temp=450.)),
+    ]
+
+    for fname, authors, kwargs in files:
+        data = np.genfromtxt(_data(*folder + (fname,)), names=True)
+        if 'deltan' in data.dtype.names:
+            kwargs = dict(kwargs, nxc=data['deltan'])
+        else:
+            kwargs = dict(kwargs, Na=data['Ndop'])
+
+        for author in authors:
+            model.change_model(author)
+            yield (fname + ' electron', author,
+                   model.electron_mobility(**kwargs), data['ue'])
+            yield (fname + ' hole', author,
+                   model.hole_mobility(**kwargs), data['uh'])
+
+
+checks = [
+    intrinsic_carrier_density,
+    intrinsic_bandgap,
+    bandgap_narrowing,
+    ionisation,
+    mobility,
+]
+
+
+@contextlib.contextmanager
+def _quiet():
+    '''
+    hides the warnings the models print
+    '''
+    with warnings.catch_warnings(), \
+            contextlib.redirect_stdout(io.StringIO()):
+        warnings.simplefilter('ignore')
+        yield
+
+
+def relative_error(calculated, reference):
+    '''
+    returns the maximum and mean relative error
+    '''
+    error = np.abs(np.asarray(calculated, dtype=float) - reference) / \
+        np.abs(reference)
+    return {'max': float(np.max(error)), 'mean': float(np.mean(error))}
+
+
+def evaluate():
+    '''
+    returns the relative errors, for each reference data and author, and
+    the errors raised by any check
+    '''
+    errors = {}
+    failed = {}
+    for check in checks:
+        try:
+            with _quiet():
+                for name, author, calculated, reference in check():
+                    errors.setdefault(name, {})[author] = relative_error(
+                        calculated, reference)
+        except Exception as error:
+            failed[check.__name__] = '{0}: {1}'.format(
+                type(error).__name__, error)
+
+    return errors, failed
+
+
+def commit():
+    '''
+    returns the git commit of the package that is evaluated, if known
+    '''
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL,
+            cwd=os.path.dirname(semiconductor.__file__),
+            universal_newlines=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def drift(errors, baseline, tolerance):
+    '''
+    returns a list of the errors that differ from the baseline by more
+    than the tolerance, or are missing
+    '''
+    drifted = []
+    for name, authors in sorted(baseline.items()):
+        for author, expected in sorted(authors.items()):
+            found = errors.get(name, {}).get(author)
+            if found is None:
+                drifted.append('{0}, {1}: not evaluated'.format(name, author))
+                continue
+            for stat in ('max', 'mean'):
+                if abs(found[stat] - expected[stat]) > tolerance:
+                    drifted.append(
+                        '{0}, {1}: {2} error {3:.6e} was {4:.6e}'.format(
+                            name, author, stat, found[stat], expected[stat]))
+    return drifted
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description='Checks the models against the bundled reference data')
+    parser.add_argument('--baseline', default=baseline_file,
+                        help='the JSON file of the expected errors')
+    parser.add_argument('--tolerance', type=float, default=1e-6,
+                        help='the largest allowed change of an error')
+    parser.add_argument('--update', action='store_true',
+                        help='write the current errors as the baseline')
+    args = parser.parse_args(args)
+
+    errors, failed = evaluate()
+
+    print('{0:44s}{1:32s}{2:>10s}{3:>10s}'.format(
+        'reference data', 'author', 'max', 'mean'))
+    for name, authors in sorted(errors.items()):
+        for author, error in sorted(authors.items()):
+            print('{0:44s}{1:32s}{2:10.2e}{3:10.2e}'.format(
+                name, author, error['max'], error['mean']))
+
+    for check, error in sorted(failed.items()):
+        print('{0} failed with {1}'.format(check, error))
+
+    if args.update:
+        with open(args.baseline, 'w') as f:
+            json.dump({'commit': commit(), 'skipped': failed,
+                       'errors': errors}, f, indent=2, sort_keys=True)
+        print('\nWrote the baseline to {0}'.format(args.baseline))
+        return 0
+
+    if not os.path.isfile(args.baseline):
+        print('\nNo baseline found at {0}, run with --update to '
+              'create it'.format(args.baseline))
+        return 1
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    print('\nThe baseline is from commit {0}'.format(baseline['commit']))
+    for check, error in sorted(baseline['skipped'].items()):
+        print('  {0} is skipped, it failed for the baseline with {1}'.format(
+            check, error))
+
+    drifted = drift(errors, baseline['errors'], args.tolerance)
+    drifted += ['{0} failed with {1}'.format(check, error)
+                for check, error in sorted(failed.items())
+                if check not in baseline['skipped']]
+
+    if drifted:
+        print('\nThe errors have changed by more than {0:.0e}, or a check '
+              'failed:'.format(args.tolerance))
+        for i in drifted:
+            print('  ' + i)
+        return 1
+
+    print('\nAll errors are within {0:.0e} of the baseline'.format(
+        args.tolerance))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
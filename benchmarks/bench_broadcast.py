@@ -0,0 +1,106 @@
+#!/usr/local/bin/python
+# UTF-8
+'''
+Compares evaluating the mobility and SRH lifetime on a temperature,
+doping and excess carrier grid with nested loops against a single call
+with broadcast inputs. The broadcast mobility is also evaluated from a
+precomputed mobility table, for each of the public mobility methods.
+
+    python benchmarks/bench_broadcast.py [temperatures] [dopings] [nxc]
+'''
+
+import sys
+import timeit
+
+import numpy as np
+
+from semiconductor.electrical.mobility import Mobility
+from semiconductor.recombination.extrinsic import SRH
+
+
+def looped(temp, Na, nxc):
+    '''
+    the values as previously calculated, one temperature and doping at
+    a time
+    '''
+    mob = np.zeros((temp.size, Na.size, nxc.size))
+    tau = np.zeros((temp.size, Na.size, nxc.size))
+    for i, T in enumerate(temp):
+        for j, N in enumerate(Na):
+            mob[i, j] = Mobility(temp=T).hole_mobility(
+                Na=N, Nd=0, nxc=nxc, temp=T)
+            tau[i, j] = SRH(defect='Fei_d', temp=T, Na=N, nxc=nxc).tau()
+    return mob, tau
+
+
+def broadcast(temp, Na, nxc):
+    '''
+    the values from one call of each model
+    '''
+    temp = temp[:, None, None]
+    Na = Na[None, :, None]
+    nxc = nxc[None, None, :]
+    mob = Mobility(temp=temp).hole_mobility(Na=Na, Nd=0, nxc=nxc, temp=temp)
+    tau = SRH(defect='Fei_d', temp=temp, Na=Na, nxc=nxc).tau()
+    return mob, tau
+
+
+def tabulated(model, temp, Na, nxc):
+    '''
+    the values of each public mobility method from one call with the
+    table of the model
+    '''
+    kwargs = dict(temp=temp[:, None, None], Na=Na[None, :, None], Nd=0,
+                  nxc=nxc[None, None, :])
+    values = [model.electron_mobility(**kwargs),
+              model.hole_mobility(**kwargs),
+              model.mobility_sum(**kwargs),
+              model.ambipolar(**kwargs)]
+    return values + list(model.both(**kwargs))
+
+
+def main(temps=10, dopings=10, points=100):
+    temp = np.linspace(250, 400, temps)
+    Na = np.logspace(14, 19, dopings)
+    nxc = np.logspace(10, 17, points)
+
+    print('Grid of {0} temperatures x {1} dopings x {2} nxc'.format(
+        temps, dopings, points))
+
+    mob0, tau0 = looped(temp, Na, nxc)
+    mob1, tau1 = broadcast(temp, Na, nxc)
+    assert mob1.shape == mob0.shape and tau1.shape == tau0.shape
+
+    t0 = min(timeit.repeat(lambda: looped(temp, Na, nxc),
+                           number=1, repeat=3))
+    t1 = min(timeit.repeat(lambda: broadcast(temp, Na, nxc),
+                           number=1, repeat=3))
+
+    print('  loops:      {0:8.3f} s'.format(t0))
+    print('  broadcast:  {0:8.3f} s'.format(t1))
+    print('  speed up:   {0:8.1f} x'.format(t0 / t1))
+    print('  max relative difference {0:.1e}'.format(max(
+        np.nanmax(np.abs(mob1 - mob0) / mob0),
+        np.nanmax(np.abs(tau1 - tau0) / tau0))))
+
+    # the same grid from a table of the mobility at each temperature
+    analytic = tabulated(Mobility(temp=temp), temp, Na, nxc)
+    model = Mobility(temp=temp)
+    model.use_table(save=False).build()
+    table = tabulated(model, temp, Na, nxc)
+    assert all(a.shape == b.shape == mob0.shape
+               for a, b in zip(analytic, table))
+
+    model_analytic = Mobility(temp=temp)
+    t2 = min(timeit.repeat(lambda: tabulated(model_analytic, temp, Na, nxc),
+                           number=1, repeat=3))
+    t3 = min(timeit.repeat(lambda: tabulated(model, temp, Na, nxc),
+                           number=1, repeat=3))
+    print('  all mobility methods, model: {0:8.3f} s'.format(t2))
+    print('  all mobility methods, table: {0:8.3f} s, max relative '
+          'difference {1:.1e}'.format(t3, max(
+              np.nanmax(np.abs(b - a) / a) for a, b in zip(analytic, table))))
+
+
+if __name__ == '__main__':
+    main(*[int(float(i)) for i in sys.argv[1:]])
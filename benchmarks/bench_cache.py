@@ -0,0 +1,76 @@
+#!/usr/local/bin/python
+# UTF-8
+'''
+Times repeated update calls with the same inputs, with and without the
+result cache of the models enabled, and checks that changing the values
+of a defect with SRH.usr_vals removes its cached lifetimes.
+
+    python benchmarks/bench_cache.py [number of calls]
+'''
+
+import sys
+import timeit
+
+import numpy as np
+
+from semiconductor.helper.helper import BaseModelClass
+from semiconductor.material import BandGapNarrowing
+from semiconductor.material import IntrinsicCarrierDensity
+from semiconductor.material import ThermalVelocity
+from semiconductor.recombination.extrinsic import SRH
+
+
+def calls():
+    N = np.logspace(14, 20, 1000)
+    return [
+        (BandGapNarrowing(), 'update', dict(Na=N, Nd=0, nxc=1e14, temp=300.)),
+        (IntrinsicCarrierDensity(), 'update', dict(temp=300.)),
+        (ThermalVelocity(), 'update', dict(temp=300.)),
+        (SRH(defect='Fei_d', Nt=1e12), 'tau',
+         dict(Na=1e16, nxc=np.logspace(10, 17, 1000))),
+    ]
+
+
+def check_usr_vals():
+    '''
+    checks that the lifetimes cached for a defect are removed when its
+    values are changed, and that the new values are used
+    '''
+    cache = BaseModelClass.enable_cache()
+    model = SRH(defect='Fei_d', Nt=1e12)
+    nxc = np.logspace(10, 17, 100)
+
+    before = model.tau(nxc=nxc)
+    assert cache.size('SRH') == 1
+
+    model.usr_vals(Et=0.3)
+    assert cache.size('SRH') == 0, 'usr_vals did not remove the results'
+    assert not np.allclose(model.tau(nxc=nxc), before), \
+        'the cached lifetime was used after usr_vals'
+
+    print('SRH.usr_vals removes the cached lifetimes of the defect')
+    BaseModelClass.disable_cache()
+
+
+def main(number=200):
+    for model, method, kwargs in calls():
+        func = getattr(model, method)
+
+        BaseModelClass.disable_cache()
+        t_ref = timeit.timeit(lambda: func(**kwargs), number=number)
+
+        BaseModelClass.enable_cache()
+        t_new = timeit.timeit(lambda: func(**kwargs), number=number)
+
+        print('{0}, {1} calls'.format(type(model).__name__, number))
+        print('  no cache: {0:8.4f} s'.format(t_ref))
+        print('  cache:    {0:8.4f} s {1}'.format(
+            t_new, type(model).cache_stats()))
+
+    BaseModelClass.disable_cache()
+
+    check_usr_vals()
+
+
+if __name__ == '__main__':
+    main(*[int(float(i)) for i in sys.argv[1:]])
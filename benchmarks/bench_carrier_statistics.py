@@ -0,0 +1,106 @@
+#!/usr/local/bin/python
+# UTF-8
+'''
+Compares CarrierStatistics, which solves the carriers, ionisation and
+effective intrinsic carrier density together, against chaining the
+band gap narrowing, ionisation and carrier functions by hand, and for
+compensated material against Ionisation.charge_neutrality, which does not
+include band gap narrowing.
+
+BandGapNarrowing calculates its own carriers from nxc, so the chain can
+not be made consistent when the band gap narrowing depends on the
+carriers, as for Schenk's model. For the models that only depend on the
+doping, the chain and CarrierStatistics give the same values. Both use
+the default tolerance of Ionisation.update_dopant_ionisation, and the
+speed up is the time of the chain over that of CarrierStatistics.
+
+    python benchmarks/bench_carrier_statistics.py [number of points]
+'''
+
+import sys
+import timeit
+
+import numpy as np
+
+from semiconductor.electrical.carrier_statistics import CarrierStatistics
+from semiconductor.electrical.ionisation import Ionisation
+from semiconductor.material.bandgap_narrowing import BandGapNarrowing
+from semiconductor.material.intrinsic_carrier_density import (
+    IntrinsicCarrierDensity)
+from semiconductor.general_functions.carrierfunctions import get_carriers
+
+
+def chained(Na, nxc, BGN_author):
+    '''
+    the carriers as calculated by chaining the models by hand
+    '''
+    ni = IntrinsicCarrierDensity().update()
+    nieff = BandGapNarrowing(author=BGN_author).ni_eff(
+        ni, Na=Na, Nd=0, nxc=nxc)
+    Na_i = Ionisation().update_dopant_ionisation(Na, nxc, 'boron')
+    ne, nh = get_carriers(Na_i, 0, nxc, ni=nieff)
+    return ne, nh, Na_i, nieff
+
+
+def interleaved(first, second, repeat=50):
+    '''
+    the median times of two functions, timed in turns that alternate
+    which goes first, so that both see the same load
+    '''
+    times = np.zeros((repeat, 2))
+    for j in range(repeat):
+        for i in (0, 1)[::(-1)**j]:
+            times[j, i] = timeit.timeit((first, second)[i], number=1)
+    return np.median(times, axis=0)
+
+
+def main(points=10**5):
+    Na = np.logspace(14, 20, points)
+    nxc = 1e14
+
+    for author in ['None', 'Yan_2014fer', 'Schenk_1988fer']:
+        model = CarrierStatistics(BGN_author=author)
+        ne, nh, Na_i, Nd_i, nieff = model.calculate(Na=Na, Nd=0, nxc=nxc)
+
+        t0, t1 = interleaved(
+            lambda: chained(Na, nxc, author),
+            lambda: model.calculate(Na=Na, Nd=0, nxc=nxc))
+
+        print('{0}, {1} points, {2} iterations'.format(
+            author, points, model.iterations))
+        print('  chained by hand:    {0:8.4f} s'.format(t0))
+        print('  CarrierStatistics:  {0:8.4f} s'.format(t1))
+        print('  speed up:           {0:8.2f}'.format(t0 / t1))
+
+        # how far the chained values are from consistent
+        for name, a, b in zip(['ne', 'nh', 'Na_i', 'nieff'],
+                              chained(Na, nxc, author),
+                              (ne, nh, Na_i, nieff)):
+            print('  max relative difference of {0:6s}{1:9.1e}'.format(
+                name, np.max(np.abs(a / b - 1))))
+
+    # compensated material, without band gap narrowing
+    model = CarrierStatistics(BGN_author='None')
+    ion = Ionisation()
+    model.calculate(Na=Na, Nd=Na / 2., nxc=nxc)
+    ion.charge_neutrality(Na, Na / 2., nxc)
+
+    t0 = min(timeit.repeat(lambda: ion.charge_neutrality(Na, Na / 2., nxc),
+                           number=1, repeat=3))
+    t1 = min(timeit.repeat(lambda: model.calculate(Na=Na, Nd=Na / 2.,
+                                                   nxc=nxc),
+                           number=1, repeat=3))
+
+    print('Nd = Na / 2, {0} points, {1} iterations against {2}'.format(
+        points, model.iterations, ion.iterations))
+    print('  charge_neutrality:  {0:8.4f} s'.format(t0))
+    print('  CarrierStatistics:  {0:8.4f} s'.format(t1))
+    for name, a, b in zip(['ne', 'nh', 'Na_i', 'Nd_i'],
+                          ion.charge_neutrality(Na, Na / 2., nxc),
+                          model.calculate(Na=Na, Nd=Na / 2., nxc=nxc)):
+        print('  max relative difference of {0:6s}{1:9.1e}'.format(
+            name, np.max(np.abs(a / b - 1))))
+
+
+if __name__ == '__main__':
+    main(*[int(float(i)) for i in sys.argv[1:]])
@@ -0,0 +1,84 @@
+#!/usr/local/bin/python
+# UTF-8
+'''
+Fits synthetic lifetime curves of known defects with DPSS, reports how
+well the energy levels and capture cross section ratios are recovered,
+and the throughput in curves per second when the samples are fitted in
+this process and over a pool of processes.
+
+    python benchmarks/bench_dpss.py [samples] [processes]
+
+Each sample has four curves, at different temperatures and dopings, of
+one defect.
+'''
+
+import os
+import sys
+import time
+
+import numpy as np
+
+from semiconductor.recombination.extrinsic import SRH
+from semiconductor.recombination.defect_parameters import DPSS
+
+
+conditions = [(300., 1e15, 0), (350., 1e15, 0), (400., 1e16, 0),
+              (300., 0, 1e15)]
+
+
+def synthetic_samples(number, noise=0.01, seed=0):
+    '''
+    returns samples of the lifetime curves of the defects, with a
+    relative noise, and the defects of each sample
+    '''
+    rng = np.random.default_rng(seed)
+    srh = SRH(Nt=1e12)
+    defects = ['Fei_d', 'FeB_a', 'Mo_d', 'Cr_d_Sun2015', 'Ti_d']
+    nxc = np.logspace(13, 16, 50)
+
+    samples, truth = [], []
+    for n in range(number):
+        defect = defects[n % len(defects)]
+        curves = []
+        for temp, Na, Nd in conditions:
+            tau = srh.tau(defect=defect, temp=temp, Na=Na, Nd=Nd, nxc=nxc)
+            curves.append({
+                'nxc': nxc, 'temp': temp, 'Na': Na, 'Nd': Nd,
+                'tau': tau * (1. + noise * rng.standard_normal(nxc.size))})
+        samples.append(curves)
+        truth.append((srh.vals['et'],
+                      srh.vals['sigma_e'] / srh.vals['sigma_h']))
+    return samples, truth
+
+
+def main(number=200, processes=os.cpu_count()):
+    samples, truth = synthetic_samples(number)
+    model = DPSS()
+    curves = number * len(conditions)
+
+    t0 = time.perf_counter()
+    results = model.fit_samples(samples, max_workers=1)
+    t0 = time.perf_counter() - t0
+
+    t1 = time.perf_counter()
+    model.fit_samples(samples, max_workers=processes)
+    t1 = time.perf_counter() - t1
+
+    Et = np.array([i['Et'] for i in results])
+    k = np.array([i['k'] for i in results])
+    Et_true, k_true = np.array(truth).T
+
+    print('{0} samples of {1} curves, {2} Et by {3} k'.format(
+        number, len(conditions), model.calculationdetails['Et'].size,
+        model.calculationdetails['k'].size))
+    print('  max Et error: {0:.4f} eV, max k error: {1:.1f} %'.format(
+        np.max(np.abs(Et - Et_true)),
+        np.max(np.abs(k / k_true - 1)) * 100))
+    print('  in this process:     {0:9.1f} curves per second'.format(
+        curves / t0))
+    print('  over {0:2d} processes: {1:9.1f} curves per second'.format(
+        processes, curves / t1))
+
+
+if __name__ == '__main__':
+    main(*[int(float(i)) for i in sys.argv[1:]])
@@ -0,0 +1,66 @@
+#!/usr/local/bin/python
+# UTF-8
+'''
+Compares calculating the effective lifetime by adding the inverse
+lifetimes of newly made Intrinsic and SRH models and a surface term,
+against EffectiveLifetime, which keeps its models and shares the carrier
+densities between them.
+
+    python benchmarks/bench_effective_lifetime.py [nxc] [repeats]
+'''
+
+import sys
+import timeit
+
+import numpy as np
+
+from semiconductor.recombination.intrinsic import Intrinsic
+from semiconductor.recombination.extrinsic import SRH
+from semiconductor.recombination.effective_lifetime import (
+    EffectiveLifetime)
+
+
+def summed(Na, nxc, J0, W):
+    '''
+    the effective lifetime, from models made for the calculation and a
+    surface term using the intrinsic carrier density of SRH
+    '''
+    srh = SRH(defect='Fei_d', Nt=1e12, Na=Na, Nd=0)
+    itau = Intrinsic(Na=Na, Nd=0).itau(nxc) + srh.itau(nxc=nxc)
+    ne, nh = nxc + Na, nxc + srh.nieff**2 / Na
+    return 1. / (itau + 2. * J0 * (ne * nh - srh.nieff**2) / (
+        1.602176634e-19 * srh.nieff**2 * W * nxc))
+
+
+def main(points=1000, repeat=20):
+    Na = np.logspace(14, 17, 10)[:, None]
+    nxc = np.logspace(13, 16, points)
+    J0, W = 10e-15, 0.018
+
+    model = EffectiveLifetime(defect='Fei_d', Nt=1e12, Nd=0, J0=J0, W=W)
+
+    difference = np.max(np.abs(
+        summed(Na, nxc, J0, W) / model.tau(Na=Na, nxc=nxc) - 1))
+
+    t0 = min(timeit.repeat(lambda: summed(Na, nxc, J0, W),
+                           number=repeat, repeat=3)) / repeat
+    t1 = min(timeit.repeat(lambda: model.breakdown(Na=Na, nxc=nxc),
+                           number=repeat, repeat=3)) / repeat
+
+    print('{0} dopings by {1} excess carrier densities'.format(
+        Na.size, points))
+    print('  summed models:     {0:9.3f} ms'.format(t0 * 1e3))
+    print('  EffectiveLifetime: {0:9.3f} ms'.format(t1 * 1e3))
+    print('  speed up:          {0:9.2f} x (max relative difference '
+          '{1:.0e})'.format(t0 / t1, difference))
+
+    # every term of the breakdown has the same shape, for scalar inputs
+    # and without a surface term too
+    shapes = {i: np.shape(j) for i, j in EffectiveLifetime(
+        defect='Fei_d', Nt=1e12, Nd=0).breakdown(Na=1e16, nxc=1e15).items()}
+    if len(set(shapes.values())) != 1:
+        print('Warning: the breakdown terms differ in shape', shapes)
+
+
+if __name__ == '__main__':
+    main(*[int(float(i)) for i in sys.argv[1:]])
@@ -0,0 +1,89 @@
+#!/usr/local/bin/python
+# UTF-8
+'''
+Compares evaluating every author of a model one at a time against
+evaluate_all, which evaluates authors of the same model together, and
+lists the groups of authors that were evaluated together.
+
+    python benchmarks/bench_evaluate_all.py [dopings] [nxc]
+'''
+
+import sys
+import timeit
+
+import numpy as np
+
+from semiconductor.material.bandgap_narrowing import BandGapNarrowing
+from semiconductor.electrical.mobility import Mobility
+from semiconductor.recombination.intrinsic import Auger
+from semiconductor.helper.helper import _group_key
+
+
+def looped(model, update_function, authors, **kwargs):
+    '''
+    the values as previously calculated, one author at a time, and put
+    in an array as evaluate_all returns them
+    '''
+    results = []
+    for author in authors:
+        model.change_model(author)
+        results.append(getattr(model, update_function)(**kwargs))
+    shape = np.broadcast_shapes(*[np.shape(i) for i in results])
+    return np.stack([np.broadcast_to(i, shape) for i in results])
+
+
+def interleaved(first, second, repeat=15, number=3):
+    '''
+    the median times of two functions, timed in turns that alternate
+    which goes first, so that both see the same load
+    '''
+    times = np.zeros((repeat, 2))
+    for j in range(repeat):
+        for i in (0, 1)[::(-1)**j]:
+            times[j, i] = timeit.timeit(
+                (first, second)[i], number=number) / number
+    return np.median(times, axis=0)
+
+
+def main(dopings=100, points=100):
+    Na = np.logspace(14, 20, dopings)[:, None]
+    nxc = np.logspace(10, 17, points)
+
+    cases = [
+        (BandGapNarrowing(), 'update', dict(Na=Na, Nd=0, nxc=nxc)),
+        (Mobility(), 'hole_mobility', dict(Na=Na, Nd=0, nxc=nxc)),
+        (Auger(Na=Na, Nd=0), 'tau', dict(nxc=nxc)),
+    ]
+
+    for model, update_function, kwargs in cases:
+        authors, results = model.evaluate_all(update_function, **kwargs)
+        groups = len(set(_group_key(model.Models[i]) for i in authors))
+        stacked = model.stacked_groups
+
+        # the largest difference, where the values are not equal
+        difference = 0
+        for n, i in enumerate(looped(
+                model, update_function, authors, **kwargs)):
+            differ = results[n] != i
+            if np.any(differ):
+                difference = max(difference, np.max(
+                    np.abs(results[n] - i)[differ] /
+                    np.abs(results[n])[differ]))
+
+        t0, t1 = interleaved(
+            lambda: looped(model, update_function, authors, **kwargs),
+            lambda: model.evaluate_all(update_function, **kwargs))
+
+        print('{0}.{1}, {2} authors in {3} groups, {4} values'.format(
+            type(model).__name__, update_function, len(authors), groups,
+            results[0].size))
+        print('  one at a time: {0:8.4f} s'.format(t0))
+        print('  evaluate_all:  {0:8.4f} s'.format(t1))
+        print('  speed up:      {0:8.2f}'.format(t0 / t1))
+        print('  max relative difference {0:.1e}'.format(difference))
+        print('  evaluated together: {0}'.format(
+            '; '.join(', '.join(i) for i in stacked) or 'none'))
+
+
+if __name__ == '__main__':
+    main(*[int(float(i)) for i in sys.argv[1:]])
@@ -0,0 +1,70 @@
+#!/usr/local/bin/python
+# UTF-8
+'''
+Times the Fermi-Dirac integrals, and their inverse, and reports their
+error against a quadrature of the integral and the Boltzmann limit.
+
+    python benchmarks/bench_fermi_dirac.py [number of points]
+'''
+
+import sys
+import timeit
+
+import numpy as np
+
+from semiconductor.general_functions import fermi_dirac
+from semiconductor.general_functions import carrierfunctions as CF
+
+
+def _time(func, number=3):
+    return min(timeit.repeat(func, number=number, repeat=3)) / number
+
+
+def main(points=10**6):
+    eta = np.linspace(-20, 60, points)
+
+    # the coefficients are fitted on first use
+    print('fitting the coefficients: {0:8.4f} s'.format(_time(
+        lambda: [fermi_dirac._coefficients.cache_clear(),
+                 fermi_dirac.fermi_dirac_half(0.),
+                 fermi_dirac.fermi_dirac_minus_half(0.)], number=1)))
+
+    F = fermi_dirac.fermi_dirac_half(eta)
+    for name, func, values in [
+            ('F_1/2', fermi_dirac.fermi_dirac_half, eta),
+            ('F_-1/2', fermi_dirac.fermi_dirac_minus_half, eta),
+            ('inverse F_1/2', fermi_dirac.inverse_fermi_dirac_half, F),
+            ('exp (for scale)', np.exp, eta)]:
+        t = _time(lambda: func(values))
+        print('{0:16s}{1:9.4f} s, {2:8.1f} ns per point'.format(
+            name, t, t / points * 1e9))
+
+    # the error against a quadrature with three times the nodes
+    check = np.linspace(-60, 200, 20001)
+    print('\nmax relative error over eta from -60 to 200')
+    for name, func, order in [
+            ('F_1/2', fermi_dirac.fermi_dirac_half, 0.5),
+            ('F_-1/2', fermi_dirac.fermi_dirac_minus_half, -0.5)]:
+        print('  {0:14s}{1:9.1e}'.format(name, np.max(np.abs(
+            func(check) / fermi_dirac._quadrature(check, order, 300) - 1))))
+
+    F = np.logspace(-30, 6, 20001)
+    print('  {0:14s}{1:9.1e}'.format('inverse F_1/2', np.max(np.abs(
+        fermi_dirac.fermi_dirac_half(
+            fermi_dirac.inverse_fermi_dirac_half(F)) / F - 1))))
+
+    # the carrier densities approach those of Boltzmann statistics away
+    # from the band edges
+    Ef = np.linspace(-0.6, 0.6, 7)
+    n, p = CF.fermi2carrier_fermi(Ef)
+    nb, pb = CF.fermi2carrier_boltz(Ef)
+    Efe, Efh = CF.carrier2fermi_fermi(n, p)
+    print('\n{0:>8s}{1:>12s}{2:>12s}{3:>12s}'.format(
+        'Ef (eV)', 'n', 'n / n_boltz', 'Efe error'))
+    for i in range(Ef.size):
+        print('{0:8.2f}{1:12.3e}{2:12.6f}{3:12.1e}'.format(
+            Ef[i], n[i], n[i] / nb[i], Efe[i] - Ef[i]))
+
+
+if __name__ == '__main__':
+    main(*[int(float(i)) for i in sys.argv[1:]])
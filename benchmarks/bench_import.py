@@ -0,0 +1,81 @@
+#!/usr/local/bin/python
+# UTF-8
+'''
+Measures the time taken to import the package in a fresh interpreter,
+and asserts it stays within a budget.
+
+The budgets (in seconds) can be changed with the environmental variables
+SEMICONDUCTOR_IMPORT_BUDGET and SEMICONDUCTOR_IMPORT_ALL_BUDGET.
+
+    python benchmarks/bench_import.py
+'''
+
+import os
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir,
+                   'src')
+
+# just the package
+IMPORT_PACKAGE = 'import semiconductor'
+
+# every model class, with no plotting
+IMPORT_ALL = '''
+import semiconductor
+from semiconductor.electrical import (Mobility, Ionisation, Conductivity,
+                                      Resistivity, DarkConductivity)
+from semiconductor.material import (IntrinsicBandGap, BandGap,
+                                    BandGapNarrowing, DOS,
+                                    IntrinsicCarrierDensity, ThermalVelocity)
+from semiconductor.recombination import Intrinsic, Radiative, Auger, SRH
+from semiconductor.optical import opticalproperties, absorptance, emission
+'''
+
+TIMER = '''
+import sys, time
+start = time.perf_counter()
+{0}
+print(time.perf_counter() - start, 'matplotlib' in sys.modules)
+'''
+
+
+def time_import(statement, repeats=5):
+    '''
+    returns the fastest import time of the statement in a new
+    interpreter, and if matplotlib was imported
+    '''
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [SRC] + [p for p in [env.get('PYTHONPATH')] if p])
+
+    times = []
+    for i in range(repeats):
+        out = subprocess.check_output(
+            [sys.executable, '-c', TIMER.format(statement)], env=env)
+        time, plotting = out.decode().split()
+        times.append(float(time))
+
+    return min(times), plotting == 'True'
+
+
+def main():
+    budget = float(os.environ.get('SEMICONDUCTOR_IMPORT_BUDGET', 0.05))
+    budget_all = float(
+        os.environ.get('SEMICONDUCTOR_IMPORT_ALL_BUDGET', 1.0))
+
+    for name, statement, limit in [
+            ('import semiconductor', IMPORT_PACKAGE, budget),
+            ('import all models', IMPORT_ALL, budget_all)]:
+
+        time, plotting = time_import(statement)
+        print('{0:<22}{1:8.3f} s (budget {2:.3f} s)'.format(
+            name, time, limit))
+
+        assert not plotting, 'matplotlib was imported by: ' + name
+        assert time < limit, '{0} took {1:.3f} s, over budget {2:.3f} s'.format(
+            name, time, limit)
+
+
+if __name__ == '__main__':
+    main()
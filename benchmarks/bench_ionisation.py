@@ -0,0 +1,64 @@
+#!/usr/local/bin/python
+# UTF-8
+'''
+Compares the convergent dopant ionisation solver against the previous
+evaluation, which ran ten fixed iterations each recalculating ni and
+the density of states, for speed and agreement.
+
+    python benchmarks/bench_ionisation.py [number of points]
+'''
+
+import sys
+import timeit
+
+import numpy as np
+
+from semiconductor.electrical.ionisation import Ionisation
+from semiconductor.general_functions import carrierfunctions as CF
+
+
+def legacy(ion, N_dop, nxc, impurity):
+    '''
+    the ionised dopants as previously calculated
+    '''
+    N_idop = np.copy(N_dop)
+    for i in range(10):
+        # clear the cache so the density of states is recalculated
+        ion._dos_cache.clear()
+        if ion.vals['tpe_' + ion.vals[impurity]] == 'donor':
+            Nd, Na = np.copy(N_idop), np.zeros(N_idop.shape)
+        else:
+            Na, Nd = np.copy(N_idop), np.zeros(N_idop.shape)
+        ne, nh = CF.get_carriers(Na, Nd, nxc, temp=ion._cal_dts['temp'],
+                                 material=ion._cal_dts['material'])
+        N_idop = ion.update(N_imp=N_dop, ne=ne, nh=nh, impurity=impurity)
+    return N_idop
+
+
+def main(points=10**5):
+    ion = Ionisation(temp=300.)
+    N_dop = np.logspace(14, 20, points)
+    nxc = 1e14
+
+    for impurity in ['phosphorous', 'boron']:
+        ref = legacy(ion, N_dop, nxc, impurity)
+        new = ion.update_dopant_ionisation(N_dop, nxc, impurity)
+        iterations = ion.iterations
+
+        t_ref = min(timeit.repeat(
+            lambda: legacy(ion, N_dop, nxc, impurity), number=1, repeat=3))
+        t_new = min(timeit.repeat(
+            lambda: ion.update_dopant_ionisation(N_dop, nxc, impurity),
+            number=1, repeat=3))
+
+        print('Ionisation of {0}, {1} points'.format(impurity, points))
+        print('  previous:  {0:8.3f} s (10 iterations)'.format(t_ref))
+        print('  converged: {0:8.3f} s ({1} iterations)'.format(
+            t_new, iterations))
+        print('  speed up:  {0:8.1f} x'.format(t_ref / t_new))
+        print('  max relative difference {0:.1e}'.format(
+            np.amax(np.abs(new - ref) / ref)))
+
+
+if __name__ == '__main__':
+    main(*[int(float(i)) for i in sys.argv[1:]])
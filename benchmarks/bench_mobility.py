@@ -0,0 +1,116 @@
+#!/usr/local/bin/python
+# UTF-8
+'''
+Compares the fused Klaassen mobility kernel against the previous
+evaluation, which composed uDCS and uLS for each carrier, for speed
+and agreement. It also reports the agreement of the fused kernel with
+the PV-lighthouse values in electrical/Si/test_mobility_files, and the
+speed and error of a precomputed mobility table.
+
+    python benchmarks/bench_mobility.py [number of points]
+'''
+
+import os
+import sys
+import timeit
+import warnings
+
+import numpy as np
+
+from semiconductor.electrical import mobilitymodels as model
+from semiconductor.electrical.mobility import Mobility
+from semiconductor.electrical.mobility_table import MobilityTable
+from semiconductor.general_functions.carrierfunctions import get_carriers
+
+
+def legacy(vals, Na, Nd, ne, nh, temp):
+    '''
+    the electron and hole mobility as previously calculated
+    '''
+    return [1. / (1. / model.uDCS(c, vals, nh, ne, Na, Nd, temp) +
+                  1. / model.uLS(c, vals, temp)) for c in ('e', 'h')]
+
+
+def fused(vals, Na, Nd, ne, nh, temp):
+    return model.unified_mobility_kernel(vals, Na, Nd, ne, nh, temp)
+
+
+def check_files(vals):
+    '''
+    returns the maximum relative difference to the PV-lighthouse
+    values for each file
+    '''
+    folder = os.path.join(os.path.dirname(model.__file__), 'Si',
+                          'test_mobility_files')
+    results = {}
+    for fname, temp in [('Klassen_1e14_dopants.dat', 300.),
+                        ('Klassen_1e14_temp-450.dat', 450.)]:
+        data = np.genfromtxt(os.path.join(folder, fname), names=True)
+        ne, nh = get_carriers(Na=0, Nd=1e14, nxc=data['deltan'], temp=temp)
+        mu_e, mu_h = fused(vals, 0, 1e14, ne, nh, temp)
+        results[fname] = (np.amax(np.abs(mu_e - data['ue']) / data['ue']),
+                          np.amax(np.abs(mu_h - data['uh']) / data['uh']))
+    return results
+
+
+def main(points=10**6):
+    warnings.simplefilter('ignore', RuntimeWarning)
+    vals = Mobility(author='Klaassen_1992').vals
+
+    temp = 300.
+    Na = np.logspace(13, 20, points)
+    Nd = 1e15
+    ne, nh = get_carriers(Na=Na, Nd=Nd, nxc=np.logspace(10, 17, points),
+                          temp=temp)
+
+    ref = legacy(vals, Na, Nd, ne, nh, temp)
+    new = fused(vals, Na, Nd, ne, nh, temp)
+    identical = all(np.array_equal(a, b) for a, b in zip(ref, new))
+    max_diff = max(np.amax(np.abs(a - b) / a) for a, b in zip(ref, new))
+
+    t_ref = min(timeit.repeat(
+        lambda: legacy(vals, Na, Nd, ne, nh, temp), number=1, repeat=3))
+    t_new = min(timeit.repeat(
+        lambda: fused(vals, Na, Nd, ne, nh, temp), number=1, repeat=3))
+
+    print('Klaassen mobility, both carriers, {0} points'.format(points))
+    print('  previous: {0:8.3f} s'.format(t_ref))
+    print('  fused:    {0:8.3f} s'.format(t_new))
+    print('  speed up: {0:8.1f} x'.format(t_ref / t_new))
+    print('  bit for bit: {0} (max relative difference {1:.1e})'.format(
+        identical, max_diff))
+
+    print('Agreement with PV-lighthouse (max relative difference)')
+    for fname, (err_e, err_h) in check_files(vals).items():
+        print('  {0:<28} electron {1:.2%}  hole {2:.2%}'.format(
+            fname, err_e, err_h))
+
+    mob = Mobility(author='Klaassen_1992', temp=temp)
+    start = timeit.default_timer()
+    table = MobilityTable(mob, save=False).build()
+    t_build = timeit.default_timer() - start
+    nxc = np.logspace(10, 17, points)
+    t_model = min(timeit.repeat(
+        lambda: table._model(Na, Nd, nxc, temp), number=1, repeat=3))
+    t_table = min(timeit.repeat(
+        lambda: table.mobilities(Na, Nd, nxc, temp), number=1, repeat=3))
+    mu_e, mu_h = table.mobilities(Na, Nd, nxc, temp)
+    err = max(np.amax(np.abs(mu_e - new[0]) / new[0]),
+              np.amax(np.abs(mu_h - new[1]) / new[1]))
+    print('Mobility table, {0} points per decade'.format(
+        table.points_per_decade))
+    print('  model:    {0:8.3f} s (with the carrier densities)'.format(
+        t_model))
+    print('  table:    {0:8.3f} s'.format(t_table))
+    print('  speed up: {0:8.1f} x, after {1:.2f} s to build the table'.format(
+        t_model / t_table, t_build))
+    print('  max relative error: {0:.2%} here, {1:.2%} over the grid'.format(
+        err, table.max_error))
+
+    assert identical, 'the fused kernel does not match the previous values'
+    assert not table.use_model, 'the table is not within its tolerance'
+    assert t_table < t_model, 'the table is slower than the model'
+
+
+if __name__ == '__main__':
+    main(*[int(float(i)) for i in sys.argv[1:]])
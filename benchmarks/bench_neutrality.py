@@ -0,0 +1,41 @@
+#!/usr/local/bin/python
+# UTF-8
+'''
+Times the charge neutrality solver for compensated material, with
+random acceptor and donor densities, and reports how well charge
+neutrality is met.
+
+    python benchmarks/bench_neutrality.py [number of points]
+'''
+
+import sys
+import timeit
+
+import numpy as np
+
+from semiconductor.electrical.ionisation import Ionisation
+
+
+def main(points=10**6):
+    rng = np.random.RandomState(0)
+    Na = 10**rng.uniform(14, 19, points)
+    Nd = 10**rng.uniform(14, 19, points)
+    nxc = 10**rng.uniform(10, 16, points)
+
+    ion = Ionisation(temp=300.)
+    ne, nh, Na_i, Nd_i = ion.charge_neutrality(Na, Nd, nxc)
+    iterations = ion.iterations
+
+    t = min(timeit.repeat(lambda: ion.charge_neutrality(Na, Nd, nxc),
+                          number=1, repeat=3))
+
+    error = np.abs((ne - nh) - (Nd_i - Na_i)) / (ne + nh)
+
+    print('Charge neutrality of compensated material, {0} points'.format(
+        points))
+    print('  time:       {0:8.3f} s ({1} iterations)'.format(t, iterations))
+    print('  max charge: {0:.1e} of the carriers'.format(np.amax(error)))
+
+
+if __name__ == '__main__':
+    main(*[int(float(i)) for i in sys.argv[1:]])
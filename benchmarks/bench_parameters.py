@@ -0,0 +1,191 @@
+#!/usr/local/bin/python
+# UTF-8
+'''
+Compares the Klaassen mobility and Schenk band gap narrowing kernels using
+the compiled parameter records against the previous kernels, which built
+string keys to look up a dictionary on every call, and the string key
+lookups that other kernels still use on a record and on a dictionary.
+The records are dictionaries, so these should cost the same.
+
+    python benchmarks/bench_parameters.py [number of points]
+'''
+
+import sys
+import timeit
+
+import numpy as np
+import scipy.constants as Const
+
+from semiconductor.electrical.mobility import Mobility
+from semiconductor.electrical import mobilitymodels
+from semiconductor.material.bandgap_narrowing import BandGapNarrowing
+from semiconductor.material import bandgap_narrowing_models
+from semiconductor.general_functions.carrierfunctions import get_carriers
+
+
+def legacy_klaassen(vals, Na, Nd, ne, nh, temp, carriers=('e', 'h')):
+    '''
+    the Klaassen kernel as previously calculated
+    '''
+    switch = {'e': 'h', 'h': 'e'}
+
+    Na = np.atleast_1d(np.asarray(Na, dtype=float))
+    Nd = np.atleast_1d(np.asarray(Nd, dtype=float))
+
+    with np.errstate(divide='ignore'):
+        Z_e = np.where(
+            Nd == 0, 1., 1. + 1. / (vals['c_e'] + (vals['nref2_e'] / Nd)**2.))
+        Z_h = np.where(
+            Na == 0, 1., 1. + 1. / (vals['c_h'] + (vals['nref2_h'] / Na)**2.))
+
+    NdZ = Nd * Z_e
+    NaZ = Na * Z_h
+    carrier_sum = nh + ne
+    PCW_temp = (temp / 300.)**(3.)
+    PBH_temp = (temp / 300.0)**2.0
+
+    mobilities = []
+    for c in carriers:
+        car_den = {'e': nh, 'h': ne}[c]
+        mr = vals['mr_' + c]
+        mr_ratio = mr / vals['mr_' + switch[c]]
+        umax = vals['umax_' + c]
+        umin = vals['umin_' + c]
+        alpha = vals['alpha_' + c]
+
+        nsc = NdZ + (NaZ + car_den)
+
+        PCW = 3.97e13 * (1. / (nsc) * PCW_temp)**(2. / 3.)
+        PBH = 1.36e20 / carrier_sum * (mr * PBH_temp)
+        P = 1. / (vals['fcw'] / PCW + vals['fbh'] / PBH)
+
+        G = 1. + - vals['s1'] / \
+            (vals['s2'] + (temp / 300. / mr) ** vals['s4'] *
+             P)**vals['s3'] + \
+            vals['s5'] / \
+            ((300. / temp / mr)**vals['s7'] * P)**vals['s6']
+
+        P_r6 = P**vals['r6']
+        F = (vals['r1'] * P_r6 + vals['r2'] + vals['r3'] * mr_ratio) / (
+            P_r6 + vals['r4'] + vals['r5'] * mr_ratio)
+
+        if c == 'e':
+            nsceff = G * NaZ + NdZ + car_den / F
+        else:
+            nsceff = NaZ + G * NdZ + car_den / F
+
+        un = umax ** 2 / (umax - umin) * (temp / 300.)**(3. * alpha - 1.5)
+        uc = umin * umax / (umax - umin) * (300. / temp)**0.5
+
+        uDCS = un * nsc / nsceff * (vals['nref_' + c] / nsc)**(alpha) + \
+            (uc * carrier_sum / nsceff)
+        uLS = umax * (300. / temp)**vals['theta_' + c]
+
+        mobilities.append(1. / (1. / uDCS + 1. / uLS))
+
+    return mobilities
+
+
+def legacy_schenk(vals, Nd, Na, ne, nh, temp):
+    '''
+    the Schenk model as previously calculated
+    '''
+    ne = (vals['aex']**3.) * ne
+    nh = (vals['aex']**3.) * nh
+    Na = (vals['aex']**3.) * Na
+    Nd = (vals['aex']**3.) * Nd
+
+    n_sum = ne + nh
+    n_ionic = Na + Nd
+
+    n_p = vals['alphae'] * ne + vals['alphah'] * nh
+    t = Const.k * temp / vals['Ryex'] / Const.e
+
+    def ridged_shift(num_carrier, carrier):
+        delta = -(
+            (4. * Const.pi)**3. * n_sum**2. *
+            (
+                (48. * num_carrier / Const.pi /
+                 vals['g' + carrier])**(1. / 3.)
+                + vals['c' + carrier] * np.log(1. + vals['d' + carrier] *
+                                               n_p**vals['p' + carrier]))
+            + (8. * Const.pi * vals['alpha' + carrier] /
+               vals['g' + carrier]) * num_carrier * t**2.
+            + np.sqrt(8. * Const.pi * n_sum) * t**(5. / 2.)
+        ) / (
+            (4. * Const.pi)**3. * n_sum**2. + t**3. +
+            vals['b' + carrier] * np.sqrt(n_sum) * t**2. +
+            40. * n_sum**1.5 * t)
+        return -vals['Ryex'] * delta
+
+    def ionic_shift(carrier):
+        U = n_sum**2. / t**3.
+        delta = -n_ionic * (1. + U) / (
+            np.sqrt(t * n_sum / 2. / Const.pi) *
+            (1. + vals['h' + carrier] * np.log(1. + np.sqrt(n_sum) / t))
+            + vals['j' + carrier] * U * n_p**.75 *
+            (1. + vals['k' + carrier] * n_p**vals['q' + carrier]))
+        return -vals['Ryex'] * delta
+
+    return ridged_shift(ne, 'e') + ionic_shift('e') + \
+        ridged_shift(nh, 'h') + ionic_shift('h')
+
+
+def compare(name, before, after, points):
+    '''
+    prints the time of each kernel, timed in turns that alternate which
+    goes first, so that both see the same load
+    '''
+    number = max(10, 2000 // points)
+    times = np.zeros((15, 2))
+    for j in range(times.shape[0]):
+        for i in (0, 1)[::(-1)**j]:
+            times[j, i] = timeit.timeit(
+                (before, after)[i], number=number) / number
+    t0, t1 = np.median(times, axis=0)
+    difference = np.max(np.abs(np.asarray(before()) - np.asarray(after())) /
+                        np.abs(np.asarray(after())))
+    print('{0}, {1} points'.format(name, points))
+    print('  string keys:  {0:9.2f} us'.format(t0 * 1e6))
+    print('  records:      {0:9.2f} us'.format(t1 * 1e6))
+    print('  speed up:     {0:9.2f} x (max relative difference {1:.0e})'.format(
+        t0 / t1, difference))
+
+
+def lookups(vals, number=10**5):
+    '''
+    prints the time of a string key lookup, as used by the kernels that
+    still build keys, from a record and from a dictionary
+    '''
+    key = list(vals)[-1]
+    values = dict(vals)
+    t0 = min(timeit.repeat(lambda: values[key], number=number, repeat=5))
+    t1 = min(timeit.repeat(lambda: vals[key], number=number, repeat=5))
+    print('String key lookup')
+    print('  dictionary:   {0:9.3f} us'.format(t0 / number * 1e6))
+    print('  record:       {0:9.3f} us'.format(t1 / number * 1e6))
+
+
+def main(points=None):
+    for n in ([points] if points else [1, 100, 10000]):
+        Na = np.logspace(14, 19, n)
+        Nd = np.zeros(n)
+        ne, nh = get_carriers(Na, Nd, 1e12, temp=300.)
+
+        vals = Mobility(author='Klaassen_1992').vals
+        compare('Klaassen kernel',
+                lambda: legacy_klaassen(dict(vals), Na, Nd, ne, nh, 300.),
+                lambda: mobilitymodels.unified_mobility_kernel(
+                    vals, Na, Nd, ne, nh, 300.), n)
+
+        vals = BandGapNarrowing(author='Schenk_1988fer').vals
+        compare('Schenk model',
+                lambda: legacy_schenk(dict(vals), Nd, Na, ne, nh, 300.),
+                lambda: bandgap_narrowing_models.Schenk(
+                    vals, Nd, Na, ne, nh, 300.), n)
+
+    lookups(Mobility(author='Klaassen_1992').vals)
+
+
+if __name__ == '__main__':
+    main(*[int(float(i)) for i in sys.argv[1:]])
@@ -0,0 +1,87 @@
+#!/usr/local/bin/python
+# UTF-8
+'''
+Times the conversion of a resistivity map to doping, and compares it
+with the previous scalar Newton solve of each point, which is timed for
+a few points and scaled to the map. It also times a sweep of scalar
+resistivity calculations, checking no models are created during it.
+
+    python benchmarks/bench_resistivity.py [number of points]
+'''
+
+import sys
+import time
+
+import numpy as np
+import scipy.constants as const
+import scipy.optimize as opt
+
+from semiconductor.electrical.resistivity import Conductivity
+from semiconductor.electrical.resistivity import DarkConductivity
+from semiconductor.electrical.resistivity import Resistivity
+from semiconductor.helper.helper import model_registry
+
+
+def legacy(dark_conductivity):
+    '''
+    the doping of a p-type sample as previously calculated
+    '''
+    dark = DarkConductivity()
+    mob_e = dark.Mob.electron_mobility(nxc=1, Na=0, Nd=0, temp=300)
+
+    def cal_dop(N):
+        cond = Conductivity(**dark._cal_dts)
+        return cond.calculate(Na=N, Nd=0) - dark_conductivity
+
+    return opt.newton(cal_dop, x0=dark_conductivity / const.e / mob_e,
+                      tol=0.001)
+
+
+def main(points=10**5):
+    rng = np.random.RandomState(0)
+    resistivity = 10**rng.uniform(-2, 3, points)
+
+    start = time.time()
+    for rho in resistivity[:3]:
+        legacy(1. / rho)
+    t_ref = (time.time() - start) / 3 * points
+
+    # the first call includes building the table
+    dark = DarkConductivity()
+    start = time.time()
+    dark.dark_resistivity2doping(resistivity[:1])
+    t_table = time.time() - start
+
+    start = time.time()
+    doping = dark.dark_resistivity2doping(resistivity)
+    t_new = time.time() - start
+
+    check = Resistivity().calculate(Na=doping, Nd=0, nxc=1)
+
+    print('Resistivity to doping, {0} points'.format(points))
+    print('  previous:  {0:10.1f} s (estimated)'.format(t_ref))
+    print('  table:     {0:10.3f} s (once)'.format(t_table))
+    print('  inversion: {0:10.3f} s ({1} Newton steps)'.format(
+        t_new, dark.iterations))
+    print('  speed up:  {0:10.0f} x'.format(t_ref / t_new))
+    print('  max relative error in resistivity {0:.1e}'.format(
+        np.amax(np.abs(check - resistivity) / resistivity)))
+
+    res = Resistivity()
+    res.calculate(Na=1e16, Nd=0)
+    hits = model_registry.stats()['hits']
+    start = time.time()
+    for N in np.logspace(14, 19, 1000):
+        res.calculate(Na=N, Nd=0)
+    t_sweep = time.time() - start
+    created = model_registry.stats()['hits'] - hits
+
+    print('Resistivity of 1000 scalar dopings')
+    print('  sweep:     {0:10.3f} s ({1} models created)'.format(
+        t_sweep, created))
+
+    assert created == 0, 'models were created during the sweep'
+
+
+if __name__ == '__main__':
+    main(*[int(float(i)) for i in sys.argv[1:]])
@@ -0,0 +1,44 @@
+#!/usr/local/bin/python
+# UTF-8
+'''
+Times the Sah-Shockley lifetime of defects with two levels over a doping
+and excess carrier density map, and compares it to treating the levels
+as independent Shockley-Read-Hall defects.
+
+    python benchmarks/bench_sah_shockley.py [dopings] [nxc]
+'''
+
+import sys
+import timeit
+
+import numpy as np
+
+from semiconductor.recombination.extrinsic import SRH
+
+
+def main(dopings=1000, points=1000):
+    Na = np.logspace(14, 17, dopings)[:, None]
+    nxc = np.logspace(12, 17, points)
+    model = SRH(Nt=1e12)
+
+    for levels in [['Au_d', 'Au_a'], ['Co_d', 'Co_a'], ['Zn_a', 'Zn_aa']]:
+        tau = model.tau_levels(levels, Na=Na, nxc=nxc)
+
+        t = min(timeit.repeat(
+            lambda: model.tau_levels(levels, Na=Na, nxc=nxc),
+            number=1, repeat=3))
+
+        # the levels as independent defects, each with a density of Nt
+        independent = 1. / np.sum(1. / model.tau_all(
+            levels, Na=Na, nxc=nxc)[1], axis=0)
+
+        print('{0}, {1} dopings by {2} excess carrier densities'.format(
+            ' and '.join(levels), dopings, points))
+        print('  tau_levels: {0:9.3f} s, {1:8.1f} ns per point'.format(
+            t, t / tau.size * 1e9))
+        print('  independent levels differ by up to {0:.2f} times'.format(
+            np.max(np.maximum(tau / independent, independent / tau))))
+
+
+if __name__ == '__main__':
+    main(*[int(float(i)) for i in sys.argv[1:]])
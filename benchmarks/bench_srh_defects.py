@@ -0,0 +1,53 @@
+#!/usr/local/bin/python
+# UTF-8
+'''
+Compares calculating the SRH lifetime of every defect one at a time
+against SRH.tau_all, which stacks the defects and calculates them
+together.
+
+    python benchmarks/bench_srh_defects.py [number of nxc] [repeats]
+'''
+
+import sys
+import timeit
+
+import numpy as np
+
+from semiconductor.recombination.extrinsic import SRH
+
+
+def looped(model, defects, nxc, vth_author):
+    '''
+    the lifetimes as previously calculated, one defect at a time. The
+    thermal velocity author is reset for each defect, as a defect that
+    provides one leaves it set for the following defects.
+    '''
+    return np.stack([model.tau(defect=i, vth_author=vth_author, nxc=nxc)
+                     for i in defects])
+
+
+def main(points=1000, repeat=20):
+    nxc = np.logspace(10, 17, points)
+    model = SRH(Na=1e16, Nt=1e12)
+
+    vth_author = model.calculationdetails['vth_author']
+
+    defects, tau, itau = model.tau_all(nxc=nxc)
+    difference = np.max(np.abs(
+        looped(model, defects, nxc, vth_author) / tau - 1))
+
+    t0 = min(timeit.repeat(lambda: looped(model, defects, nxc, vth_author),
+                           number=repeat, repeat=3)) / repeat
+    t1 = min(timeit.repeat(lambda: model.tau_all(nxc=nxc),
+                           number=repeat, repeat=3)) / repeat
+
+    print('{0} defects, {1} excess carrier densities'.format(
+        len(defects), points))
+    print('  one at a time: {0:9.3f} ms'.format(t0 * 1e3))
+    print('  tau_all:       {0:9.3f} ms'.format(t1 * 1e3))
+    print('  speed up:      {0:9.2f} x (max relative difference {1:.0e})'.format(
+        t0 / t1, difference))
+
+
+if __name__ == '__main__':
+    main(*[int(float(i)) for i in sys.argv[1:]])
@@ -0,0 +1,50 @@
+#!/usr/local/bin/python
+# UTF-8
+'''
+Compares calculating the SRH lifetime over a doping and excess carrier
+density sweep one doping at a time against SRH.tau_map, which calculates
+the map at once.
+
+    python benchmarks/bench_srh_map.py [dopings] [nxc]
+'''
+
+import sys
+import timeit
+
+import numpy as np
+
+from semiconductor.recombination.extrinsic import SRH
+
+
+def looped(model, Na, nxc):
+    '''
+    the lifetimes calculated one doping at a time
+    '''
+    return np.stack([model.tau(Na=i, Nd=0, nxc=nxc) for i in Na])
+
+
+def main(dopings=200, points=200):
+    Na = np.logspace(13, 19, dopings)
+    nxc = np.logspace(10, 17, points)
+
+    for author in ['Yan_2014fer', 'Schenk_1988fer']:
+        model = SRH(defect='Fei_d', Nt=1e12, BGN_author=author)
+
+        difference = np.max(np.abs(
+            looped(model, Na, nxc) / model.tau_map(Na=Na, Nd=0, nxc=nxc) - 1))
+
+        t0 = min(timeit.repeat(lambda: looped(model, Na, nxc),
+                               number=1, repeat=3))
+        t1 = min(timeit.repeat(lambda: model.tau_map(Na=Na, Nd=0, nxc=nxc),
+                               number=1, repeat=3))
+
+        print('{0}, {1} dopings by {2} excess carrier densities'.format(
+            author, dopings, points))
+        print('  one doping at a time: {0:9.3f} ms'.format(t0 * 1e3))
+        print('  tau_map:              {0:9.3f} ms'.format(t1 * 1e3))
+        print('  speed up:             {0:9.2f} x (max relative difference '
+              '{1:.0e})'.format(t0 / t1, difference))
+
+
+if __name__ == '__main__':
+    main(*[int(float(i)) for i in sys.argv[1:]])
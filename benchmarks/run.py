@@ -0,0 +1,318 @@
+#!/usr/local/bin/python
+# UTF-8
+'''
+Times the construction and evaluation of each model class at several
+input sizes, records the peak memory used, and writes the results as a
+JSON report that can be compared between releases.
+
+    python benchmarks/run.py [-o report.json] [--sizes 1 1e3 1e6]
+                             [--models Mobility SRH ...]
+                             [--compare previous_report.json]
+
+Every case is called once before it is measured, so that the author
+lists and tables loaded on first use are not counted. The construction
+and evaluation times are the fastest of several repeats. The peak memory
+is traced with tracemalloc, separately from the timing, over one
+construction and evaluation.
+'''
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import time
+import timeit
+import tracemalloc
+import warnings
+
+import numpy as np
+
+import semiconductor
+from semiconductor.electrical.mobility import Mobility
+from semiconductor.electrical.ionisation import Ionisation
+from semiconductor.electrical.resistivity import (
+    Conductivity, DarkConductivity)
+from semiconductor.electrical.carrier_statistics import CarrierStatistics
+from semiconductor.material.bandgap import BandGap
+from semiconductor.material.bandgap_narrowing import BandGapNarrowing
+from semiconductor.material.densityofstates import DOS
+from semiconductor.material.thermal_velocity import ThermalVelocity
+from semiconductor.recombination.extrinsic import SRH
+from semiconductor.recombination.defect_parameters import DPSS
+from semiconductor.recombination.intrinsic import Intrinsic
+from semiconductor.recombination.effective_lifetime import (
+    EffectiveLifetime)
+from semiconductor.optical.opticalproperties import (
+    TabulatedOpticalProperties)
+from semiconductor.optical.absorptance import EscapeProbability
+from semiconductor.optical.emission import luminescence_emission
+
+
+# Each case takes the number of elements, and returns a function that
+# constructs the model and a function that evaluates its hot path on
+# inputs of that many elements.
+
+def mobility(n):
+    Na = np.logspace(14, 19, n)
+    return (lambda: Mobility(),
+            lambda model: model.hole_mobility(Na=Na, Nd=0, nxc=1e10))
+
+
+def ionisation(n):
+    Na = np.logspace(14, 19, n)
+    return (lambda: Ionisation(),
+            lambda model: model.update_dopant_ionisation(
+                N_dop=Na, nxc=1e10, impurity='boron'))
+
+
+def conductivity(n):
+    Na = np.logspace(14, 19, n)
+    return (lambda: Conductivity(),
+            lambda model: model.calculate(Na=Na, Nd=0, nxc=1e10))
+
+
+def dark_conductivity(n):
+    conductivity = np.logspace(-2, 2, n)
+    return (lambda: DarkConductivity(),
+            lambda model: model.dark_conductivity2doping(conductivity))
+
+
+def carrier_statistics(n):
+    Na = np.logspace(14, 19, n)
+    return (lambda: CarrierStatistics(),
+            lambda model: model.calculate(Na=Na, Nd=0, nxc=1e10))
+
+
+def bandgap(n):
+    temp = np.linspace(250, 400, n)
+    return (lambda: BandGap(),
+            lambda model: model.update(temp=temp))
+
+
+def bandgap_narrowing(n):
+    Na = np.logspace(14, 19, n)
+    return (lambda: BandGapNarrowing(),
+            lambda model: model.update(Na=Na, Nd=0, nxc=1e14))
+
+
+def density_of_states(n):
+    temp = np.linspace(250, 400, n)
+    return (lambda: DOS(),
+            lambda model: model.update(temp=temp))
+
+
+def thermal_velocity(n):
+    temp = np.linspace(250, 400, n)
+    return (lambda: ThermalVelocity(),
+            lambda model: model.update(temp=temp))
+
+
+def srh(n):
+    nxc = np.logspace(10, 17, n)
+    return (lambda: SRH(defect='Fei_d', Na=1e16),
+            lambda model: model.tau(nxc=nxc))
+
+
+def dpss(n):
+    nxc = np.logspace(13, 16, n)
+    tau = SRH(defect='Fei_d', Na=1e16, Nt=1e12).tau(nxc=nxc)
+    return (lambda: DPSS(Na=1e16),
+            lambda model: model.fit([{'nxc': nxc, 'tau': tau}]))
+
+
+def intrinsic(n):
+    nxc = np.logspace(10, 17, n)
+    return (lambda: Intrinsic(Na=1e16, Nd=0),
+            lambda model: model.tau(nxc))
+
+
+def effective_lifetime(n):
+    nxc = np.logspace(10, 17, n)
+    return (lambda: EffectiveLifetime(defect='Fei_d', Na=1e16, S=10),
+            lambda model: model.breakdown(nxc=nxc))
+
+
+def optical_properties(n):
+    wavelength = np.linspace(250, 1450, n)
+    return (lambda: TabulatedOpticalProperties(),
+            lambda model: model.tri.ref_ind_at_wls(wavelength))
+
+
+def _depths(n):
+    '''
+    the number of depths, so that there are about n values of depth and
+    wavelength
+    '''
+    return max(1, n // TabulatedOpticalProperties().wavelength.size)
+
+
+def escape_probability(n):
+    x = np.linspace(0, 0.018, _depths(n))
+    return (lambda: EscapeProbability(x=x),
+            lambda model: model.double_side_polished(temp=300.))
+
+
+def emission(n):
+    nxc = np.ones(_depths(n)) * 1e14
+    return (lambda: luminescence_emission(nxc=nxc),
+            lambda model: model.calculate_spectral())
+
+
+cases = {
+    'Mobility': mobility,
+    'Ionisation': ionisation,
+    'Conductivity': conductivity,
+    'DarkConductivity': dark_conductivity,
+    'CarrierStatistics': carrier_statistics,
+    'BandGap': bandgap,
+    'BandGapNarrowing': bandgap_narrowing,
+    'DOS': density_of_states,
+    'ThermalVelocity': thermal_velocity,
+    'SRH': srh,
+    'DPSS': dpss,
+    'Intrinsic': intrinsic,
+    'EffectiveLifetime': effective_lifetime,
+    'TabulatedOpticalProperties': optical_properties,
+    'EscapeProbability': escape_probability,
+    'luminescence_emission': emission,
+}
+
+
+@contextlib.contextmanager
+def _quiet():
+    '''
+    hides the warnings the models print
+    '''
+    with warnings.catch_warnings(), \
+            contextlib.redirect_stdout(io.StringIO()):
+        warnings.simplefilter('ignore')
+        yield
+
+
+def _time(func, repeat):
+    '''
+    returns the fastest time of a call, in seconds
+    '''
+    timer = timeit.Timer(func)
+    number = timer.autorange()[0]
+    return min(timer.repeat(repeat, number)) / number
+
+
+def measure(case, n, repeat=3):
+    '''
+    returns the construction and evaluation times, and the peak memory,
+    of a case with n elements
+    '''
+    with _quiet():
+        construct, evaluate = case(n)
+        model = construct()
+        evaluate(model)
+
+        result = {
+            'construct_s': _time(construct, repeat),
+            'evaluate_s': _time(lambda: evaluate(model), repeat),
+        }
+
+        tracemalloc.start()
+        try:
+            evaluate(construct())
+            result['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return result
+
+
+def run(names, sizes, repeat=3):
+    '''
+    returns the report for the named cases at each size
+    '''
+    report = {
+        'semiconductor': semiconductor.__version__,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'sizes': sizes,
+        'results': {},
+    }
+
+    for name in names:
+        report['results'][name] = {}
+        for n in sizes:
+            try:
+                result = measure(cases[name], n, repeat)
+            except Exception as error:
+                result = {'error': '{0}: {1}'.format(
+                    type(error).__name__, error)}
+            report['results'][name][str(n)] = result
+            _print_result(name, n, result)
+
+    return report
+
+
+def _print_result(name, n, result):
+    if 'error' in result:
+        print('{0:28s}{1:>9d}  {2}'.format(name, n, result['error']))
+    else:
+        print('{0:28s}{1:>9d}{2:12.3e}{3:12.3e}{4:12.2f}'.format(
+            name, n, result['construct_s'], result['evaluate_s'],
+            result['peak_memory_bytes'] / 1e6))
+
+
+def compare(report, previous):
+    '''
+    prints the ratio of the evaluation times and peak memory of a report
+    to those of a previous report
+    '''
+    print('\nCompared to {0} ({1}):'.format(
+        previous['semiconductor'], previous['created']))
+    print('{0:28s}{1:>9s}{2:>12s}{3:>12s}'.format(
+        'model', 'elements', 'time', 'memory'))
+
+    for name, sizes in report['results'].items():
+        for n, result in sizes.items():
+            before = previous['results'].get(name, {}).get(n)
+            if before is None or 'error' in before or 'error' in result:
+                continue
+            print('{0:28s}{1:>9s}{2:11.2f}x{3:11.2f}x'.format(
+                name, n,
+                result['evaluate_s'] / before['evaluate_s'],
+                result['peak_memory_bytes'] /
+                max(before['peak_memory_bytes'], 1)))
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description='Benchmarks the models of semiconductor')
+    parser.add_argument('-o', '--output', default='benchmark.json',
+                        help='the JSON report to write')
+    parser.add_argument('--sizes', nargs='+', default=['1', '1e3', '1e6'],
+                        help='the number of elements to evaluate')
+    parser.add_argument('--models', nargs='+', default=list(cases),
+                        choices=list(cases), metavar='MODEL',
+                        help='the models to benchmark')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='the number of times each timing is repeated')
+    parser.add_argument('--compare',
+                        help='a previous JSON report to compare against')
+    args = parser.parse_args(args)
+
+    sizes = [int(float(i)) for i in args.sizes]
+
+    print('{0:28s}{1:>9s}{2:>12s}{3:>12s}{4:>12s}'.format(
+        'model', 'elements', 'construct/s', 'evaluate/s', 'memory/MB'))
+    report = run(args.models, sizes, args.repeat)
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -1,12 +1,6 @@
-
 from __future__ import print_function
 
-from . import electrical
-from . import general_functions
-from . import helper
-from . import material
-from . import optical
-from . import recombination
+import importlib
 
 __version__ = "0.2.0.dev0"
 
@@ -18,3 +12,27 @@ __email__ = "mattias.juhl@gmail.com"
 
 __license__ = "MIT"
 __copyright__ = "Copyright (c) 2016 Mattias Klaus Juhl"
+
+# the subpackages are only imported when first accessed (PEP 562),
+# so importing semiconductor does not import every model
+_submodules = (
+    'electrical',
+    'general_functions',
+    'helper',
+    'material',
+    'optical',
+    'recombination',
+)
+
+
+def __getattr__(name):
+    if name in _submodules:
+        module = importlib.import_module('.' + name, __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError(
+        'module {0!r} has no attribute {1!r}'.format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_submodules))
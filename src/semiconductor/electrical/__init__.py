@@ -1,4 +1,25 @@
+import importlib
 
-from .mobility import Mobility
-from .ionisation import Ionisation
-from .resistivity import *
+# the classes are imported from their modules when first accessed
+_classes = {
+    'Mobility': 'mobility',
+    'Ionisation': 'ionisation',
+    'Conductivity': 'resistivity',
+    'Resistivity': 'resistivity',
+    'DarkConductivity': 'resistivity',
+    'CarrierStatistics': 'carrier_statistics',
+}
+
+
+def __getattr__(name):
+    if name in _classes:
+        value = getattr(
+            importlib.import_module('.' + _classes[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(
+        'module {0!r} has no attribute {1!r}'.format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_classes))
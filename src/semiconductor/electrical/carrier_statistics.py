@@ -0,0 +1,288 @@
+#!/usr/local/bin/python
+# UTF-8
+
+import numpy as np
+import scipy.constants as const
+
+from semiconductor.electrical.ionisation import Ionisation as Ion
+from semiconductor.material.bandgap_narrowing import BandGapNarrowing as BGN
+from semiconductor.material import bandgap_narrowing_models as Bgn
+from semiconductor.helper.helper import BaseModelClass
+
+
+class CarrierStatistics(BaseModelClass):
+    '''
+    Determines the carrier densities, ionised dopants and effective
+    intrinsic carrier density of a semiconductor together, so that each is
+    consistent with the others.
+
+    The carriers depend on the ionised dopants and the effective intrinsic
+    carrier density, the ionisation depends on the carriers, and the band
+    gap narrowing, and so the effective intrinsic carrier density, depends
+    on the carriers. Rather than calculating each in turn, these are
+    iterated together: the charge neutral carriers are calculated from the
+    current ionised fractions and effective intrinsic carrier density,
+    which are then updated from the ionisation and band gap narrowing of
+    those carriers. The ionised fractions take secant steps, as in
+    Ionisation.update_dopant_ionisation. Each element is iterated until
+    all three have converged, and only the elements that have not
+    converged are evaluated.
+
+    Only the dopants that are present are iterated, and the effective
+    intrinsic carrier density is only iterated for band gap narrowing
+    models marked carrier_dependent in the material's
+    bandgap_narrowing.yaml. For the others it is calculated once, so
+    material with a single type of dopant costs about the same as
+    Ionisation.update_dopant_ionisation. For the carrier dependent models,
+    the band gap narrowing of an element is only calculated once its
+    ionised fractions have converged, and again only if its carriers then
+    change, so it is calculated about once for each element.
+
+    Boltzmann statistics are used, as in the band gap narrowing models.
+
+    inputs
+        1. material: (str)
+            The elemental name for the material. Defualt (Si)
+        2. temp: (float or array like)
+            The temperature of the material in Kelvin (300)
+        3. ni_author: (str)
+            The author of the intrinsic carrier density
+        4. BGN_author: (str)
+            The author of the band gap narrowing. 'None' for no band gap
+            narrowing
+        5. ionis_author: (str)
+            The author of the dopant ionisation
+        6. acceptor, donor (str)
+            The elemental names of the acceptors and donors
+        7. Na: (array like cm^-3)
+            The number of acceptor dopants
+        8. Nd: (array like cm^-3)
+            The number of donar dopants
+        9. nxc: (array like cm^-3)
+            The number of excess carriers
+    '''
+
+    _cal_dts = {
+        'material': 'Si',
+        'temp': 300.,
+        'ni_author': None,
+        'BGN_author': None,
+        'ionis_author': None,
+        'acceptor': 'boron',
+        'donor': 'phosphorous',
+        'Na': 1e16,
+        'Nd': 0,
+        'nxc': 0,
+    }
+
+    # the linked models, and the calculation details they depend on
+    _link_graph = (
+        ('ion', ('material', 'temp', 'ionis_author', 'ni_author')),
+        ('BGN', ('material', 'BGN_author')),
+    )
+
+    def __init__(self, **kwargs):
+        self.calculationdetails = kwargs
+        self._update_links()
+
+    def _build_ion(self):
+        self.ion = Ion(material=self._cal_dts['material'],
+                       author=self._cal_dts['ionis_author'],
+                       ni_author=self._cal_dts['ni_author'],
+                       temp=self._cal_dts['temp'])
+
+    def _build_BGN(self):
+        self.BGN = BGN(material=self._cal_dts['material'],
+                       author=self._cal_dts['BGN_author'])
+
+    def query_used_authors(self):
+        return self.ion.model, self.BGN.model
+
+    def _band_gap_narrowing(self, Na, Nd, ne, nh, temp):
+        '''
+        the band gap narrowing for the carriers
+        '''
+        return getattr(Bgn, self.BGN.model)(
+            self.BGN.vals, Na=Na, Nd=Nd, ne=ne, nh=nh, temp=temp,
+            doping=np.abs(Na - Nd))
+
+    @staticmethod
+    def _carriers(net, nxc, ni, n_type=None):
+        '''
+        the charge neutral carriers for a net density of ionised donors,
+        as in get_carriers. If the material has a single type of dopant,
+        n_type can be passed rather than found for each element.
+        '''
+        ni2 = ni**2
+        if n_type is None:
+            maj = 0.5 * (np.abs(net) + np.sqrt(net**2 + 4. * ni2))
+            minority = ni2 / maj
+            n_type = net > 0
+            return (np.where(n_type, maj, minority) + nxc,
+                    np.where(n_type, minority, maj) + nxc)
+
+        # with a single type of dopant, the net density has the sign of
+        # the majority carriers
+        if not n_type:
+            net = -net
+        maj = 0.5 * (net + np.sqrt(net**2 + 4. * ni2))
+        minority = ni2 / maj
+        if n_type:
+            return maj + nxc, minority + nxc
+        return minority + nxc, maj + nxc
+
+    def _secant(self, fraction, previous, new, residual):
+        '''
+        a secant step of the ionised fraction, falling back to the fixed
+        point step on the first iteration or if it leaves (0, 1]
+        '''
+        if self.iterations == 1:
+            return new
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = fraction - (new - fraction) * (fraction - previous) / (
+                new - fraction - residual)
+        secant = (step > 0) & (step <= 1)
+        return np.where(secant, step, new)
+
+    def calculate(self, tol=1e-8, max_iter=100, **kwargs):
+        '''
+        Calculates the carrier densities, ionised dopants and effective
+        intrinsic carrier density
+
+        inputs:
+            tol: (float, optional)
+                The tolerance of the ionised fractions, and the relative
+                tolerance of the carriers, as in
+                Ionisation.update_dopant_ionisation
+            max_iter: (int, optional)
+                The maximum number of iterations
+            and any of the calculation details
+
+        output:
+            ne, nh, Na_i, Nd_i, nieff: (array cm^-3)
+                The electron and hole densities, the ionised acceptors
+                and donors, and the effective intrinsic carrier density,
+                with the broadcast shape of Na, Nd, nxc and temp. An
+                impurity that is not in the model is taken to be fully
+                ionised.
+        '''
+        self.calculationdetails = kwargs
+        self._update_links()
+
+        acceptor = self._cal_dts['acceptor']
+        donor = self._cal_dts['donor']
+
+        for impurity in (acceptor, donor):
+            if impurity not in self.ion.vals.keys():
+                print('Warning: {0} is not in the model {1}, it is taken '
+                      'as fully ionised'.format(impurity, self.ion.model))
+
+        shape, (Na, Nd, nxc, temp, Nc, Nv, ni) = \
+            self.ion.broadcast_inputs(self._cal_dts['Na'],
+                                      self._cal_dts['Nd'],
+                                      self._cal_dts['nxc'])
+
+        # only the dopants that are present are iterated, so material with
+        # a single type of dopant solves for a single ionised fraction
+        dopants = [(name, tpe, i) for name, tpe, i in (
+            (acceptor, 'acceptor', 0), (donor, 'donor', 1))
+            if np.any((Na, Nd)[i] > 0)]
+
+        # the converged values of each element
+        fractions = [np.ones(Na.shape) for i in dopants]
+        iterate_bgn = 'carrier_dependent' in self.BGN.vals.keys()
+        if iterate_bgn:
+            nieff = np.copy(ni)
+        else:
+            nieff = ni * np.exp(self._band_gap_narrowing(
+                Na, Nd, None, None, temp) / (const.k * temp / const.e) / 2.)
+
+        # the elements that have not converged, with their inputs, and the
+        # guess, previous guess, residual and last value of each fraction.
+        # The previous guess and residual are not used on the first
+        # iteration.
+        index = np.arange(Na.shape[0])
+        inputs = (Na, Nd, nxc, temp, Nc, Nv, ni)
+        guesses = [(np.ones(Na.shape),) * 4 for i in dopants]
+        n_i = np.copy(nieff)
+
+        # a uniform temperature, and so intrinsic carrier density, is passed
+        # to the band gap narrowing as a scalar, which is quicker
+        uniform_temp = np.size(self._cal_dts['temp']) == 1
+
+        # the dopants that are present, as the others need not be indexed
+        present = [i for name, tpe, i in dopants]
+
+        # the type of material with a single type of dopant
+        n_type = dopants[0][1] == 'donor' if len(dopants) == 1 else None
+
+        self.iterations = 0
+
+        while index.size > 0 and self.iterations < max_iter:
+            self.iterations += 1
+            N_a, N_d, dn, T, nc, nv, n_0 = inputs
+
+            # the charge neutral carriers of the ionised dopants
+            net = np.zeros(index.size) if len(dopants) != 1 else 0.
+            for (name, tpe, i), (f, _, _, _) in zip(dopants, guesses):
+                if tpe == 'donor':
+                    net = net + f * inputs[i]
+                else:
+                    net = net - f * inputs[i]
+            ne, nh = self._carriers(net, dn, n_i, n_type)
+
+            converged = np.ones(index.size, dtype=bool)
+            for n, (name, tpe, i) in enumerate(dopants):
+                f, f_prev, f_res, _ = guesses[n]
+                new = self.ion.ionised_fraction(
+                    name, tpe, inputs[i], ne, nh, T, nc, nv)
+                converged &= np.abs(new - f) <= tol
+                guesses[n] = (self._secant(f, f_prev, new, f_res), f,
+                              new - f, new)
+
+            if iterate_bgn:
+                # the band gap narrowing is only calculated for elements
+                # whose ionised fractions have converged
+                j = np.flatnonzero(converged)
+                if j.size > 0:
+                    if uniform_temp:
+                        T_j, n_0j = temp[0], ni[0]
+                    else:
+                        T_j, n_0j = T[j], n_0[j]
+                    vt = const.k * T_j / const.e
+                    N_aj, N_dj = [inputs[i][j] if i in present else 0.
+                                  for i in (0, 1)]
+                    n_i[j] = n_0j * np.exp(self._band_gap_narrowing(
+                        N_aj, N_dj, ne[j], nh[j], T_j) / vt / 2.)
+                    nieff[index[j]] = n_i[j]
+
+                    # these have converged if their carriers are unchanged
+                    # by the new effective intrinsic carrier density
+                    ne_j, nh_j = self._carriers(net[j], dn[j], n_i[j], n_type)
+                    converged[j] = ((np.abs(ne_j - ne[j]) <= tol * ne_j) &
+                                    (np.abs(nh_j - nh[j]) <= tol * nh_j))
+
+            # only continue with the elements that have not converged,
+            # keeping the ionised fractions of those that have
+            if np.any(converged):
+                done = index[converged]
+                for n, guess in enumerate(guesses):
+                    fractions[n][done] = guess[3][converged]
+                keep = ~converged
+                index = index[keep]
+                inputs = tuple(i[keep] for i in inputs)
+                guesses = [tuple(j[keep] for j in i) for i in guesses]
+                n_i = n_i[keep]
+
+        # and the last ionised fractions of those that have not
+        for n, guess in enumerate(guesses):
+            fractions[n][index] = guess[3]
+
+        # the carriers of the converged values
+        ionised = [np.copy(Na), np.copy(Nd)]
+        for (name, tpe, i), f in zip(dopants, fractions):
+            ionised[i] = f * ionised[i]
+        Na_i, Nd_i = ionised
+        ne, nh = self._carriers(Nd_i - Na_i, nxc, nieff, n_type)
+
+        return tuple(i.reshape(shape) for i in (ne, nh, Na_i, Nd_i, nieff))
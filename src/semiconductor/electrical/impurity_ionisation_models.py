@@ -3,7 +3,6 @@
 
 import numpy as np
 import scipy.constants as C
-import matplotlib.pylab as plt
 # from semiconductor.helper.helper import BaseModelClass
 # import dopant_ionisation_models
 # import semiconductor.material.bandgap_narrowing_models as Bgn
@@ -23,8 +22,8 @@ def complete(values, N_imp, *args):
 
 def E_dop(values, Ni, dopant):
     '''retuns the Dopant energy level in eV'''
-    return values['e_dop0_' + dopant] / (
-        1. + (Ni / values['n_ref_' + dopant])**values['c_' + dopant])
+    return values['E_dop0_' + dopant] / (
+        1. + (Ni / values['N_ref_' + dopant])**values['c_' + dopant])
 
 
 # def delta():
@@ -34,15 +33,15 @@ def E_dop(values, Ni, dopant):
 
 def b(values, Ni, dopant):
     '''fration of carriers in localised states'''
-    return 1. / (1. + (Ni / values['n_b_' + dopant])**values['d_' + dopant])
+    return 1. / (1. + (Ni / values['N_b_' + dopant])**values['d_' + dopant])
 
 
 def altermatt_2006(values, N_impurity, ne, nh, T, Nc, Nv, dopant):
     '''
     This function returns the fraction of ionisated dopants.
-    Dopant ionisation of single doped material
-    One exists for co doped material, its just not
-    put together
+    Dopant ionisation of single doped material. For co doped
+    material, it is solved for each dopant with charge neutrality by
+    Ionisation.charge_neutrality
     '''
 
     vt = C.k * T / C.e
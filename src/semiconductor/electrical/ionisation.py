@@ -2,14 +2,13 @@
 # UTF-8
 
 import numpy as np
-import matplotlib.pylab as plt
 import os
 
-from semiconductor.helper.helper import BaseModelClass
+from semiconductor.helper.helper import BaseModelClass, _token
 from . import impurity_ionisation_models as IIm
 from semiconductor.material.densityofstates import DOS
-from semiconductor.general_functions import carrierfunctions
-from semiconductor.general_functions import carrierfunctions as CF
+from semiconductor.material.intrinsic_carrier_density import IntrinsicCarrierDensity as NI
+from semiconductor.general_functions.solvers import bracketed_root
 
 
 class Ionisation(BaseModelClass):
@@ -23,8 +22,9 @@ class Ionisation(BaseModelClass):
     input
         material: (string)
             The elemental symbol for the material e.g 'Si'.
-        temp: (float)
-            The temperature of the sample in kelvin. This can not be an array.
+        temp: (float or numpy array)
+            The temperature of the sample in kelvin. This is broadcast
+            with the dopant and carrier densities.
         author: (string)
             The author of the ionisation model being used
         ni_author: (string)
@@ -68,6 +68,68 @@ class Ionisation(BaseModelClass):
                        temp=self._cal_dts['temp'],
                        author=None
                        )
+        # the density of states and intrinsic carrier density for each
+        # temperature and author
+        self._dos_cache = {}
+        self._ni_cache = {}
+
+    def _density_of_states(self):
+        '''
+        returns the density of states of the conduction and valance band
+        for the current model and temperature. These are only calculated
+        once for each temperature.
+        '''
+        if 'dos_author' not in self.vals.keys():
+            return 0, 0
+
+        key = (self._cal_dts['material'], self.vals['dos_author'],
+               _token(self._cal_dts['temp']))
+        if key not in self._dos_cache:
+            self._dos_cache[key] = self.Dos.update(
+                material=self._cal_dts['material'],
+                temp=self._cal_dts['temp'],
+                author=self.vals['dos_author'])
+        return self._dos_cache[key]
+
+    def _intrinsic_carrier_density(self):
+        '''
+        returns the intrinsic carrier density for the current ni author
+        and temperature. This is only calculated once for each.
+        '''
+        key = (self._cal_dts['material'], self._cal_dts['ni_author'],
+               _token(self._cal_dts['temp']))
+        if key not in self._ni_cache:
+            self._ni_cache[key] = NI(
+                material=self._cal_dts['material']).update(
+                author=self._cal_dts['ni_author'],
+                temp=self._cal_dts['temp'])
+        return self._ni_cache[key]
+
+    def broadcast_inputs(self, *values):
+        '''
+        Broadcasts values with the temperature, density of states and
+        intrinsic carrier density of the model, so each element can be
+        solved separately.
+
+        inputs:
+            values: (array like)
+                The values to broadcast, such as the dopant and excess
+                carrier densities
+
+        output:
+            shape: (tuple)
+                The broadcast shape
+            arrays: (list of array)
+                The flattened broadcast arrays of the values, followed by
+                temp, Nc, Nv and ni
+        '''
+        Nc, Nv = self._density_of_states()
+        values = values + (self._cal_dts['temp'], Nc, Nv,
+                           self._intrinsic_carrier_density())
+        values = [np.asarray(i, dtype=float) for i in values]
+
+        shape = np.broadcast_shapes(*[i.shape for i in values])
+        return shape, [np.broadcast_to(i, shape).reshape(-1) for i in values]
 
     def update(self, **kwargs):
         '''
@@ -97,13 +159,7 @@ class Ionisation(BaseModelClass):
             self.change_model(self._cal_dts['author'])
 
         # checks if and get the required density of states model
-        if 'dos_author' in self.vals.keys():
-            Nc, Nv = self.Dos.update(material=self._cal_dts['material'],
-                                     temp=self._cal_dts['temp'],
-                                     author=self.vals['dos_author']
-                                     )
-        else:
-            Nc, Nv = 0, 0
+        Nc, Nv = self._density_of_states()
 
         if self._cal_dts['impurity'] in self.vals.keys():
             # get the ionisation fraction
@@ -118,29 +174,43 @@ class Ionisation(BaseModelClass):
             print('''\nWarning:\n\t'''
                   '''No such impurity, please check your model'''
                   '''and spelling.\n\tReturning zero array\n''')
-            iN_imp = np.zeros(np.asarray(
-                self._cal_dts['N_imp']).flatten().shape[0])
+            iN_imp = np.zeros(np.shape(self._cal_dts['N_imp']))
 
         return iN_imp
 
-    def update_dopant_ionisation(self, N_dop, nxc, impurity, **kwargs):
+    def update_dopant_ionisation(self, N_dop, nxc, impurity, tol=1e-8,
+                                 max_iter=100, **kwargs):
         '''
         This is a special function used to determine the number of
         ionised dopants given a number of excess carriers, and a
         single dopant type.
 
+        The ionised dopants determine the carrier densities, which
+        determine the ionisation, so this is solved iteratively for the
+        ionised fraction with secant steps. Each element is iterated until
+        the change in its ionised fraction is less than tol, and the
+        iteration stops once all elements have converged, or after
+        max_iter iterations, when a warning with the number of elements
+        that did not converge is printed. The number of iterations used
+        is provided in self.iterations.
+
         inputs:
-            N_dop: (float; cm^-3)
+            N_dop: (array like; cm^-3)
                 The dopant density
-            nxc: (float; cm^-3)
+            nxc: (array like; cm^-3)
                 The excess carrier density
             impurity: (str)
                 The name of the dopant used e.g. boron, phosphorous. The
                 dopants available depend on the model used
+            tol: (float, optional)
+                The tolerance of the ionised fraction
+            max_iter: (int, optional)
+                The maximum number of iterations
 
         output:
-            N_idop: (float cm^-2)
-                The number of ionised dopants
+            N_idop: (array cm^-2)
+                The number of ionised dopants, with the broadcast shape of
+                N_dop, nxc and temp
         '''
 
         self.calculationdetails = kwargs
@@ -149,44 +219,199 @@ class Ionisation(BaseModelClass):
         if 'author' in kwargs.keys():
             self.change_model(self._cal_dts['author'])
 
-        if not isinstance(N_dop, np.ndarray):
-            N_dop = np.asarray([N_dop])
-
-        N_idop = np.copy(N_dop)
-
-        if impurity in self.vals.keys():
-            # TO DO, change this from just running 10 times to a proper check
-            for i in range(10):
-                if self.vals['tpe_' + self.vals[impurity]] == 'donor':
-                    Nd = np.copy(N_idop)
-                    Na = np.zeros(Nd.shape)
-                elif self.vals['tpe_' + self.vals[impurity]] == 'acceptor':
-                    Na = np.copy(N_idop)
-                    Nd = np.zeros(Na.shape)
-                else:
-                    print('something went wrong in ionisation model')
-
-                ne, nh = CF.get_carriers(
-                    Na,
-                    Nd,
-                    nxc,
-                    temp=self._cal_dts['temp'],
-                    material=self._cal_dts['material'],
-                    ni=self._cal_dts['ni_author'])
-
-                N_idop = self.update(
-                    N_imp=N_dop, ne=ne, nh=nh, impurity=impurity)
+        # these do not change during the iteration
+        shape, (N_dop, nxc, temp, Nc, Nv, ni) = self.broadcast_inputs(
+            N_dop, nxc)
 
-        else:
+        N_idop = np.copy(N_dop).reshape(shape)
+        self.iterations = 0
+
+        if impurity not in self.vals.keys():
             print(r'Not a valid impurity, returning 100% ionisation')
+            return N_idop
+
+        dopant = self.vals[impurity]
+        if self.vals['tpe_' + dopant] not in ['donor', 'acceptor']:
+            print('something went wrong in ionisation model')
+            return N_idop
+
+        donor = self.vals['tpe_' + dopant] == 'donor'
+
+        # the ionised fraction of each element
+        ionised = np.ones(N_dop.shape[0])
+
+        # the elements that have not converged, with their dopants, excess
+        # carriers, guess of the ionised fraction, and previous guess and
+        # residual for the secant step
+        index = np.arange(N_dop.shape[0])
+        N, dn, T, nc, nv, n_i = N_dop, nxc, temp, Nc, Nv, ni
+        fraction = np.ones(N.shape[0])
+        previous = np.ones(N.shape[0])
+        residual = np.zeros(N.shape[0])
+
+        while index.size > 0 and self.iterations < max_iter:
+            self.iterations += 1
+
+            # the carriers from the ionised dopants
+            N_i = fraction * N
+            maj = 0.5 * (N_i + np.sqrt(N_i**2 + 4. * n_i**2))
+            minority = n_i**2 / maj
+            if donor:
+                ne, nh = maj + dn, minority + dn
+            else:
+                ne, nh = minority + dn, maj + dn
+
+            new = getattr(IIm, self.model)(
+                self.vals, N, ne, nh, T, nc, nv, dopant) * np.ones(N.shape[0])
+            res = new - fraction
+
+            # a secant step on the residual, falling back to the fixed
+            # point step on the first iteration or if it leaves (0, 1]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                step = fraction - res * (fraction - previous) / (
+                    res - residual)
+            secant = (self.iterations > 1) & (step > 0) & (step <= 1)
+            step = np.where(secant, step, new)
+
+            ionised[index] = new
+            previous, residual, fraction = fraction, res, step
+
+            # only continue with the elements that have not converged
+            converged = np.abs(res) <= tol
+            if np.any(converged):
+                keep = ~converged
+                index, N, dn = index[keep], N[keep], dn[keep]
+                T, nc, nv, n_i = T[keep], nc[keep], nv[keep], n_i[keep]
+                fraction = fraction[keep]
+                previous = previous[keep]
+                residual = residual[keep]
+
+        if index.size > 0:
+            print('Warning: {0} ionised fractions did not converge within '
+                  '{1} iterations'.format(index.size, max_iter))
+
+        N_idop = (ionised * N_dop).reshape(shape)
 
         return N_idop
 
+    def ionised_fraction(self, impurity, tpe, N_imp, ne, nh, temp, Nc, Nv):
+        '''
+        Returns the ionised fraction of an impurity for given carrier
+        densities.
+
+        inputs:
+            impurity: (str)
+                The name of the impurity, e.g. boron
+            tpe: (str)
+                The type of the impurity, acceptor or donor
+            N_imp, ne, nh: (array like cm^-3)
+                The impurity, electron and hole densities
+            temp: (array like K)
+                The temperature
+            Nc, Nv: (array like cm^-3)
+                The effective density of states of the conduction and
+                valence bands
+
+        output:
+            fraction: (array or float)
+                The ionised fraction, which is 1 if the impurity is not in
+                the model or is not of the type tpe
+        '''
+        if (impurity not in self.vals.keys() or
+                self.vals['tpe_' + self.vals[impurity]] != tpe):
+            return 1.
+
+        return getattr(IIm, self.model)(
+            self.vals, N_imp, ne, nh, temp, Nc, Nv, self.vals[impurity])
+
+    def charge_neutrality(self, Na, Nd, nxc, acceptor='boron',
+                          donor='phosphorous', tol=1e-10, max_iter=200,
+                          **kwargs):
+        '''
+        Determines the carrier densities and ionised dopants of material
+        containing both acceptors and donors, by finding the Fermi level
+        for which the material is charge neutral.
+
+        With the Fermi level expressed as eta = (Ef - Ei) / kT, the
+        carriers are
+
+            ne = ni exp(eta) + nxc,  nh = ni exp(-eta) + nxc
+
+        and the charge neutrality condition
+
+            ni exp(eta) - ni exp(-eta) = Nd_i(ne, nh) - Na_i(ne, nh)
+
+        is monotonic in eta, so its root is found for all elements at once
+        between bounds set by the dopant densities.
+
+        inputs:
+            Na: (array like cm^-3)
+                The acceptor density
+            Nd: (array like cm^-3)
+                The donor density
+            nxc: (array like cm^-3)
+                The excess carrier density
+            acceptor: (str)
+                The name of the acceptor, e.g. boron
+            donor: (str)
+                The name of the donor, e.g. phosphorous
+            tol: (float, optional)
+                The tolerance of eta
+            max_iter: (int, optional)
+                The maximum number of iterations
+
+        output:
+            ne, nh, Na_i, Nd_i: (array cm^-3)
+                The electron and hole densities and the ionised acceptors
+                and donors, with the broadcast shape of Na, Nd, nxc and
+                temp. An impurity that is not in the model is taken
+                to be fully ionised.
+        '''
+        self.calculationdetails = kwargs
+
+        # a check to make sure the model hasn't changed
+        if 'author' in kwargs.keys():
+            self.change_model(self._cal_dts['author'])
+
+        shape, (Na, Nd, nxc, temp, Nc, Nv, ni) = self.broadcast_inputs(
+            Na, Nd, nxc)
+
+        for impurity in (acceptor, donor):
+            if impurity not in self.vals.keys():
+                print('Warning: {0} is not in the model {1}, it is taken '
+                      'as fully ionised'.format(impurity, self.model))
+
+        def ionised(eta, index):
+            ne = ni[index] * np.exp(eta) + nxc[index]
+            nh = ni[index] * np.exp(-eta) + nxc[index]
+            Na_i = Na[index] * self.ionised_fraction(
+                acceptor, 'acceptor', Na[index], ne, nh, temp[index],
+                Nc[index], Nv[index])
+            Nd_i = Nd[index] * self.ionised_fraction(
+                donor, 'donor', Nd[index], ne, nh, temp[index],
+                Nc[index], Nv[index])
+            return ne, nh, Na_i, Nd_i
+
+        def neutrality(eta, index):
+            ne, nh, Na_i, Nd_i = ionised(eta, index)
+            return (ne - nh) - (Nd_i - Na_i)
+
+        # at these bounds the carriers exceed all the dopants
+        eta, self.iterations = bracketed_root(
+            neutrality,
+            lower=-np.arcsinh(Na / 2. / ni) - 1.,
+            upper=np.arcsinh(Nd / 2. / ni) + 1.,
+            tol=tol, max_iter=max_iter)
+
+        return tuple(i.reshape(shape) for i in
+                     ionised(eta, np.arange(eta.shape[0])))
+
     def check_models(self):
         '''
         Plots a check of the modeled data against Digitised data from either
         papers or from other implementations of the model.
         '''
+        import matplotlib.pylab as plt
         plt.figure('Ionised impurities')
 
         iN_imp = N_imp = np.logspace(15, 20)
@@ -199,7 +424,7 @@ class Ionisation(BaseModelClass):
             iN_imp = self.update_dopant_ionisation(N_imp,
                                                    dn,
                                                    impurity,
-                                                   temp, author=None)
+                                                   temp=temp, author=None)
 
             if not np.all(iN_imp == 0):
                 plt.plot(
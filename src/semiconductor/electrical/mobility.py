@@ -3,7 +3,6 @@
 # encoding=utf8
 
 import numpy as np
-import matplotlib.pylab as plt
 import os
 
 try:
@@ -12,6 +11,7 @@ except:
     import configparser
 
 from . import mobilitymodels as model
+from .mobility_table import MobilityTable
 from semiconductor.general_functions.carrierfunctions import get_carriers
 
 from semiconductor.helper.helper import BaseModelClass
@@ -49,6 +49,7 @@ class Mobility(BaseModelClass):
     def __init__(self, **kwargs):
 
         self.author = None
+        self._table = None
         # update any values in _cal_dts
         # that are passed
         # print(self._cal_dts)
@@ -68,11 +69,50 @@ class Mobility(BaseModelClass):
         # initiate the first model
         self.change_model(self._cal_dts['author'])
 
-    def electron_mobility(self,  **kwargs):
+    def use_table(self, enable=True, **kwargs):
+        '''
+        Evaluates the mobilities from a precomputed table of the current
+        model, rather than the model itself. Values off the grid of the
+        table are calculated with the model. The table is built on first
+        use, and only saved to disk if save is passed, see MobilityTable.
+
+        inputs:
+            enable: (bool)
+                turns the use of a table on or off
+            kwargs: (optional)
+                the grid, type, tolerance and saving of the table,
+                passed to MobilityTable
+
+        output:
+            the table
+        '''
+        if enable:
+            self._table_settings = kwargs
+            self._table = MobilityTable(self, **kwargs)
+        else:
+            self._table = None
+
+        return self._table
+
+    def _get_table(self):
+        '''
+        returns the table, or None when not in use. The table is remade if
+        the model has changed
+        '''
+        if self._table is not None and (
+                self._table.model != self.model or
+                self._table.vals != self.vals):
+            self._table = MobilityTable(self, **self._table_settings)
+        return self._table
+
+    def electron_mobility(self, ne=None, nh=None, **kwargs):
         '''
         returns the electron mobility
 
         inputs:
+            ne, nh: (optional, array like cm^-3)
+                the number of electrons and holes. If not provided they
+                are calculated
             kwargs: (optinal)
                 any value with _cal_dts, for which the mobility depends on
 
@@ -83,16 +123,22 @@ class Mobility(BaseModelClass):
         if bool(kwargs):
             self.calculationdetails = kwargs
 
+        if ne is None and nh is None and self._get_table() is not None:
+            return self._carrier_mobilities()[0]
+
         return getattr(model, self.model)(
             self.vals, Na=self._cal_dts['Na'], Nd=self._cal_dts['Nd'],
             nxc=self._cal_dts['nxc'], carrier='electron',
-            temp=self._cal_dts['temp'])
+            temp=self._cal_dts['temp'], ne=ne, nh=nh)
 
-    def hole_mobility(self, **kwargs):
+    def hole_mobility(self, ne=None, nh=None, **kwargs):
         '''
         returns the hole mobility
 
         inputs:
+            ne, nh: (optional, array like cm^-3)
+                the number of electrons and holes. If not provided they
+                are calculated
             kwargs: (optinal)
                 any value with _cal_dts, for which the mobility depends on
 
@@ -103,10 +149,97 @@ class Mobility(BaseModelClass):
         if bool(kwargs):
             self.calculationdetails = kwargs
 
+        if ne is None and nh is None and self._get_table() is not None:
+            return self._carrier_mobilities()[1]
+
         return getattr(model, self.model)(
             self.vals, Na=self._cal_dts['Na'], Nd=self._cal_dts['Nd'],
             nxc=self._cal_dts['nxc'], carrier='hole',
-            temp=self._cal_dts['temp'])
+            temp=self._cal_dts['temp'], ne=ne, nh=nh)
+
+    def _carrier_mobilities(self, ne=None, nh=None):
+        '''
+        returns the electron and hole mobility from one evaluation of
+        the model, if the model provides this. If a table is in use and
+        the carriers are not provided, the table is used.
+        '''
+        table = self._get_table()
+        if table is not None and ne is None and nh is None:
+            return table.mobilities(
+                Na=self._cal_dts['Na'], Nd=self._cal_dts['Nd'],
+                nxc=self._cal_dts['nxc'], temp=self._cal_dts['temp'])
+
+        if ne is None or nh is None:
+            ne, nh = get_carriers(
+                Na=self._cal_dts['Na'],
+                Nd=self._cal_dts['Nd'],
+                nxc=self._cal_dts['nxc'],
+                temp=self._cal_dts['temp'])
+
+        func = getattr(model, self.model + '_both', None)
+
+        if func is not None:
+            mob_e, mob_h = func(
+                self.vals, Na=self._cal_dts['Na'], Nd=self._cal_dts['Nd'],
+                nxc=self._cal_dts['nxc'], temp=self._cal_dts['temp'],
+                ne=ne, nh=nh)
+        else:
+            mob_e = self.electron_mobility(ne=ne, nh=nh)
+            mob_h = self.hole_mobility(ne=ne, nh=nh)
+
+        return mob_e, mob_h
+
+    def both(self, ne=None, nh=None, ni_author=None, **kwargs):
+        '''
+        returns the electron, hole, sum of, and ambipolar mobility from
+        a single calculation of the carrier densities.
+
+        inputs:
+            ne, nh: (optional, array like cm^-3)
+                the number of electrons and holes. If not provided they
+                are calculated once and used for all the values.
+            ni_author: (optional, str)
+                an author for the intrinsic carrier density, used if the
+                carriers are calculated
+            kwargs: (optinal)
+                any value with _cal_dts, for which the mobility depends on
+
+        output:
+            mob_e, mob_h, mob_sum, mob_ambi in cm^2 V^-1 s^-1.
+            For models that only provide the sum, the others are None.
+        '''
+
+        if bool(kwargs):
+            self.calculationdetails = kwargs
+
+        if 'mobility_sum_only' in self.vals.keys():
+            return None, None, self.mobility_sum(), None
+
+        # the table is only for the carriers of the calculation details
+        table = self._get_table() if ne is None and nh is None else None
+
+        if ne is None or nh is None:
+            ne, nh = get_carriers(
+                Na=self._cal_dts['Na'],
+                Nd=self._cal_dts['Nd'],
+                nxc=self._cal_dts['nxc'],
+                temp=self._cal_dts['temp'],
+                material=self._cal_dts['material'],
+                ni_author=ni_author)
+
+        if table is not None:
+            # the carriers are only needed for values off the table
+            mob_e, mob_h = table.mobilities(
+                Na=self._cal_dts['Na'], Nd=self._cal_dts['Nd'],
+                nxc=self._cal_dts['nxc'], temp=self._cal_dts['temp'],
+                ne=ne, nh=nh)
+        else:
+            mob_e, mob_h = self._carrier_mobilities(ne=ne, nh=nh)
+
+        mob_sum = mob_e + mob_h
+        mob_ambi = (ne + nh) / (nh / mob_e + ne / mob_h)
+
+        return mob_e, mob_h, mob_sum, mob_ambi
 
     def mobility_sum(self,  **kwargs):
         '''
@@ -130,8 +263,8 @@ class Mobility(BaseModelClass):
                 nxc=self._cal_dts['nxc'],
                 temp=self._cal_dts['temp'])
         else:
-            mob_sum = self.hole_mobility() +\
-                self.electron_mobility()
+            mob_e, mob_h = self._carrier_mobilities()
+            mob_sum = mob_h + mob_e
 
         return mob_sum
 
@@ -149,26 +282,9 @@ class Mobility(BaseModelClass):
             ambipolar mobility in cm^2 V^-1 s^-1
         '''
 
-        if bool(kwargs):
-            self.calculationdetails = kwargs
-
-        # get the number of carriers
-        ne, nh = get_carriers(
-            Na=self._cal_dts['Na'],
-            Nd=self._cal_dts['Nd'],
-            nxc=self._cal_dts['nxc'],
-            temp=self._cal_dts['temp'],
-            material=self._cal_dts['material'],
-            ni_author=ni_author,
-            ni=9e9)
-
-        mob_h = self.hole_mobility()
-        mob_e = self.electron_mobility()
-
-        # caculate the ambipolar mobility according to
-        mob_ambi = (ne + nh) / (nh / mob_e + ne / mob_h)
-
-        return mob_ambi
+        # the carriers are calculated once, with the same intrinsic
+        # carrier density as the other values of both
+        return self.both(ni_author=ni_author, **kwargs)[3]
 
     def check_models(self):
         check_klaassen()
@@ -178,6 +294,7 @@ class Mobility(BaseModelClass):
 # these checks should not be here, but rather be in the models class
 def check_klaassen():
     '''compares to values taken from www.PVlighthouse.com.au'''
+    import matplotlib.pylab as plt
     a = Mobility('Si')
     a.change_model('klaassen1992')
 
@@ -225,6 +342,7 @@ def check_klaassen():
 
 def check_dorkel():
     '''compares to values taken from www.PVlighthouse.com.au'''
+    import matplotlib.pylab as plt
 
     a = Mobility('Si')
     a.change_model(author='dorkel1981')
@@ -0,0 +1,502 @@
+#!/usr/local/bin/python
+# UTF-8
+
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+
+from . import mobilitymodels as model
+from semiconductor.general_functions.carrierfunctions import get_carriers
+
+
+def cache_folder():
+    '''
+    returns the folder the tables are saved in. This can be set with the
+    environmental variable SEMICONDUCTOR_CACHE.
+    '''
+    return os.environ.get(
+        'SEMICONDUCTOR_CACHE',
+        os.path.join(os.path.expanduser('~'), '.cache', 'semiconductor'))
+
+
+def _cell(axis, even, x, dtype):
+    '''
+    returns the index of the lower edge of the cell of the values on the
+    axis, and their position in the cell as dtype, which is outside of 0
+    to 1 for values off the axis
+    '''
+    step = np.diff(axis)
+    if even:
+        # evenly spaced, so the cell is found directly
+        t = (np.asarray(x, dtype=dtype) - dtype.type(axis[0])) / dtype.type(
+            step[0])
+        # fmax and fmin keep the index of nan values on the grid
+        lower = np.fmin(np.fmax(np.floor(t), 0), axis.shape[0] - 2)
+        return lower.astype(np.intp), t - lower
+
+    i = np.clip(np.searchsorted(axis, x) - 1, 0, axis.shape[0] - 2)
+    return i, ((x - axis[i]) / step[i]).astype(dtype)
+
+
+def _corners(table):
+    '''
+    returns the stride of each axis of the table, and views of the
+    flattened table offset to every corner of a cell, ordered so that
+    pairs of corners differ along the last axis
+    '''
+    shape = table.shape
+    strides = np.cumprod((shape + (1,))[:0:-1])[::-1]
+    offsets = [sum(stride for dim, stride in enumerate(strides)
+                   if (corner >> (len(shape) - 1 - dim)) & 1)
+               for corner in range(2**len(shape))]
+
+    table = table.reshape(-1)
+    size = table.shape[0] - offsets[-1]
+    return strides, [table[i:i + size] for i in offsets]
+
+
+def multilinear(axes, tables, invalid=None):
+    '''
+    returns a function for the linear interpolation of a pair of tables
+    on a regular grid, which returns nan for points outside of the grid.
+
+    The pair is stored as the real and imaginary part of one complex
+    table, so both are taken and interpolated together. Views of the
+    flattened table are offset to every corner of a cell, so the values
+    at the corners of the cells are taken with the index of their lower
+    corner. Axes with a single value, such as a constant temperature,
+    are first interpolated over the whole table, which reduces the
+    number of corners of each point. The interpolation is calculated in
+    the type of the tables.
+
+    inputs:
+        axes: (list of arrays)
+            the increasing values of each axis of the tables
+        tables: (array)
+            the values on the grid, the first axis being the two tables
+        invalid: (array of bool, optional)
+            the cells, by their lower corner on the grid, that nan is
+            returned for
+
+    output:
+        a function of the points for each axis, each a float or an array,
+        broadcast together, returning an array of the values of both
+        tables at the points
+    '''
+    dtype = tables.dtype
+    table = np.empty(tables.shape[1:],
+                     dtype=np.result_type(dtype, np.complex64))
+    table.real, table.imag = tables
+    full = _corners(table)
+    even = [np.allclose(np.diff(axis), axis[1] - axis[0]) for axis in axes]
+
+    # the table reduced for the last single values
+    reduced = {}
+
+    def interpolate(points):
+        outside, flat, position = False, 0, []
+        located = [_cell(axis, e, x, dtype)
+                   for axis, e, x in zip(axes, even, points)]
+        single = [np.ndim(x) == 0 for x in points]
+        for (i, t), s in zip(located, single):
+            if s:
+                outside = outside | (t < 0) | (t > 1)
+
+        # reduce the table along the axes of single values, from the last
+        # so the position of the other axes is unchanged
+        key = tuple((int(i), float(t)) if s else None
+                    for (i, t), s in zip(located, single))
+        entry = reduced.get(key)
+        if entry is None:
+            values, cells = table, invalid
+            for dim in range(len(axes))[::-1]:
+                if single[dim]:
+                    i, t = located[dim]
+                    lower = (slice(None),) * dim + (int(i),)
+                    upper = (slice(None),) * dim + (int(i) + 1,)
+                    values = values[lower] + dtype.type(t) * (
+                        values[upper] - values[lower])
+                    if cells is not None:
+                        cells = cells[lower]
+            if cells is not None:
+                cells = cells.reshape(-1)
+            corners = full if not any(single) or all(single) else _corners(
+                values)
+            entry = values, cells, corners
+            reduced.clear()
+            reduced[key] = entry
+        values, cells, (strides, views) = entry
+
+        if all(single):
+            values = np.asarray(values)
+            if cells is not None:
+                outside = outside | cells[0]
+        else:
+            # the points are located on their own shape, and only the
+            # index and corners are broadcast
+            located = [i for i, s in zip(located, single) if not s]
+            for (i, t), stride in zip(located, strides):
+                flat = flat + i * stride
+                position.append(t)
+                outside = outside | (t < 0) | (t > 1)
+
+            corners = [view.take(flat) for view in views]
+            for t in position[::-1]:
+                corners = [a + t * (b - a)
+                           for a, b in zip(corners[::2], corners[1::2])]
+            values = corners[0]
+
+            if cells is not None:
+                outside = outside | cells.take(flat)
+
+        result = np.empty((2,) + values.shape)
+        result[0], result[1] = values.real, values.imag
+        result[:, np.broadcast_to(outside, values.shape)] = np.nan
+        return result
+
+    return interpolate
+
+
+class MobilityTable():
+    '''
+    A precomputed table of the electron and hole mobility of a mobility
+    model, sampled on a log spaced (Na, Nd, nxc) grid for one or several
+    temperatures.
+
+    Values are found by linear interpolation of the log of the mobility
+    in log(N + offset) space, so zero doping or excess carriers are on the
+    grid. Points outside of the grid are calculated with the model. The
+    interpolation does not need the carrier densities, and is calculated
+    in the type of the table, so it is cheaper than the model. Inputs of
+    a single value, such as the temperature, are interpolated once for
+    the whole table. For points scattered over a table of several
+    temperatures, the interpolation is limited by memory access, and can
+    be slower than the model.
+
+    The table is calculated on first use. If save is set, it is saved to
+    disk for each author and hash of its parameters and grid, so it is
+    only calculated once.
+
+    The interpolation error is largest for heavily doped compensated
+    material, where the carrier densities change quickly with Na - Nd,
+    and refining the grid reduces it slowly. So when the table is built,
+    it is compared to the model at the centre of each cell of the grid,
+    and values in cells whose relative error is larger than 80 % of the
+    tolerance are calculated with the model. The maximum relative error of the
+    table against the model, at random points in the grid, is then
+    provided in max_error. If this is larger than the tolerance, a
+    warning is printed and the model is used rather than the table.
+
+    inputs:
+        mobility: (Mobility)
+            the mobility class, whose current model is tabulated
+        N_range: (tuple cm^-3)
+            the maximum dopant density of the grid, and the offset
+        nxc_range: (tuple cm^-3)
+            the maximum excess carrier density of the grid, and the offset
+        temp: (float or array like, optional)
+            the temperatures of the grid. Defaults to the mobility's
+            current temperature
+        points_per_decade: (int)
+            the number of grid points per decade
+        dtype: (str)
+            the type the table is stored and interpolated as, float32 or
+            float64. float64 is slower, and does not reduce the error of
+            the interpolation
+        tolerance: (float)
+            the relative error, above which the model is used rather
+            than the table
+        save: (bool)
+            if the table is saved to, and read from, disk, in the folder
+            of cache_folder
+    '''
+
+    # the fraction of the tolerance the error at the centre of a cell
+    # must be within for the cell to be used
+    _margin = 0.8
+
+    # tables that have been built this process, by hash
+    _tables = {}
+    _lock = threading.Lock()
+
+    def __init__(self, mobility, N_range=(1e21, 1e10), nxc_range=(1e20, 1e8),
+                 temp=None, points_per_decade=8, dtype='float32',
+                 tolerance=1e-2, save=False):
+
+        if 'mobility_sum_only' in mobility.vals.keys():
+            raise ValueError(
+                'The model {0} only provides the sum of the mobilities, '
+                'and can not be tabulated'.format(mobility.model))
+
+        self.model = mobility.model
+        self.vals = mobility.vals.copy()
+        self.author = mobility.calculationdetails['author']
+        self.material = mobility.calculationdetails['material']
+
+        if temp is None:
+            temp = mobility.calculationdetails['temp']
+        self.temp = np.unique(np.asarray(temp, dtype=float))
+
+        self.N_range = N_range
+        self.nxc_range = nxc_range
+        self.points_per_decade = points_per_decade
+        self.dtype = np.dtype(dtype).name
+        self.tolerance = tolerance
+        self.save = save
+
+        self.max_error = None
+        self.use_model = False
+        self._interpolator = None
+
+    @property
+    def hash(self):
+        '''
+        a hash of the parameters, grid and interpolation of the table
+        '''
+        details = {
+            'model': self.model,
+            'vals': dict(self.vals),
+            'material': self.material,
+            'temp': self.temp.tolist(),
+            'N_range': self.N_range,
+            'nxc_range': self.nxc_range,
+            'points_per_decade': self.points_per_decade,
+            'dtype': self.dtype,
+            'tolerance': self.tolerance,
+        }
+        return hashlib.sha1(json.dumps(
+            details, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+    @property
+    def fname(self):
+        return os.path.join(cache_folder(), 'mobility_{0}_{1}.npz'.format(
+            self.author, self.hash))
+
+    def _axis(self, maximum, offset):
+        # the grid in log(N + offset), starting at N = 0
+        decades = np.log10(maximum + offset) - np.log10(offset)
+        return np.linspace(np.log10(offset), np.log10(maximum + offset),
+                           int(np.ceil(decades * self.points_per_decade)) + 1)
+
+    def _grid(self):
+        axes = [self._axis(*self.N_range),
+                self._axis(*self.N_range),
+                self._axis(*self.nxc_range)]
+        if self.temp.shape[0] > 1:
+            axes.append(np.log10(self.temp))
+        return axes
+
+    def _model(self, Na, Nd, nxc, temp, ne=None, nh=None):
+        '''
+        the electron and hole mobility from the model, calculating the
+        carriers if they are not provided
+        '''
+        if ne is None or nh is None:
+            ne, nh = get_carriers(Na=Na, Nd=Nd, nxc=nxc, temp=temp)
+
+        func = getattr(model, self.model + '_both', None)
+        if func is not None:
+            return func(self.vals, Na=Na, Nd=Nd, nxc=nxc, temp=temp,
+                        ne=ne, nh=nh)
+
+        return [getattr(model, self.model)(
+            self.vals, Na=Na, Nd=Nd, nxc=nxc, temp=temp, carrier=carrier,
+            ne=ne, nh=nh) for carrier in ('electron', 'hole')]
+
+    def _calculate(self, axes):
+        '''
+        calculates the log of the mobilities on the grid
+        '''
+        Na, Nd, nxc = np.meshgrid(
+            10**axes[0] - self.N_range[1],
+            10**axes[1] - self.N_range[1],
+            10**axes[2] - self.nxc_range[1],
+            indexing='ij')
+        shape = Na.shape
+
+        table = np.empty((2,) + shape + (self.temp.shape[0],))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for i, temp in enumerate(self.temp):
+                mob_e, mob_h = self._model(
+                    Na.flatten(), Nd.flatten(), nxc.flatten(), temp)
+                table[0, ..., i] = np.log(mob_e).reshape(shape)
+                table[1, ..., i] = np.log(mob_h).reshape(shape)
+
+        if self.temp.shape[0] == 1:
+            table = table[..., 0]
+
+        return table.astype(self.dtype)
+
+    def _invalid_cells(self, axes, table, interpolator):
+        '''
+        returns the cells of the grid, by their lower corner, whose
+        relative error at their centre is larger than the tolerance, less
+        a margin, as the error elsewhere in the cell can be larger
+        '''
+        centres = [(axis[1:] + axis[:-1]) / 2. for axis in axes]
+        points = [i.flatten() for i in np.meshgrid(*centres, indexing='ij')]
+        if len(axes) > 3:
+            temps = 10**points[3]
+        else:
+            temps = np.full(points[0].shape, self.temp[0])
+
+        Na = 10**points[0] - self.N_range[1]
+        Nd = 10**points[1] - self.N_range[1]
+        nxc = 10**points[2] - self.nxc_range[1]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            exact = self._model(Na, Nd, nxc, temps)
+            approx = np.exp(interpolator(points))
+            error = np.max([np.abs(b - a) / a
+                            for a, b in zip(exact, approx)], axis=0)
+
+        invalid = np.zeros(table.shape[1:], dtype=bool)
+        invalid[tuple(slice(0, -1) for i in axes)] = (
+            error > self._margin * self.tolerance).reshape(
+                [i.shape[0] for i in centres])
+        return invalid
+
+    def _check_error(self, samples=20000):
+        '''
+        the maximum relative error of the table, found at random points
+        inside the grid
+        '''
+        rng = np.random.RandomState(0)
+        axes = self._grid()
+
+        points = [rng.uniform(axis[0], axis[-1], samples) for axis in axes]
+        if len(axes) > 3:
+            temps = 10**points[3]
+        else:
+            temps = np.full(samples, self.temp[0])
+
+        Na = 10**points[0] - self.N_range[1]
+        Nd = 10**points[1] - self.N_range[1]
+        nxc = 10**points[2] - self.nxc_range[1]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            exact = self._model(Na, Nd, nxc, temps)
+        approx = self._interpolate(Na, Nd, nxc, temps)
+
+        # the cells that use the model have no error
+        error = 0
+        for a, b in zip(exact, approx):
+            index = np.isfinite(b)
+            if np.any(index):
+                error = max(error, np.max(
+                    np.abs(b[index] - a[index]) / a[index]))
+        return error
+
+    def build(self):
+        '''
+        loads the table from the cache, or calculates it if not
+        available
+        '''
+        key = self.hash
+        with self._lock:
+            if key not in self._tables:
+                fname = self.fname
+                if self.save and os.path.isfile(fname):
+                    data = np.load(fname)
+                    table, invalid, max_error = (
+                        data['table'], data['invalid'],
+                        float(data['max_error']))
+                else:
+                    table = self._calculate(self._grid())
+                    invalid, max_error = None, None
+                self._tables[key] = [table, invalid, max_error]
+
+            table, invalid, max_error = self._tables[key]
+
+        axes = self._grid()
+        if invalid is None:
+            invalid = self._invalid_cells(
+                axes, table, multilinear(axes, table))
+
+        self._interpolator = multilinear(axes, table, invalid)
+
+        if max_error is None:
+            max_error = self._check_error()
+            with self._lock:
+                self._tables[key][1:] = [invalid, max_error]
+            if self.save:
+                if not os.path.isdir(cache_folder()):
+                    os.makedirs(cache_folder())
+                np.savez_compressed(self.fname, table=table,
+                                    invalid=invalid, max_error=max_error)
+
+        self.use_model = max_error > self.tolerance
+        if self.use_model:
+            print('Warning: the mobility table has a maximum relative error '
+                  'of {0:.2g}, larger than its tolerance of {1:.2g}, so the '
+                  'model is used'.format(max_error, self.tolerance))
+
+        self.max_error = max_error
+        return self
+
+    def _interpolate(self, Na, Nd, nxc, temp):
+        points = [np.log10(Na + self.N_range[1]),
+                  np.log10(Nd + self.N_range[1]),
+                  np.log10(nxc + self.nxc_range[1])]
+        if self.temp.shape[0] > 1:
+            points.append(np.log10(temp))
+
+        return np.exp(self._interpolator(points))
+
+    def mobilities(self, Na, Nd, nxc, temp, ne=None, nh=None):
+        '''
+        returns the electron and hole mobility
+
+        inputs:
+            Na, Nd, nxc: (array like cm^-3)
+                the acceptor, donor and excess carrier densities
+            temp: (float or array like K)
+                the temperature
+            ne, nh: (optional, array like cm^-3)
+                the number of electrons and holes, only used for the
+                values calculated with the model. If not provided they
+                are calculated for those values.
+
+        All the inputs are broadcast together, as for the model.
+
+        output:
+            the electron and hole mobility in cm^2 V^-1 s^-1
+        '''
+        if self._interpolator is None:
+            self.build()
+
+        if self.use_model:
+            return self._model(Na, Nd, nxc, temp, ne=ne, nh=nh)
+
+        carriers = () if ne is None or nh is None else (ne, nh)
+        values = [np.asarray(i, dtype=float)
+                  for i in (Na, Nd, nxc, temp) + carriers]
+        shape = np.broadcast_shapes((1,), *[i.shape for i in values])
+
+        # single values are kept as floats, so are interpolated once, and
+        # arrays are interpolated on their own shape then broadcast
+        Na, Nd, nxc, temp = [i.reshape(-1)[0] if i.size == 1 else i
+                             for i in values[:4]]
+        mob = self._interpolate(Na, Nd, nxc, temp)
+        if mob.shape[1:] != shape:
+            mob = np.array([np.broadcast_to(i, shape) for i in mob])
+        mob_e, mob_h = mob
+
+        # use the model for values off the grid, and other temperatures
+        # than that of a table of one temperature
+        index = np.isnan(mob_e) | np.isnan(mob_h)
+        if self.temp.shape[0] == 1:
+            index |= temp != self.temp[0]
+        if np.any(index):
+            Na, Nd, nxc, temp = [np.broadcast_to(i, shape)[index]
+                                 for i in (Na, Nd, nxc, temp)]
+            if carriers:
+                ne, nh = [np.broadcast_to(i, shape)[index]
+                          for i in values[4:]]
+            mob_e[index], mob_h[index] = self._model(
+                Na, Nd, nxc, temp, ne=ne, nh=nh)
+
+        return mob_e, mob_h
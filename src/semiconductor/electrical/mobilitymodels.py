@@ -2,6 +2,7 @@
 # UTF-8
 
 import numpy as np
+import sys
 from semiconductor.general_functions import carrierfunctions as GF
 
 
@@ -19,12 +20,12 @@ def dannhauser(vals, Na, Nd, nxc, **kwargs):
     return the sum of the carrier mobility
     This was taken from a Sinton Instruments excel work sheet from 2010
     '''
-    doping = np.amax([Na, Nd])
-    sum_mu = vals['mob_sum'] * (
-        1. + 10**(vals['power'] * np.log10((nxc + doping) / vals['ni2'])
+    doping = np.maximum(Na, Nd)
+    sum_mu = vals.mob_sum * (
+        1. + 10**(vals.power * np.log10((nxc + doping) / vals.ni2)
                   )) / (
-        1. + vals['coef'] * 10**(
-            vals['power'] * np.log10((nxc + doping) / vals['ni2'])
+        1. + vals.coef * 10**(
+            vals.power * np.log10((nxc + doping) / vals.ni2)
         ))
 
     return sum_mu
@@ -46,18 +47,21 @@ def CaugheyThomas(vals, Na, Nd, nxc, **kwargs):
 
     '''
     impurity = Na, Nd
-    mu = vals['mu_min'] + (vals['mu_max'] - vals['mu_min']
-                           ) / (1. + (impurity / vals['nr'])**vals['alpha'])
+    mu = vals.mu_min + (vals.mu_max - vals.mu_min
+                        ) / (1. + (impurity / vals.nr)**vals.alpha)
     return mu
 
 
-def dorkel(vals, Na, Nd, nxc, temp, carrier, **kwargs):
+def dorkel(vals, Na, Nd, nxc, temp, carrier, ne=None, nh=None, **kwargs):
     '''
     inputs:
         impurty: the number of impurities (cm^-3)
         min_carr_den: the number of minoirty carrier densities (cm^-3)
         maj_car_den: the number of majority carrier densities (cm^-3)
         temp: temperature (K)
+        ne, nh: (optional)
+            the number of electrons and holes, if not provided they are
+            calculated
     output:
          electron mobility (cm^2 V^-1 s^-1)
          hole mobility (cm^2 V^-1 s^-1)
@@ -65,20 +69,16 @@ def dorkel(vals, Na, Nd, nxc, temp, carrier, **kwargs):
 
     impurity = Na + Nd
 
-    ne, nh = GF.get_carriers(Na,
-                             Nd,
-                             nxc,
-                             temp=temp)
+    if ne is None or nh is None:
+        ne, nh = GF.get_carriers(Na,
+                                 Nd,
+                                 nxc,
+                                 temp=temp)
     # print Na, Nd, nxc, temp
 
-    if np.all(nh < ne):
-        nxc = nh
-        maj_car_den = ne
-    elif np.all(nh >= ne):
-        maj_car_den = nh
-        nxc = ne
-    else:
-        sys.exit("Mixed doping types not permitted")
+    # the majority and minority carriers are chosen for each element
+    maj_car_den = np.maximum(ne, nh)
+    nxc = np.minimum(ne, nh)
 
     # this relates the carrier to the extension in the variable name
     if carrier == 'electron':
@@ -109,8 +109,8 @@ def lattice_mobility(vals, temp, carrier):
     '''
     due to scattering of acoustic phonons
     '''
-    mu_L = vals['mul0' + carrier] * \
-        (temp / vals['temp0'])**(-vals['alpha' + carrier])
+    c = vals.carriers[carrier]
+    mu_L = c.mul0 * (temp / vals.temp0)**(-c.alpha)
     return mu_L
 
 
@@ -124,10 +124,10 @@ def impurity_mobility(vals, impurity, temp, carrier):
     Herring
     '''
 
-    A = np.log(1. + vals['b' + carrier] * temp**2 / impurity)
-    B = (vals['b' + carrier] * temp ** 2.) / \
-        (impurity + vals['b' + carrier] * temp**2)
-    mu_i = vals['a' + carrier] * temp**(3. / 2) / impurity / (A - B)
+    c = vals.carriers[carrier]
+    A = np.log(1. + c.B * temp**2 / impurity)
+    B = (c.B * temp ** 2.) / (impurity + c.B * temp**2)
+    mu_i = c.A * temp**(3. / 2) / impurity / (A - B)
     return mu_i
 
 
@@ -150,7 +150,8 @@ def carrier_scattering_mobility(vals, nxc, maj_car_den, temp):
 
 # below this are the functions for klaassen's model
 
-def unified_mobility(vals, Na, Nd, nxc, temp, carrier, **kwargs):
+def unified_mobility(vals, Na, Nd, nxc, temp, carrier, ne=None, nh=None,
+                     **kwargs):
     """
     Thaken from:
 
@@ -200,20 +201,128 @@ def unified_mobility(vals, Na, Nd, nxc, temp, carrier, **kwargs):
     # Things to fix up
     # ni = ni
 
-    # the only thing ni is used for, this can be factored out so these values
-    # are passed to this function
+    # the only thing ni is used for, the carriers can also be passed
+    # to this function
+    if ne is None or nh is None:
+        ne, nh = GF.get_carriers(Na=Na,
+                                 Nd=Nd,
+                                 nxc=nxc,
+                                 temp=temp)
 
-    ne, nh = GF.get_carriers(Na=Na,
-                             Nd=Nd,
-                             nxc=nxc,
-                             temp=temp)
+    return unified_mobility_kernel(vals, Na, Nd, ne, nh, temp,
+                                   carriers=(carrier,))[0]
 
-    return 1. / (
-        1. / uDCS(carrier, vals, nh, ne, Na, Nd, temp) +
-        1. / uLS(carrier, vals, temp))
+
+def unified_mobility_both(vals, Na, Nd, nxc, temp, ne=None, nh=None,
+                          **kwargs):
+    """
+    Klaassen's unified mobility model for both carriers from one
+    evaluation. See unified_mobility.
+
+    output:
+        the electron and hole mobility (cm^2 V^-1 s^-1)
+    """
+    if ne is None or nh is None:
+        ne, nh = GF.get_carriers(Na=Na,
+                                 Nd=Nd,
+                                 nxc=nxc,
+                                 temp=temp)
+
+    return unified_mobility_kernel(vals, Na, Nd, ne, nh, temp,
+                                   carriers=('e', 'h'))
 
 
-def unified_mobility_compensated(vals, Na, Nd, nxc, temp, carrier, **kwargs):
+def unified_mobility_kernel(vals, Na, Nd, ne, nh, temp, carriers=('e', 'h')):
+    """
+    A single pass evaluation of Klaassen's unified mobility model for
+    several carriers at once.
+
+    This provides the same values as 1 / (1 / uDCS + 1 / uLS), but each
+    intermediate (Z, Nsc, P, G, F, Nsceff) is calculated once, and the
+    terms that do not depend on the carrier are shared between the
+    electrons and holes.
+
+    inputs:
+        vals: (dic)
+            the model parameters
+        Na, Nd: (array like cm^-3)
+            the number of acceptor and donor dopants
+        ne, nh: (array like cm^-3)
+            the number of electrons and holes
+        temp: (array like K)
+            the temperature
+        carriers: (tuple)
+            the carriers to calculate, any of 'e' and 'h'
+
+    output:
+        a list of the mobility for each carrier in cm^2 V^-1 s^-1
+    """
+    switch = {'e': 'h', 'h': 'e'}
+
+    Na = np.atleast_1d(np.asarray(Na, dtype=float))
+    Nd = np.atleast_1d(np.asarray(Nd, dtype=float))
+
+    # the clustering factors
+    ce, ch = vals.carriers['e'], vals.carriers['h']
+    with np.errstate(divide='ignore'):
+        Z_e = np.where(Nd == 0, 1., 1. + 1. / (ce.c + (ce.nref2 / Nd)**2.))
+        Z_h = np.where(Na == 0, 1., 1. + 1. / (ch.c + (ch.nref2 / Na)**2.))
+
+    # values shared by both carriers
+    NdZ = Nd * Z_e
+    NaZ = Na * Z_h
+    carrier_sum = nh + ne
+    PCW_temp = (temp / 300.)**(3.)
+    PBH_temp = (temp / 300.0)**2.0
+
+    mobilities = []
+    for c in carriers:
+        # the opposite carrier's density
+        car_den = {'e': nh, 'h': ne}[c]
+        p = vals.carriers[c]
+        mr = p.mr
+        mr_ratio = mr / vals.carriers[switch[c]].mr
+        umax = p.umax
+        umin = p.umin
+        alpha = p.alpha
+
+        nsc = NdZ + (NaZ + car_den)
+
+        # the screening parameter
+        PCW = 3.97e13 * (1. / (nsc) * PCW_temp)**(2. / 3.)
+        PBH = 1.36e20 / carrier_sum * (mr * PBH_temp)
+        P = 1. / (vals.fcw / PCW + vals.fbh / PBH)
+
+        # minority impurity scattering
+        G = 1. + - vals.s1 / \
+            (vals.s2 + (temp / 300. / mr) ** vals.s4 * P)**vals.s3 + \
+            vals.s5 / ((300. / temp / mr)**vals.s7 * P)**vals.s6
+
+        # electron-hole scattering
+        P_r6 = P**vals.r6
+        F = (vals.r1 * P_r6 + vals.r2 + vals.r3 * mr_ratio) / (
+            P_r6 + vals.r4 + vals.r5 * mr_ratio)
+
+        # only the minority dopant is scaled by G
+        if c == 'e':
+            nsceff = G * NaZ + NdZ + car_den / F
+        else:
+            nsceff = NaZ + G * NdZ + car_den / F
+
+        un = umax ** 2 / (umax - umin) * (temp / 300.)**(3. * alpha - 1.5)
+        uc = umin * umax / (umax - umin) * (300. / temp)**0.5
+
+        uDCS = un * nsc / nsceff * (p.nref / nsc)**(alpha) + \
+            (uc * carrier_sum / nsceff)
+        uLS = umax * (300. / temp)**p.theta
+
+        mobilities.append(1. / (1. / uDCS + 1. / uLS))
+
+    return mobilities
+
+
+def unified_mobility_compensated(vals, Na, Nd, nxc, temp, carrier, ne=None,
+                                 nh=None, **kwargs):
     """
     Thaken from:
 
@@ -263,13 +372,13 @@ def unified_mobility_compensated(vals, Na, Nd, nxc, temp, carrier, **kwargs):
     # Things to fix up
     # ni = ni
 
-    # the only thing ni is used for, this can be factored out so these values
-    # are passed to this function
-
-    ne, nh = GF.get_carriers(Na=Na,
-                             Nd=Nd,
-                             nxc=nxc,
-                             temp=temp)
+    # the only thing ni is used for, the carriers can also be passed
+    # to this function
+    if ne is None or nh is None:
+        ne, nh = GF.get_carriers(Na=Na,
+                                 Nd=Nd,
+                                 nxc=nxc,
+                                 temp=temp)
 
     return 1. / (
         1. / uDCS(carrier, vals, nh, ne, Na, Nd, temp) +
@@ -277,21 +386,22 @@ def unified_mobility_compensated(vals, Na, Nd, nxc, temp, carrier, **kwargs):
 
 
 def uLS(carrier, vals, temp):
-
-    return vals['umax_' + carrier] * (300. / temp)**vals['theta_' + carrier]
+    c = vals.carriers[carrier]
+    return c.umax * (300. / temp)**c.theta
 
 
 def uLS_compensated(carrier, vals, temp):
-    return vals['umax_' + carrier] * (300. / temp)**vals['theta_' + carrier] +\
-        vals['u_cor'] * np.exp((-temp / vals['t_cor'])**vals['theta_h_cor'])
+    c = vals.carriers[carrier]
+    return c.umax * (300. / temp)**c.theta +\
+        vals.u_cor * np.exp((-temp / vals.t_cor)**vals.theta_h_cor)
 
 
 def uDCS(carrier, vals, nh, ne, Na, Nd, temp):
+    c = vals.carriers[carrier]
     carrier_sum = nh + ne
     return un(carrier, vals, temp) * Nsc(carrier, vals, nh, ne, Na, Nd) / \
         Nsceff(carrier, vals, nh, ne, Na, Nd, temp) * (
-        vals['nref_' + carrier] / Nsc(carrier, vals, nh, ne, Na,
-                                      Nd))**(vals['alpha_' + carrier]) + \
+        c.nref / Nsc(carrier, vals, nh, ne, Na, Nd))**(c.alpha) + \
         (uc(carrier, vals, temp) * carrier_sum / Nsceff(carrier, vals, nh, ne,
                                                         Na, Nd, temp))
 
@@ -301,6 +411,7 @@ def uDCS_compensated(carrier, vals, nh, ne, Na, Nd, temp):
     A modifcation by Schindler that provides the mobility for compensated
     doped material.
     '''
+    c = vals.carriers[carrier]
     carrier_sum = nh + ne
 
     ne0, nh0 = GF.get_carriers(Na=Na,
@@ -308,10 +419,7 @@ def uDCS_compensated(carrier, vals, nh, ne, Na, Nd, temp):
                                nxc=0,
                                temp=300.)
 
-    C_l = (Na + Nd) / (nh0 + ne0)
-
-    if C_l < 1:
-        C_l = 1
+    C_l = np.maximum((Na + Nd) / (nh0 + ne0), 1)
 
     nsc = Nsc(carrier, vals, nh, ne, Na, Nd)
     nsceff = Nsceff(carrier, vals, nh, ne, Na, Nd, temp)
@@ -321,30 +429,30 @@ def uDCS_compensated(carrier, vals, nh, ne, Na, Nd, temp):
 
         def beta2():
             tref = 37.9 * np.log(
-                vals['cl_ref']**2 * (Na + Nd) / 1e19 + 3.6
+                vals.cl_ref**2 * (Na + Nd) / 1e19 + 3.6
             )
-            return 1 + 60. / np.sqrt(vals['cl_ref']) * \
+            return 1 + 60. / np.sqrt(vals.cl_ref) * \
                 np.exp(-(temp / tref + 1.18)**2)
 
         return un(carrier, vals, 300) * nsc / nsceff * (
-            (nsc / vals['nref_' + carrier])**(vals['alpha_' + carrier]) /
-            (temp / vals['temp_refc'])**(3 * vals['alpha_' + carrier] - 1.5) +
+            (nsc / c.nref)**(c.alpha) /
+            (temp / vals.temp_refc)**(3 * c.alpha - 1.5) +
             (
-                (C_l**beta2() - 1.) / vals['cl_ref'])**vals['beta1']
+                (C_l**beta2() - 1.) / vals.cl_ref)**vals.beta1
         )**(-1.) + \
             (uc(carrier, vals, 300) * carrier_sum / nsceff) *\
-            (vals['temp_refc'] / temp)**(0.5)
+            (vals.temp_refc / temp)**(0.5)
 
     def cal_min():
         return un(carrier, vals, 300) * nsc / nsceff * (
-            (nsc / vals['nref_' + carrier])**(vals['alpha_' + carrier]) /
-            (temp / vals['temp_refc'])**(3. * vals['alpha_' + carrier] - 1.5) +
+            (nsc / c.nref)**(c.alpha) /
+            (temp / vals.temp_refc)**(3. * c.alpha - 1.5) +
             (
-                ((Na + Nd) / vals['n_ref3']) *
-                (C_l - 1.) / vals['cl_ref'])**vals['beta1']
+                ((Na + Nd) / vals.n_ref3) *
+                (C_l - 1.) / vals.cl_ref)**vals.beta1
         )**(-1.) + \
             (uc(carrier, vals, 300) * carrier_sum / nsceff) * \
-            (vals['temp_refc'] / temp)**(0.5)
+            (vals.temp_refc / temp)**(0.5)
 
     mob = 1
 
@@ -352,12 +460,8 @@ def uDCS_compensated(carrier, vals, nh, ne, Na, Nd, temp):
     if carrier == 'e':
         mob = -1
 
-    # if the holes are larger at any point, assume
-    # they are the majority carriers
-    if np.any(nh * mob > ne * mob):
-        mob = cal_min()
-    else:
-        mob = cal_maj()
+    # where the holes are larger, they are the majority carriers
+    mob = np.where(nh * mob > ne * mob, cal_min(), cal_maj())
 
     return mob
 
@@ -366,9 +470,9 @@ def un(carrier, vals, temp):
     """
     majority dopant scattering (with screening)
     """
-    return vals['umax_' + carrier] ** 2 / (vals['umax_' + carrier] -
-                                           vals['umin_' + carrier]) * \
-        (temp / 300.)**(3. * vals['alpha_' + carrier] - 1.5)
+    c = vals.carriers[carrier]
+    return c.umax ** 2 / (c.umax - c.umin) * \
+        (temp / 300.)**(3. * c.alpha - 1.5)
 
 
 def Nsc(carrier, vals, nh, ne, Na, Nd):
@@ -414,11 +518,10 @@ def Z(carrier, vals, Na, Nd):
     """
     index = return_dopant(carrier, Na, Nd) == 0
 
-    z = 1. + 1. / (vals['c_' + carrier] +
-                   (vals['nref2_' + carrier] / return_dopant(carrier, Na,
-                                                             Nd))**2.)
-    z[index] = 1
-    return z
+    c = vals.carriers[carrier]
+    with np.errstate(divide='ignore'):
+        z = 1. + 1. / (c.c + (c.nref2 / return_dopant(carrier, Na, Nd))**2.)
+    return np.where(index, 1., z)
 
 
 def G(carrier, vals, nh, ne, Na, Nd, temp):
@@ -428,19 +531,19 @@ def G(carrier, vals, nh, ne, Na, Nd, temp):
 
     P_value = P(carrier, vals, nh, ne, Na, Nd, temp)
 
+    mr = vals.carriers[carrier].mr
+
     a = 1.
-    b = - vals['s1'] / \
-        (vals['s2'] + (temp / 300. / vals['mr_' + carrier]) ** vals['s4'] *
-         P_value)**vals['s3']
-    c = vals['s5'] / \
-        ((300. / temp /
-          vals['mr_' + carrier])**vals['s7'] * P_value)**vals['s6']
+    b = - vals.s1 / \
+        (vals.s2 + (temp / 300. / mr) ** vals.s4 * P_value)**vals.s3
+    c = vals.s5 / \
+        ((300. / temp / mr)**vals.s7 * P_value)**vals.s6
     return a + b + c
 
 
 def P(carrier, vals, nh, ne, Na, Nd, temp):
-    return 1. / (vals['fcw'] / PCW(carrier, vals, nh, ne, Na, Nd, temp) +
-                 vals['fbh'] / PBH(carrier, vals, temp, ne + nh))
+    return 1. / (vals.fcw / PCW(carrier, vals, nh, ne, Na, Nd, temp) +
+                 vals.fbh / PBH(carrier, vals, temp, ne + nh))
 
 
 def PCW(carrier, vals, nh, ne, Na, Nd, temp):
@@ -453,7 +556,7 @@ def PCW(carrier, vals, nh, ne, Na, Nd, temp):
 def PBH(carrier, vals, temp, carrier_sum):
     # Done
     return 1.36e20 / carrier_sum * (
-        vals['mr_' + carrier] * (temp / 300.0)**2.0)
+        vals.carriers[carrier].mr * (temp / 300.0)**2.0)
 
 
 def F(carrier, vals, nh, ne, Na, Nd, temp):
@@ -464,13 +567,13 @@ def F(carrier, vals, nh, ne, Na, Nd, temp):
     # uses Since True == 1 and False == 0 in python
 
     switch = {'e': 'h', 'h': 'e'}
+    mr_ratio = vals.carriers[carrier].mr / vals.carriers[switch[carrier]].mr
 
-    return (vals['r1'] * P(carrier, vals, nh, ne, Na, Nd, temp)**vals['r6'] +
-            vals['r2'] + vals['r3'] *
-            vals['mr_' + carrier] / vals['mr_' + switch[carrier]]
+    return (vals.r1 * P(carrier, vals, nh, ne, Na, Nd, temp)**vals.r6 +
+            vals.r2 + vals.r3 * mr_ratio
             ) / (
-        P(carrier, vals, nh, ne, Na, Nd, temp)**(vals['r6']) + vals['r4'] +
-        vals['r5'] * vals['mr_' + carrier] / vals['mr_' + switch[carrier]])
+        P(carrier, vals, nh, ne, Na, Nd, temp)**(vals.r6) + vals.r4 +
+        vals.r5 * mr_ratio)
 
 
 def uc(carrier, vals, temp):
@@ -478,8 +581,8 @@ def uc(carrier, vals, temp):
     excess carrier scattering
     """
 
-    return vals['umin_' + carrier] * vals['umax_' + carrier] / (
-        vals['umax_' + carrier] - vals['umin_' + carrier]) * (300. / temp)**0.5
+    c = vals.carriers[carrier]
+    return c.umin * c.umax / (c.umax - c.umin) * (300. / temp)**0.5
 
 
 def return_carrer(carrier, nh, ne, opposite=True):
@@ -498,8 +601,8 @@ def return_carrer(carrier, nh, ne, opposite=True):
 def return_dopant(carrier, Na, Nd):
 
     if carrier == 'h':
-        dopant = np.array([Na]).flatten()
+        dopant = np.atleast_1d(np.asarray(Na, dtype=float))
     elif carrier == 'e':
-        dopant = np.array([Nd]).flatten()
+        dopant = np.atleast_1d(np.asarray(Nd, dtype=float))
 
     return dopant
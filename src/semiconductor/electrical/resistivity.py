@@ -1,13 +1,12 @@
 
 import numpy as np
 import scipy.constants as const
-import scipy.optimize as opt
 
 from semiconductor.general_functions.carrierfunctions import get_carriers
 from semiconductor.material.intrinsic_carrier_density import IntrinsicCarrierDensity as ni
 from semiconductor.electrical.mobility import Mobility as Mob
 from semiconductor.electrical.ionisation import Ionisation as Ion
-from semiconductor.helper.helper import BaseModelClass
+from semiconductor.helper.helper import BaseModelClass, ResultCache, _token
 
 
 class Conductivity(BaseModelClass):
@@ -25,14 +24,22 @@ class Conductivity(BaseModelClass):
             The intrinsic carrier density to be used
         5. ionis_author (str)
             The author of a model to be used for dopant ionisation
-        6. dopant (str)
-            The elemental name for the dopants
-        7. nxc: (array like cm^-3)
+        6. nxc: (array like cm^-3)
             The number of excess carriers
-        8. Na: (array like cm^-3)
+        7. Na: (array like cm^-3)
             The number of acceptor dopants
-        9. Nd: (array like cm^-3)
+        8. Nd: (array like cm^-3)
             The number of donar dopants
+        9. acceptor, donor (str)
+            The elemental names of the acceptors and donors
+        10. dopant (str)
+            Deprecated, the elemental name of a dopant, which sets the
+            acceptor or donor by its type in the ionisation model
+
+    Each element with both acceptors and donors is solved for charge
+    neutrality, with the ionisation of both. For the other elements only
+    the ionisation of the dopant present is calculated, with the acceptor
+    or donor by the type of the element.
     '''
 
     _cal_dts = {
@@ -41,31 +48,73 @@ class Conductivity(BaseModelClass):
         'mob_author': None,
         'nieff_author': None,
         'ionis_author': None,
-        'dopant': 'boron',
+        'acceptor': 'boron',
+        'donor': 'phosphorous',
         'Na': 1e16,
         'Nd': 0,
         'nxc': 1e10,
         'resistivity': 1.
     }
 
+    # the linked models, and the calculation details they depend on
+    _link_graph = (
+        ('Mob', ('material', 'temp', 'mob_author')),
+        ('ni', ('material', 'temp', 'nieff_author')),
+        ('ion', ('material', 'temp', 'ionis_author', 'nieff_author')),
+        ('mob_ni', ('material', 'temp')),
+    )
+
     def __init__(self, **kwargs):
         self.calculationdetails = kwargs
 
-    def _update_links(self):
+    @BaseModelClass.calculationdetails.setter
+    def calculationdetails(self, kwargs):
+        '''
+        assigns the calculation details, with dopant, which was replaced
+        by acceptor and donor, set as the one of its type in the
+        ionisation model
+        '''
+        kwargs = dict(kwargs or {})
+        dopant = kwargs.pop('dopant', None)
+        BaseModelClass.calculationdetails.fset(self, kwargs)
 
-        # setting downstream values, this should change from initalisation
-        # to just updating through the update function
+        if dopant is not None:
+            self._update_links()
+            vals = self.ion.vals
+            tpe = vals.get('tpe_' + str(vals.get(dopant)))
+            if tpe not in ('acceptor', 'donor'):
+                raise ValueError(
+                    'The dopant {0} is not in the ionisation model '
+                    '{1}'.format(dopant, self.ion.model))
+
+            print('Warning: dopant is deprecated, use acceptor or donor. '
+                  '{0} is used as the {1}.'.format(dopant, tpe))
+            self._cal_dts[tpe] = dopant
+
+    def _build_Mob(self):
         self.Mob = Mob(material=self._cal_dts['material'],
                        author=self._cal_dts['mob_author'],
                        temp=self._cal_dts['temp'])
+
+    def _build_ni(self):
+        # the intrinsic carrier density, used for the carriers
         self.ni = ni(material=self._cal_dts['material'],
                      author=self._cal_dts['nieff_author'],
                      temp=self._cal_dts['temp'])
+        self._ni = self.ni.update()
+
+    def _build_ion(self):
         self.ion = Ion(material=self._cal_dts['material'],
                        author=self._cal_dts['ionis_author'],
                        ni_author=self._cal_dts['nieff_author'],
                        temp=self._cal_dts['temp'])
 
+    def _build_mob_ni(self):
+        # the default intrinsic carrier density, used for the carriers of
+        # the mobility models
+        self._mob_ni = ni(material=self._cal_dts['material'],
+                          temp=self._cal_dts['temp']).update()
+
     def query_used_authors(self):
         return self.Mob.model, self.ni.model, self.ion.model
 
@@ -74,39 +123,61 @@ class Conductivity(BaseModelClass):
         self.calculationdetails = kwargs
         self._update_links()
 
-        Nid, Nia = get_carriers(nxc=0,
-                                Na=self._cal_dts['Na'],
-                                Nd=self._cal_dts['Nd'],
-                                temp=self._cal_dts['temp'],
-                                ni_author=self._cal_dts['nieff_author']
-                                )
-
-        if np.all(Nid > Nia):
-            Nid = self.ion.update_dopant_ionisation(
-                N_dop=Nid,
-                nxc=self._cal_dts['nxc'],
-                impurity=self._cal_dts['dopant'])
-        elif np.all(Nia > Nid):
-            Nia = self.ion.update_dopant_ionisation(
-                N_dop=Nia,
-                nxc=self._cal_dts['nxc'],
-                impurity=self._cal_dts['dopant'])
-
-        ne, nh = get_carriers(
-            Na=Nia,
-            Nd=Nid,
-            nxc=self._cal_dts['nxc'],
-            temp=self._cal_dts['temp'],
-            ni_author=self._cal_dts['nieff_author']
-        )
-
+        Na, Nd, nxc = np.broadcast_arrays(
+            *[np.atleast_1d(np.asarray(self._cal_dts[i], dtype=float))
+              for i in ('Na', 'Nd', 'nxc')])
+        ne, nh = np.empty(Na.shape), np.empty(Na.shape)
+
+        # material with both dopants is solved for charge neutrality
+        both = (Na > 0) & (Nd > 0)
+        if np.any(both):
+            ne[both], nh[both] = self.ion.charge_neutrality(
+                Na=Na[both],
+                Nd=Nd[both],
+                nxc=nxc[both],
+                acceptor=self._cal_dts['acceptor'],
+                donor=self._cal_dts['donor'])[:2]
+
+        # else only the ionisation of the dopant present is needed
+        single = ~both
+        if np.any(single):
+            Nid, Nia = get_carriers(nxc=0,
+                                    Na=Na[single],
+                                    Nd=Nd[single],
+                                    temp=self._cal_dts['temp'],
+                                    ni=self._ni
+                                    )
+
+            for index, N_dop, impurity in (
+                    (Nid > Nia, Nid, self._cal_dts['donor']),
+                    (Nia > Nid, Nia, self._cal_dts['acceptor'])):
+                if np.any(index):
+                    N_dop[index] = self.ion.update_dopant_ionisation(
+                        N_dop=N_dop[index],
+                        nxc=nxc[single][index],
+                        impurity=impurity)
+
+            ne[single], nh[single] = get_carriers(
+                Na=Nia,
+                Nd=Nid,
+                nxc=nxc[single],
+                temp=self._cal_dts['temp'],
+                ni=self._ni
+            )
+
+        mob_ne, mob_nh = get_carriers(Na=self._cal_dts['Na'],
+                                      Nd=self._cal_dts['Nd'],
+                                      nxc=self._cal_dts['nxc'],
+                                      ni=self._mob_ni)
         mob_e = self.Mob.electron_mobility(nxc=self._cal_dts['nxc'],
                                            Na=self._cal_dts['Na'],
-                                           Nd=self._cal_dts['Nd']
+                                           Nd=self._cal_dts['Nd'],
+                                           ne=mob_ne, nh=mob_nh
                                            )
         mob_h = self.Mob.hole_mobility(nxc=self._cal_dts['nxc'],
                                        Na=self._cal_dts['Na'],
-                                       Nd=self._cal_dts['Nd'])
+                                       Nd=self._cal_dts['Nd'],
+                                       ne=mob_ne, nh=mob_nh)
 
         return const.e * (mob_e * ne + mob_h * nh)
 
@@ -135,14 +206,17 @@ class Resistivity(Conductivity):
             The intrinsic carrier density to be used
         5. ionis_author (str)
             The author of a model to be used for dopant ionisation
-        6. dopant (str)
-            The elemental name for the dopants
-        7. nxc: (array like cm^-3)
+        6. nxc: (array like cm^-3)
             The number of excess carriers
-        8. Na: (array like cm^-3)
+        7. Na: (array like cm^-3)
             The number of acceptor dopants
-        9. Nd: (array like cm^-3)
+        8. Nd: (array like cm^-3)
             The number of donar dopants
+        9. acceptor, donor (str)
+            The elemental names of the acceptors and donors
+        10. dopant (str)
+            Deprecated, the elemental name of a dopant, which sets the
+            acceptor or donor by its type in the ionisation model
     '''
 
     def calculate(self, **kwargs):
@@ -176,6 +250,8 @@ class DarkConductivity(BaseModelClass):
             The author of a model to be used for dopant ionisation
         6. dopant_type (str)
             The type of typnt n or p  
+        7. acceptor, donor (str)
+            The elemental names of the acceptor and donor
     '''
 
     _cal_dts = {
@@ -185,22 +261,45 @@ class DarkConductivity(BaseModelClass):
         'nieff_author': None,
         'ionis_author': None,
         'dopant_type': 'p',
+        'acceptor': 'boron',
+        'donor': 'phosphorous',
         'nxc': 1,
         'dark_resistivity': 1.
     }
 
+    # the tabulated conductivity, for the most recently used calculation
+    # details, and the range of doping and points per decade it is
+    # tabulated at
+    _tables = ResultCache(maxsize=32)
+    _table_range = (10, 21)
+    _table_points_per_decade = 10
+
+    # the linked models, and the calculation details they depend on
+    _link_graph = (
+        ('Mob', ('material', 'temp', 'mob_author')),
+        ('cond', ('material', 'temp', 'mob_author', 'nieff_author',
+                  'ionis_author', 'acceptor', 'donor')),
+    )
+
     def __init__(self, **kwargs):
         self.calculationdetails = kwargs
         self._update_links()
 
-    def _update_links(self):
-
-        # setting downstream values, this should change from initalisation
-        # to just updating through the update function
+    def _build_Mob(self):
         self.Mob = Mob(material=self._cal_dts['material'],
                        author=self._cal_dts['mob_author'],
                        temp=self._cal_dts['temp'])
 
+    def _build_cond(self):
+        self._cond = Conductivity(
+            material=self._cal_dts['material'],
+            temp=self._cal_dts['temp'],
+            mob_author=self._cal_dts['mob_author'],
+            nieff_author=self._cal_dts['nieff_author'],
+            ionis_author=self._cal_dts['ionis_author'],
+            acceptor=self._cal_dts['acceptor'],
+            donor=self._cal_dts['donor'])
+
     def query_used_authors(self):
         return self.Mob.model, self.ni.model, self.ion.model
 
@@ -212,49 +311,135 @@ class DarkConductivity(BaseModelClass):
 
         return self.dark_conductivity2doping(1. / dark_resistivity, **kwargs)
 
-    def dark_conductivity2doping(self, dark_conductivity, **kwargs):
+    def _conductivity_table(self):
+        '''
+        returns the log of the doping and dark conductivity, and the slope
+        of the conductivity with doping in log space, for the current
+        material, temperature, authors and dopant type. These are only
+        calculated once, and the tables of the most recently used
+        calculation details are kept.
+        '''
+        for name in ('temp', 'nxc'):
+            if np.size(self._cal_dts[name]) != 1:
+                raise ValueError(
+                    'The conductivity is tabulated for a single {0}, so it '
+                    'can not be an array'.format(name))
+
+        key = _token(tuple(self._cal_dts[i] for i in (
+            'material', 'temp', 'mob_author', 'nieff_author',
+            'ionis_author', 'dopant_type', 'nxc')) + (self._dopant(),))
+
+        found, table = self._tables.get(type(self).__name__, key)
+        if not found:
+            N = np.logspace(self._table_range[0], self._table_range[1],
+                            int(np.diff(self._table_range)[0] *
+                                self._table_points_per_decade) + 1)
+            log_cond = np.log(self._cond.calculate(**self._doping(N)))
+
+            # near intrinsic the conductivity can decrease with doping, as
+            # the majority carrier replaces the other, so the table starts
+            # where it only increases
+            decreasing = np.where(np.diff(log_cond) <= 0)[0]
+            if decreasing.size > 0:
+                N = N[decreasing[-1] + 1:]
+                log_cond = log_cond[decreasing[-1] + 1:]
+
+            if N.size < 2:
+                raise ValueError(
+                    'The conductivity does not increase with doping, '
+                    'so can not be inverted')
+
+            log_N = np.log(N)
+            table = (log_N, log_cond, np.gradient(log_cond, log_N))
+            self._tables.put(type(self).__name__, key, table)
+
+        return table
+
+    def _dopant(self):
+        '''
+        the name of the dopant for the dopant type
+        '''
+        if self._cal_dts['dopant_type'] == 'p':
+            return self._cal_dts['acceptor']
+        elif self._cal_dts['dopant_type'] == 'n':
+            return self._cal_dts['donor']
+        raise ValueError('dopant_type must be n or p, not {0}'.format(
+            self._cal_dts['dopant_type']))
+
+    def _doping(self, N):
+        '''
+        the inputs of Conductivity for a doping of the dopant type
+        '''
+        if self._cal_dts['dopant_type'] == 'p':
+            Na, Nd = N, np.zeros(N.shape)
+        else:
+            Na, Nd = np.zeros(N.shape), N
+        return {'Na': Na, 'Nd': Nd, 'nxc': self._cal_dts['nxc']}
+
+    def dark_conductivity2doping(self, dark_conductivity, rtol=1e-6,
+                                 max_iter=20, **kwargs):
         '''
         cacluate the number of ionised dopoants
         given the conductivity of the sample in the dark
 
+        The conductivity is tabulated against doping once for the
+        material, temperature, authors and dopant type, from the doping
+        above which it only increases. The doping is
+        found from this table by interpolation, and then refined with
+        Newton steps on the calculated conductivity, for all values at
+        once, until the conductivity of the doping is within rtol of that
+        provided.
+
         Inputs:
-            dark_conductivity: (float)
+            dark_conductivity: (float or array like)
                 The conductivty of the sample in the dark
+            rtol: (float, optional)
+                The relative tolerance of the conductivity of the doping
+            max_iter: (int, optional)
+                The maximum number of Newton steps
             **kwargs: (optional)
                 Any of the values found in cal_dts
 
         Ouput:
-            doping: (float)
-                The substitutional doping density.
+            doping: (float or array)
+                The substitutional doping density, with the shape of the
+                conductivity. This is nan for conductivities outside the
+                range that can be calculated.
         '''
 
         if bool(kwargs):
             self.calculationdetails = kwargs
             self._update_links()
 
-        mob_e = self.Mob.electron_mobility(nxc=1,
-                                           Na=0,
-                                           Nd=0,
-                                           temp=self._cal_dts['temp']
-                                           )
-        # # get an inital guess
-        Na = dark_conductivity / const.e / mob_e
-
-        cond = Conductivity(**self._cal_dts)
-
-        def cal_dop(N, dopant_type, dark_conductivity):
-            if dopant_type == 'p':
-                Na = N
-                Nd = 0
-            elif dopant_type == 'n':
-                Na = 0
-                Nd = N
-            condv = (cond.calculate(Na=Na, Nd=Nd))
-            return condv - dark_conductivity
-
-        dop = (opt.newton(cal_dop,
-                          x0=Na,
-                          tol=0.001,
-                          args=(self._cal_dts['dopant_type'], dark_conductivity),))
-
-        return dop
+        shape = np.shape(dark_conductivity)
+        target = np.log(np.asarray(dark_conductivity, dtype=float).flatten())
+
+        log_N, log_cond, slope = self._conductivity_table()
+
+        # the inital guess from the table
+        guess = np.interp(target, log_cond, log_N,
+                          left=np.nan, right=np.nan)
+        outside = np.isnan(guess)
+        if np.any(outside):
+            print('Warning: {0} conductivities are outside of the range '
+                  'for {1:.0e} to {2:.0e} cm^-3 and are returned as '
+                  'nan'.format(np.sum(outside),
+                               *np.exp(log_N[[0, -1]])))
+
+        # Newton steps for the values that have not converged
+        index = np.where(~outside)[0]
+        self.iterations = 0
+        while index.size > 0 and self.iterations < max_iter:
+            self.iterations += 1
+
+            error = np.log(self._cond.calculate(
+                **self._doping(np.exp(guess[index])))) - target[index]
+
+            guess[index] -= error / np.interp(guess[index], log_N, slope)
+            index = index[np.abs(error) > rtol]
+
+        if index.size > 0:
+            print('Warning: {0} dopings did not converge within {1} '
+                  'iterations'.format(index.size, max_iter))
+
+        return np.exp(guess).reshape(shape)[()]
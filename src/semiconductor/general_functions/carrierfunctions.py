@@ -4,7 +4,8 @@
 import numpy as np
 from semiconductor.material.intrinsic_carrier_density import IntrinsicCarrierDensity as NI
 # from semiconductor.electrical.ionisation import Ionisation as ion
-# import fdint as fd
+from semiconductor.general_functions.fermi_dirac import (
+    fermi_dirac_half, inverse_fermi_dirac_half)
 import scipy.constants as const
 
 
@@ -24,22 +25,23 @@ def get_carriers(Na, Nd, nxc,
     ni: (optional)
         provide  a values so this function doesn't calculate ni
 
+    All the inputs are broadcast together, so that the returned arrays
+    have the broadcast shape of Na, Nd, nxc and ni (or temp).
+
     returns ne, nh
 
     '''
 
-    # check types
-    if not isinstance(Na, np.ndarray):
-        Na = np.asarray([Na])
-    if not isinstance(Nd, np.ndarray):
-        Nd = np.asarray([Nd])
-    if not isinstance(nxc, np.ndarray):
-        nxc = np.array([nxc])
-
     # if ni not provided obtain
     if ni is None:
         ni = NI(material=material).update(author=ni_author, temp=temp)
 
+    # all the inputs are broadcast against each other, so any combination
+    # of doping, excess carrier and temperature arrays can be passed
+    Na, Nd, nxc, ni = np.broadcast_arrays(
+        *[np.atleast_1d(np.asarray(i, dtype=float))
+          for i in (Na, Nd, nxc, ni)])
+
     # Calculated on the assumption that at thermal equilibrium in the
     # dark n0p0 = ni**2, and that charge neutrality holds. Usually
     # simplified to saying the majority carrier density ~ the doping and min
@@ -51,140 +53,134 @@ def get_carriers(Na, Nd, nxc,
                           np.sqrt((Nd - Na)**2 + 4 * ni**2)))
     min_car_den = ni**2 / maj_car_den
 
-    # assign the dark minority carriers
-    ne0 = np.copy(min_car_den)
-    nh0 = np.copy(min_car_den)
-
     # check the doping and assign
     # if the number of donars are larger
     index = Na < Nd
 
-    nh0[~index] = maj_car_den[~index]
-    ne0[index] = maj_car_den[index]
+    ne0 = np.where(index, maj_car_den, min_car_den)
+    nh0 = np.where(index, min_car_den, maj_car_den)
 
     # add the number of excess carriers
-    assert ne0.shape == nh0.shape
-    # make the excess carrier the right shape to add
-    if nxc.shape[0] == 1 or nh0.shape[0] == 1 or nxc.shape[0] == nh0.shape[0]:
-
-        # add them to the dark carriers
-        ne = ne0 + nxc
-        nh = nh0 + nxc
-
-    else:
-        print("I can't work with these dimensions")
-        print("nxc: {0} \n nh0: {1} \n nE0: {2}".format(
-            nxc.shape, nh0.shape, ne0.shape))
-        raise ValueError
-
-    # To make sure an array the same shape as the input array is returned
-    # Note this function does not play well if  both an array of dopants
-    # and excess carrerier densities are passed
-
-    # if ne0.shape[0] == 1:
-    #     ne = ne[0]
-    #     nh = nh[0]
-    # else:
-    #     ne = ne.flatten()
-    #     nh = nh.flatten()
+    ne = ne0 + nxc
+    nh = nh0 + nxc
 
     return ne, nh
 
 
-def fermi2carrier_fermi(Ef, ni_author=None, eg_author=None, temp=300,
-                        material='Si', Ei=0):
+def _band_parameters(temp, material, dos_author, eg_author, Ei):
     '''
-    This does not work.
-
-    determines the number of carriers from the fermi energy level
-
-    inputs:
-        Ef: (array like)
-            The Fermi energy level referenced to the intrinsic level
+    returns the thermal energy, the effective density of states of the
+    conduction and valance bands, the band gap and the energy of the
+    reference level above the valance band, all energies in eV
 
+    If Ei is not provided, the reference level is the intrinsic level.
     '''
+    # imported here, as these models import this module
+    from semiconductor.material.densityofstates import DOS
+    from semiconductor.material.bandgap import BandGap
 
-    # this may have to be the effective ni, i'm not sure
-    ni = NI(material=material).update(author=ni_author, temp=temp)
-    ni = 2.831801e10
-
-    Nc = 2.857082e19
-    Nv = 2.513669e19
+    kT = const.k * np.asarray(temp, dtype=float) / const.e
 
-    Eg = -np.log(ni**2. / Nc / Nv) * const.k * temp / const.e
+    Nc, Nv = DOS(material=material, author=dos_author,
+                 iEg_author=eg_author).update(temp=temp)
 
-    Ei = (Eg * const.e / 2. + 0.5 * const.k * temp * np.log(Nv / Nc)) / const.e
+    Eg = BandGap(material=material, iEg_author=eg_author,
+                 BGN_author='None').update(temp=temp)
 
-    dEc = (Ef - (Eg - Ei))
-    dEv = -dEc - Eg
+    # the intrinsic level above the valance band
+    if Ei is None:
+        Ei = Eg / 2. + 0.5 * kT * np.log(Nv / Nc)
 
-    n0i = fd.parabolic(Ef / const.k / temp * const.e) * ni
-
-    n = fd.parabolic(dEc / const.k / temp * const.e) * Nc
-    p = fd.parabolic(dEv / const.k / temp * const.e) * Nv
-
-    return n, p
+    return kT, Nc, Nv, Eg, Ei
 
 
-def fermi2carrier_boltz(Ef, ni_author=None, eg_author=None, temp=300,
-                        material='Si', Ei=0):
+def fermi2carrier_fermi(Ef, dos_author=None, eg_author=None, temp=300,
+                        material='Si', Ei=None):
     '''
-    This does not work.
-
-    determines the number of carriers from the fermi energy level
+    determines the number of carriers from the fermi energy level, with
+    Fermi-Dirac statistics
 
     inputs:
         Ef: (array like)
-            The Fermi energy level referenced to the intrinsic level
-
+            The Fermi energy level referenced to the intrinsic level, in
+            eV. Separate quasi Fermi levels of the electrons and holes
+            can be passed as a tuple.
+        dos_author: (str, optional)
+            the author of the density of states
+        eg_author: (str, optional)
+            the author of the intrinsic band gap
+        temp: (float or array like)
+            the temperature in Kelvin
+        Ei: (float or array like, optional)
+            the energy of the level Ef is referenced to, above the
+            valance band in eV. If not provided, the intrinsic level is
+            used.
+
+    output:
+        n, p: the electron and hole densities
     '''
+    Efe, Efh = Ef if isinstance(Ef, tuple) else (Ef, Ef)
 
-    # this may have to be the effective ni, i'm not sure
-    ni = 2.831801e10
-    print(ni)
-    Nc = 2.857082e19
-    Nv = 2.513669e19
-    Eg = -np.log(ni**2 / Nc / Nv) * const.k * temp / const.e
-
-    Ei = (Eg * const.e / 2 + 0.5 * const.k * temp * np.log(Nv / Nc)) / const.e
+    kT, Nc, Nv, Eg, Ei = _band_parameters(
+        temp, material, dos_author, eg_author, Ei)
 
-    dEc = (Ef - (Eg - Ei))
-    dEv = -dEc - Eg
+    # the distance of the Fermi levels from the band edges
+    dEc = np.asarray(Efe, dtype=float) + Ei - Eg
+    dEv = -np.asarray(Efh, dtype=float) - Ei
 
-    n = np.exp(dEc / const.k / temp * const.e) * Nc
-    p = np.exp(dEv / const.k / temp * const.e) * Nv
+    n = fermi_dirac_half(dEc / kT) * Nc
+    p = fermi_dirac_half(dEv / kT) * Nv
 
     return n, p
 
 
-def carrier2fermi_fermi(ne, nh, ni_author=None, eg_author=None, temp=300,
-                        material='Si', Ei=0):
+def fermi2carrier_boltz(Ef, dos_author=None, eg_author=None, temp=300,
+                        material='Si', Ei=None):
     '''
-    This does not work.
-
-    determines the number of carriers from the fermi energy level
+    determines the number of carriers from the fermi energy level, with
+    Boltzmann statistics
 
     inputs:
-        Ef: (array like)
-            The Fermi energy level referenced to the intrinsic level
+        as for fermi2carrier_fermi
 
+    output:
+        n, p: the electron and hole densities
     '''
+    Efe, Efh = Ef if isinstance(Ef, tuple) else (Ef, Ef)
+
+    kT, Nc, Nv, Eg, Ei = _band_parameters(
+        temp, material, dos_author, eg_author, Ei)
 
-    # this may have to be the effective ni, i'm not sure
-    ni = 2.831801e10
-    Nc = 2.857082e19
-    Nv = 2.513669e19
+    dEc = np.asarray(Efe, dtype=float) + Ei - Eg
+    dEv = -np.asarray(Efh, dtype=float) - Ei
 
-    # determine the band gap from the input paramters
-    Eg = -np.log(ni**2. / Nc / Nv) * const.k * temp / const.e
+    n = np.exp(dEc / kT) * Nc
+    p = np.exp(dEv / kT) * Nv
 
-    # Valance band to Ei
-    Ei = (Eg * const.e / 2. + 0.5 * const.k * temp * np.log(Nv / Nc)) / const.e
+    return n, p
+
+
+def carrier2fermi_fermi(ne, nh, dos_author=None, eg_author=None, temp=300,
+                        material='Si', Ei=None):
+    '''
+    determines the quasi fermi energy levels from the number of carriers,
+    with Fermi-Dirac statistics
 
-    dEc = (Ef - (Eg - Ei))
-    dEv = -dEc - Eg
+    inputs:
+        ne: (array like)
+            the electron density
+        nh: (array like)
+            the hole density
+        the remaining inputs are as for fermi2carrier_fermi
+
+    output:
+        Efe, Efh: the electron and hole quasi Fermi levels, referenced
+        to the intrinsic level (or Ei), in eV
+    '''
+    kT, Nc, Nv, Eg, Ei = _band_parameters(
+        temp, material, dos_author, eg_author, Ei)
 
-    Efe = fd.iparabolic(ne / Nc) - (Eg - Ei)
-    Efh = fd.iparabolic(nh / Nv) - Ei
+    Efe = Eg + kT * inverse_fermi_dirac_half(np.asarray(ne) / Nc) - Ei
+    Efh = -kT * inverse_fermi_dirac_half(np.asarray(nh) / Nv) - Ei
 
     return Efe, Efh
@@ -0,0 +1,71 @@
+#!/usr/local/bin/python
+# UTF-8
+
+import numpy as np
+
+
+def bracketed_root(func, lower, upper, tol=1e-10, max_iter=200):
+    '''
+    Finds the root of a monotonic function for each element of an array
+    at once, given a lower and upper bound that bracket the root.
+
+    This uses the Illinois variant of the false position method, which
+    keeps the root bracketed and converges superlinearly. Only the
+    elements that have not converged are evaluated in each iteration.
+
+    inputs:
+        func: (function)
+            called as func(x, index), returning the value of the function
+            at x for the elements index of the array
+        lower: (array like)
+            a lower bound of the root of each element
+        upper: (array like)
+            an upper bound of the root of each element
+        tol: (float)
+            the absolute tolerance of the root
+        max_iter: (int)
+            the maximum number of iterations
+
+    output:
+        root: (array)
+            the root of each element
+        iterations: (int)
+            the number of iterations used
+    '''
+    a, b = np.broadcast_arrays(np.asarray(lower, dtype=float).reshape(-1),
+                               np.asarray(upper, dtype=float).reshape(-1))
+    a, b = np.copy(a), np.copy(b)
+
+    index = np.arange(a.shape[0])
+    fa, fb = func(a, index), func(b, index)
+
+    root = np.copy(b)
+    root[fa == 0] = a[fa == 0]
+
+    # only the elements with a sign change need to be solved
+    keep = fa * fb < 0
+    index, a, b, fa, fb = index[keep], a[keep], b[keep], fa[keep], fb[keep]
+
+    iterations = 0
+    while index.size > 0 and iterations < max_iter:
+        iterations += 1
+
+        c = b - fb * (b - a) / (fb - fa)
+        fc = func(c, index)
+
+        # keep the root between a and b, halving the retained end's
+        # value if it is kept twice (Illinois)
+        change = fc * fb < 0
+        a = np.where(change, b, a)
+        fa = np.where(change, fb, fa / 2.)
+
+        converged = (np.abs(c - b) <= tol) | (fc == 0)
+        b, fb = c, fc
+        root[index] = c
+
+        if np.any(converged):
+            keep = ~converged
+            index, a, b, fa, fb = (
+                index[keep], a[keep], b[keep], fa[keep], fb[keep])
+
+    return root, iterations
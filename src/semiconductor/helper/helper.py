@@ -1,15 +1,23 @@
 #!/usr/local/bin/python
 # UTF-8
 
-import matplotlib.pylab as plt
 import numpy as np
 import json
 import inspect
 import numbers
-# try:
-#     import ConfigParser as configparser
-# except:
-#     import configparser
+import contextlib
+import copy
+import functools
+import hashlib
+import os
+import threading
+import time
+import types
+from collections import OrderedDict
+try:
+    import ConfigParser as configparser
+except:
+    import configparser
 import ruamel.yaml as yaml
 
 
@@ -22,11 +30,11 @@ def change_model(Models, author=None):
 
     model = Models[author]['model']
 
-    vals = Models[author].copy()
+    vals = dict(Models[author])
 
     del vals['model']
 
-    return vals, model, author
+    return ParameterRecord.compile(vals), model, author
 
 
 def class_or_value(value, clas, value_updater, **kwargs):
@@ -47,6 +55,665 @@ def class_or_value(value, clas, value_updater, **kwargs):
     return ret, value
 
 
+def _read_yaml(fname):
+    '''
+    reads a yaml author file, where each author is a yaml document
+    '''
+    Models = {}
+    with open(fname, 'r') as f:
+        for i in yaml.safe_load_all(f):
+            Models.update(i)
+    return Models
+
+
+def _read_const(fname):
+    '''
+    reads an ini style author file (the .const files), converting
+    values to floats, or lists of floats when seperated by ";"
+    '''
+    config = configparser.ConfigParser()
+    config.read(fname)
+
+    Models = {}
+    for author in config.sections():
+        vals = dict(config.items(author))
+        for k, v in vals.items():
+            try:
+                vals[k] = float(v)
+            except ValueError:
+                try:
+                    vals[k] = [float(i) for i in v.split(';')]
+                except ValueError:
+                    pass
+        Models[author] = vals
+    return Models
+
+
+class ModelRegistry(object):
+    '''
+    A process wide store of the parsed author files.
+
+    Each file is parsed once per process, keyed by (material, file),
+    and is then handed out as a read only view. The number of hits and
+    misses are counted, so repeated parsing can be checked for.
+    '''
+
+    readers = {
+        '.yaml': _read_yaml,
+        '.const': _read_const,
+    }
+
+    def __init__(self):
+        self._models = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, fname, material=None):
+        '''
+        returns the read only models for the file
+
+        inputs:
+            fname: (str)
+                path to the author file
+            material: (str, optional)
+                the material the file is for, defaults to the folder
+                the file is in
+        output:
+            a read only mapping of author to model values
+        '''
+        fname = os.path.realpath(fname)
+        material = material or os.path.basename(os.path.dirname(fname))
+        key = (material, fname)
+
+        with self._lock:
+            if key in self._models:
+                self.hits += 1
+            else:
+                self.misses += 1
+                if instrumentation.enabled:
+                    instrumentation.loaded(fname)
+                reader = self.readers.get(
+                    os.path.splitext(fname)[1], _read_yaml)
+                self._models[key] = types.MappingProxyType(
+                    {author: types.MappingProxyType(vals)
+                     for author, vals in reader(fname).items()})
+            return self._models[key]
+
+    def stats(self):
+        '''
+        returns the number of hits, misses and the files parsed
+        '''
+        with self._lock:
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'files': sorted(self._models.keys())}
+
+    def clear(self):
+        '''
+        removes all parsed files and resets the counters
+        '''
+        with self._lock:
+            self._models.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+model_registry = ModelRegistry()
+
+
+class Instrumentation(object):
+    '''
+    Records, for each model class and author, the number of calls and
+    constructions, their wall time, the author files loaded, the models
+    constructed within them and the number of array elements passed.
+
+    Nothing is recorded unless enabled, with the environment variable
+    SEMICONDUCTOR_INSTRUMENT or the instrument context manager. The
+    methods of the models are only wrapped while enabled, so there is no
+    overhead otherwise. The wall time of a call includes the models it
+    calls, while the self time does not, so the model that dominates a
+    calculation can be found.
+    '''
+
+    def __init__(self, enabled=False):
+        self._enabled = False
+        self._classes = []
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.enabled = enabled
+
+    @property
+    def enabled(self):
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, enabled):
+        enabled = bool(enabled)
+        if enabled != self._enabled:
+            self._enabled = enabled
+            for cls in self._classes:
+                if enabled:
+                    self._wrap(cls)
+                else:
+                    self._unwrap(cls)
+
+    def register(self, cls):
+        '''
+        adds a model class, whose public methods and construction are
+        recorded
+        '''
+        self._classes.append(cls)
+        if self._enabled:
+            self._wrap(cls)
+
+    def _wrap(self, cls):
+        for name, value in list(vars(cls).items()):
+            if isinstance(value, types.FunctionType) and (
+                    name == '__init__' or not name.startswith('_')):
+                setattr(cls, name, _instrumented(value))
+
+    def _unwrap(self, cls):
+        for name, value in list(vars(cls).items()):
+            if hasattr(value, '_instrumented'):
+                setattr(cls, name, value._instrumented)
+
+    def _frames(self):
+        '''
+        returns the calls in progress on this thread
+        '''
+        frames = getattr(self._local, 'frames', None)
+        if frames is None:
+            frames = self._local.frames = []
+        return frames
+
+    def call(self, model, name, func, args, kwargs):
+        '''
+        calls the method of a model, recording it
+        '''
+        frames = self._frames()
+        frame = {'nested_s': 0., 'yaml_loads': 0, 'submodels': 0}
+        if name == '__init__' and frames:
+            frames[-1]['submodels'] += 1
+
+        frames.append(frame)
+        start = time.perf_counter()
+        try:
+            return func(model, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            frames.pop()
+            if frames:
+                frames[-1]['nested_s'] += elapsed
+            self._record(model, name, elapsed, frame, args, kwargs)
+
+    def loaded(self, fname):
+        '''
+        records that an author file was parsed by the model being called
+        '''
+        frames = self._frames()
+        if frames:
+            frames[-1]['yaml_loads'] += 1
+
+    def _record(self, model, name, elapsed, frame, args, kwargs):
+        author = str(getattr(model, '_cal_dts', {}).get('author'))
+        elements = sum(i.size for i in list(args) + list(kwargs.values())
+                       if isinstance(i, np.ndarray))
+
+        with self._lock:
+            stats = self._stats.setdefault(
+                type(model).__name__, {}).setdefault(author, {
+                    'calls': 0, 'time_s': 0., 'self_time_s': 0.,
+                    'constructions': 0, 'construct_s': 0.,
+                    'yaml_loads': 0, 'submodels': 0,
+                    'elements': 0, 'max_elements': 0, 'methods': {}})
+
+            if name == '__init__':
+                stats['constructions'] += 1
+                stats['construct_s'] += elapsed
+            else:
+                stats['calls'] += 1
+                stats['time_s'] += elapsed
+                stats['self_time_s'] += elapsed - frame['nested_s']
+                stats['methods'][name] = stats['methods'].get(name, 0) + 1
+
+            stats['yaml_loads'] += frame['yaml_loads']
+            stats['submodels'] += frame['submodels']
+            stats['elements'] += elements
+            stats['max_elements'] = max(stats['max_elements'], elements)
+
+    def snapshot(self):
+        '''
+        returns a copy of the records, by class and then author
+        '''
+        with self._lock:
+            return copy.deepcopy(self._stats)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+instrumentation = Instrumentation(
+    enabled=os.environ.get('SEMICONDUCTOR_INSTRUMENT', '').lower() not in
+    ('', '0', 'false', 'no'))
+
+
+@contextlib.contextmanager
+def instrument(reset=True):
+    '''
+    enables the instrumentation within a with block, yielding it so a
+    snapshot can be taken. The records are cleared first, unless reset is
+    False.
+    '''
+    enabled = instrumentation.enabled
+    if reset:
+        instrumentation.reset()
+    instrumentation.enabled = True
+    try:
+        yield instrumentation
+    finally:
+        instrumentation.enabled = enabled
+
+
+def _instrumented(func):
+    '''
+    wraps a method of a model so it is recorded
+    '''
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        return instrumentation.call(self, func.__name__, func, args, kwargs)
+    wrapper._instrumented = func
+    return wrapper
+
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+
+def _carrier_pairs(keys):
+    '''
+    returns the values that come in electron and hole pairs, as a
+    dictionary of the name without the carrier and the key of the
+    electron and hole values, e.g. {'umax': ('umax_e', 'umax_h')}
+    '''
+    pairs = {}
+    for key in keys:
+        for e, h in (('_e', '_h'), ('e', 'h')):
+            name = key[:-len(e)]
+            if key.endswith(e) and name and name + h in keys:
+                pairs.setdefault(name, (key, name + h))
+                break
+    return pairs
+
+
+def _numbered_series(keys):
+    '''
+    returns the values that are numbered from 0, as a dictionary of
+    the name without the number and the keys in order, e.g.
+    {'A': ['A0', 'A1', 'A2']}
+    '''
+    numbered = {}
+    for key in keys:
+        name = key.rstrip('0123456789')
+        if name and name != key:
+            numbered.setdefault(name, []).append(key)
+
+    series = {}
+    for name, members in numbered.items():
+        members = [name + str(i) for i in range(len(members))]
+        if len(members) > 1 and all(i in keys for i in members):
+            series[name] = members
+    return series
+
+
+class ParameterRecord(dict):
+    '''
+    The values of an author, compiled once when a model is loaded, so
+    that model functions use attribute access rather than building
+    string keys on every call.
+
+    Each value is an attribute of the record, with numbers stored as
+    floats. Values in electron and hole pairs are also grouped by
+    carrier, e.g. umax_e is carriers['e'].umax and ge is carriers['e'].g,
+    and values numbered from 0, e.g. A0, A1, A2, are stacked into an
+    array in series['A'].
+
+    The record is a dictionary of the same values, so string key lookups
+    cost the same as they did before.
+    '''
+    __slots__ = ('_derived', 'carriers', 'series')
+
+    # the names of the values stored in slots, set for each subclass
+    _names = ()
+
+    def __init__(self, values, derived=True):
+        self._derived = False
+        self.update(values)
+        self._derived = derived
+        self._derive()
+
+    def _derive(self):
+        '''
+        groups the values by carrier, and numbered values into arrays
+        '''
+        self.carriers, self.series = {}, {}
+        if not self._derived:
+            return
+
+        keys = list(self)
+        pairs = _carrier_pairs(keys)
+        if pairs:
+            for n, carrier in enumerate(('e', 'h')):
+                self.carriers[carrier] = ParameterRecord.compile(
+                    {name: self[i[n]] for name, i in pairs.items()},
+                    derived=False)
+
+        for name, members in _numbered_series(keys).items():
+            self.series[name] = np.array([self[i] for i in members])
+
+    @staticmethod
+    def compile(values, derived=True):
+        '''
+        returns a record of the values, with a slot for each value whose
+        key is a valid attribute name
+        '''
+        names = tuple(
+            i for i in values.keys() if isinstance(i, str) and
+            i.isidentifier() and not hasattr(ParameterRecord, i))
+        cls = _record_classes.get(names)
+        if cls is None:
+            cls = type('ParameterRecord', (ParameterRecord,),
+                       {'__slots__': names, '_names': names})
+            _record_classes[names] = cls
+        return cls(values, derived)
+
+    def __setitem__(self, key, value):
+        self.update({key: value})
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        if key in self._names:
+            delattr(self, key)
+        self._derive()
+
+    def __repr__(self):
+        return 'ParameterRecord({0})'.format(dict(self))
+
+    def __reduce__(self):
+        return (ParameterRecord.compile, (dict(self),))
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            if _is_number(value):
+                value = float(value)
+            dict.__setitem__(self, key, value)
+            if key in self._names:
+                setattr(self, key, value)
+        self._derive()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *default):
+        if key not in self and default:
+            return default[0]
+        value = self[key]
+        del self[key]
+        return value
+
+    def popitem(self):
+        key = next(reversed(self))
+        return key, self.pop(key)
+
+    def clear(self):
+        for key in list(self):
+            del self[key]
+
+    def copy(self):
+        return ParameterRecord.compile(dict(self))
+
+
+# the record classes, for each set of value names
+_record_classes = {}
+
+
+class CalculationContext(Mapping):
+    '''
+    An immutable snapshot of the calculation details of a model.
+
+    It can be read as a dictionary or through attributes, and passed
+    to a model as keyword arguments or as its calculationdetails.
+    Arrays are copied and made read only.
+    '''
+
+    __slots__ = ('_dts',)
+
+    def __init__(self, dts=None, **kwargs):
+        dts = dict(dts or {}, **kwargs)
+        for key, value in dts.items():
+            if isinstance(value, np.ndarray):
+                value = value.copy()
+                value.setflags(write=False)
+                dts[key] = value
+        object.__setattr__(self, '_dts', dts)
+
+    def __getitem__(self, key):
+        return self._dts[key]
+
+    def __iter__(self):
+        return iter(self._dts)
+
+    def __len__(self):
+        return len(self._dts)
+
+    def __getattr__(self, key):
+        if key == '_dts':
+            raise AttributeError(key)
+        try:
+            return self._dts[key]
+        except KeyError:
+            raise AttributeError(key)
+
+    def __setattr__(self, key, value):
+        raise AttributeError('CalculationContext is immutable')
+
+    def __repr__(self):
+        return 'CalculationContext({0!r})'.format(self._dts)
+
+    def __reduce__(self):
+        return (CalculationContext, (self._dts,))
+
+    def replace(self, **kwargs):
+        '''
+        returns a new context with the provided values changed
+        '''
+        return CalculationContext(self._dts, **kwargs)
+
+
+def _token(value):
+    '''
+    returns a hashable token of a value, using a hash of the contents of
+    arrays so equal arrays give equal tokens
+    '''
+    if isinstance(value, np.ndarray):
+        return ('array', value.shape, value.dtype.str, hashlib.blake2b(
+            np.ascontiguousarray(value).tobytes(),
+            digest_size=16).hexdigest())
+    if isinstance(value, np.generic):
+        # numpy scalars compare with tuples as arrays
+        return value.item()
+    if isinstance(value, (list, tuple)):
+        return tuple(_token(i) for i in value)
+    if isinstance(value, Mapping):
+        return tuple(sorted((k, _token(v)) for k, v in value.items()))
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+
+def _copy_result(result):
+    '''
+    copies the arrays of a result, so a cached result can not be changed
+    '''
+    if isinstance(result, np.ndarray):
+        return result.copy()
+    if isinstance(result, tuple):
+        return tuple(_copy_result(i) for i in result)
+    return result
+
+
+class ResultCache(object):
+    '''
+    A size bounded store of the results of model methods, which removes
+    the least recently used result when full. The hits and misses are
+    counted for each class.
+    '''
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._results = OrderedDict()
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def get(self, owner, key):
+        '''
+        returns if the key was found and its result
+        '''
+        with self._lock:
+            stats = self._stats.setdefault(owner, {'hits': 0, 'misses': 0})
+            if (owner, key) in self._results:
+                stats['hits'] += 1
+                self._results.move_to_end((owner, key))
+                return True, self._results[(owner, key)]
+            stats['misses'] += 1
+            return False, None
+
+    def put(self, owner, key, result):
+        with self._lock:
+            self._results[(owner, key)] = result
+            while len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+
+    def invalidate(self, owner=None):
+        '''
+        removes the results of a class, or all results
+        '''
+        with self._lock:
+            for key in list(self._results.keys()):
+                if owner is None or key[0] == owner:
+                    del self._results[key]
+
+    def size(self, owner=None):
+        '''
+        returns the number of results of a class, or of all classes
+        '''
+        with self._lock:
+            return sum(1 for key in self._results.keys()
+                       if owner is None or key[0] == owner)
+
+    def stats(self, owner=None):
+        '''
+        returns the hits and misses of a class, or of all classes
+        '''
+        with self._lock:
+            if owner is not None:
+                return dict(self._stats.get(owner, {'hits': 0, 'misses': 0}))
+            return {k: dict(v) for k, v in self._stats.items()}
+
+
+def memoize(*attributes):
+    '''
+    A decorator for the update methods of models, which returns the
+    previous result if the method is called again with the same model,
+    values, calculation details and inputs. This is only done when a
+    cache is enabled with enable_cache.
+
+    inputs:
+        attributes: (str)
+            the names of the attributes the method sets to its results,
+            which are set when a result is from the cache
+    '''
+    def decorator(func):
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            cache = self._result_cache
+            if cache is None:
+                return func(self, *args, **kwargs)
+
+            # the model and calculation details the result depends on
+            self.calculationdetails = kwargs
+            if 'author' in kwargs.keys():
+                self.change_model(self._cal_dts['author'])
+
+            key = (func.__name__, self.model, _token(self.vals),
+                   _token(self._cal_dts), _token(args), _token(
+                       {k: v for k, v in kwargs.items()
+                        if k not in self._cal_dts}))
+
+            found, result = cache.get(type(self).__name__, key)
+            if not found:
+                result = func(self, *args, **kwargs)
+                cache.put(type(self).__name__, key, _copy_result(result))
+                return result
+
+            result = _copy_result(result)
+            values = result if len(attributes) > 1 else (result,)
+            for name, value in zip(attributes, values):
+                setattr(self, name, value)
+            return result
+
+        return wrapper
+    return decorator
+
+
+# values of an author that describe it, but are not used by its model
+_descriptive = ('notes', 'doi', 'dopant')
+
+
+def _is_number(value):
+    return isinstance(value, numbers.Number) and not isinstance(value, bool)
+
+
+def _group_key(vals):
+    '''
+    returns a key that is the same for authors that can be evaluated
+    together: those with the same model, parameter names and non numeric
+    values
+    '''
+    return (vals['model'],
+            tuple(sorted(k for k in vals.keys() if k not in _descriptive)),
+            tuple(sorted((k, _token(v)) for k, v in vals.items()
+                         if k not in _descriptive and not _is_number(v))))
+
+
+# the largest number of values of a group of authors evaluated together
+_stack_size = 2**16
+
+
+def _stack_vals(authors, ndim):
+    '''
+    stacks the numeric values of several authors along a new first axis,
+    with ndim axes after it, so they broadcast against inputs of ndim
+    dimensions. Other values are taken from the first author.
+    '''
+    stacked = dict(authors[0])
+    for key, value in authors[0].items():
+        if _is_number(value):
+            stacked[key] = np.array(
+                [i[key] for i in authors], dtype=float).reshape(
+                    (-1,) + (1,) * ndim)
+    return stacked
+
+
 class BaseModelClass():
 
     _cal_dts = {
@@ -54,19 +721,139 @@ class BaseModelClass():
         'temp': 300,
     }
 
+    def __new__(cls, *args, **kwargs):
+        '''
+        gives each instance its own copy of the class's calculation
+        details, so instances do not share state
+        '''
+        self = super(BaseModelClass, cls).__new__(cls)
+        self._cal_dts = copy.deepcopy(cls._cal_dts)
+        self._link_keys = {}
+        self._link_values = {}
+        self._link_builds = {}
+        return self
+
+    # The linked models of a composite model, as pairs of the name of a
+    # link and the calculation details and other links it depends on.
+    # Each link is built by the method _build_<name>, and is listed
+    # after the links it depends on. See _update_links.
+    _link_graph = ()
+
+    # the cache of results, see enable_cache
+    _result_cache = None
+
+    def __init_subclass__(cls, **kwargs):
+        '''
+        registers each model, so it is recorded when the instrumentation
+        is enabled
+        '''
+        super().__init_subclass__(**kwargs)
+        instrumentation.register(cls)
+
     def __init__(self):
         pass
 
+    @classmethod
+    def enable_cache(cls, maxsize=256):
+        '''
+        caches the results of the class's update methods, keeping up to
+        maxsize results. If called on BaseModelClass, a single cache is
+        used for all models.
+        '''
+        cls._result_cache = ResultCache(maxsize)
+        return cls._result_cache
+
+    @classmethod
+    def disable_cache(cls):
+        cls._result_cache = None
+
+    @classmethod
+    def cache_stats(cls):
+        '''
+        returns the number of cache hits and misses of the class
+        '''
+        if cls._result_cache is None:
+            return {'hits': 0, 'misses': 0}
+        return cls._result_cache.stats(cls.__name__)
+
+    def invalidate_cache(self):
+        '''
+        removes the cached results of the class, to be called when the
+        values of a model are changed
+        '''
+        if self._result_cache is not None:
+            self._result_cache.invalidate(type(self).__name__)
+
+    def _link_key(self, depends):
+        '''
+        returns a key of the values of the calculation details and links
+        '''
+        return tuple(
+            self._link_values.get(i) if i in self._link_builds
+            else _token(self._cal_dts.get(i)) for i in depends)
+
+    def _update_links(self, force=False):
+        '''
+        builds the links whose calculation details, or links, have changed
+        since they were last built, or all links if forced, and returns
+        their names.
+
+        A build method may return a value, such as the array it made, and
+        the links depending on it are then only rebuilt if this value
+        changes. Otherwise they are rebuilt every time it is.
+        '''
+        built = []
+        for name, depends in self._link_graph:
+            if not force and self._link_keys.get(name) == self._link_key(
+                    depends):
+                continue
+
+            value = getattr(self, '_build_' + name)()
+            self._link_builds[name] = self._link_builds.get(name, 0) + 1
+            self._link_values[name] = self._link_builds[name] \
+                if value is None else _token(value)
+
+            # taken after the build, as it can set the calculation
+            # details, such as a default author
+            self._link_keys[name] = self._link_key(depends)
+            built.append(name)
+
+        return built
+
+    def _invalidate_link(self, name):
+        '''
+        rebuilds a link, and those depending on it, when the links are
+        next updated
+        '''
+        self._link_keys.pop(name, None)
+
+    def link_graph(self):
+        '''
+        returns the links of the model, each with the calculation details
+        and links it depends on, and the number of times it has been built
+        '''
+        return OrderedDict(
+            (name, {'depends': depends,
+                    'builds': self._link_builds.get(name, 0)})
+            for name, depends in self._link_graph)
+
     @property
     def calculationdetails(self):
         return self._cal_dts
 
+    @property
+    def context(self):
+        '''
+        returns an immutable snapshot of the calculation details
+        '''
+        return CalculationContext(self._cal_dts)
+
     @calculationdetails.setter
     def calculationdetails(self, kwargs):
         '''
         assignes the inputted values that are requrired,
         befor calling a function to pass it to the downstream
-        classes
+        classes. A CalculationContext can also be assigned.
         '''
         if kwargs:
             items = [i for i in kwargs.keys() if i in self._cal_dts.keys()]
@@ -74,11 +861,7 @@ class BaseModelClass():
                 self._cal_dts[item] = kwargs[item]
 
     def _int_model(self, fname):
-        self.Models = {}
-
-        with open(fname, 'r') as f:
-            for i in yaml.safe_load_all(f):
-                self.Models.update(i)
+        self.Models = model_registry.get(fname, self._cal_dts['material'])
 
     def change_model(self, author, Models=None):
 
@@ -87,6 +870,128 @@ class BaseModelClass():
         self.vals, self.model, self._cal_dts['author'] = change_model(
             Models, author)
 
+    def evaluate_all(self, update_function='update', authors=None,
+                     **kwargs):
+        '''
+        Evaluates all the authors of the model for the same inputs.
+
+        Authors that use the same model function, and have the same non
+        numeric values, have their values stacked into arrays and are
+        evaluated together in one call of the update function, if the
+        inputs are small enough that the overhead of each call matters.
+        If the model function does not broadcast with the stacked values,
+        or the inputs are large, the authors are evaluated one at a time.
+        The groups of authors that were evaluated together are provided in
+        self.stacked_groups.
+
+        inputs:
+            update_function: (str)
+                the name of the function used to update the author
+                i.e 'update' or 'electron_mobility'
+            authors: (list, optional)
+                the authors to evaluate, defaults to all available models
+            **kwargs:
+                variables to be passed to the update function.
+
+        output:
+            authors: (list)
+                the authors, in the order of the results
+            results: (array)
+                the result of each author, with the authors along the
+                first axis. A tuple of arrays is returned if the update
+                function returns several values.
+        '''
+        authors = list(authors or self.available_models())
+
+        # only authors that share a model function can be evaluated
+        # together, so the others are not compared
+        models = [self.Models[i]['model'] for i in authors]
+        groups = OrderedDict()
+        for author, model in zip(authors, models):
+            key = author
+            if models.count(model) > 1:
+                key = _group_key(self.Models[author])
+            groups.setdefault(key, []).append(author)
+
+        # the model to return to once done, which is restored as it was
+        # rather than compiled again
+        Models, vals, model = self.Models, self.vals, self.model
+        author = self._cal_dts.get('author')
+
+        results = {}
+        self.stacked_groups = []
+        try:
+            for group in groups.values():
+                group_results, stacked = self._evaluate_group(
+                    update_function, group, kwargs)
+                results.update(group_results)
+                if stacked:
+                    self.stacked_groups.append(group)
+        finally:
+            self.Models = Models
+            self.vals, self.model, self._cal_dts['author'] = \
+                vals, model, author
+
+        multiple = isinstance(results[authors[0]], tuple)
+        values = [results[i] if multiple else (results[i],) for i in authors]
+
+        stacked = []
+        for value in zip(*values):
+            shape = np.broadcast_shapes(*[np.shape(i) for i in value])
+            stacked.append(np.stack(
+                [np.broadcast_to(i, shape) for i in value]))
+
+        return authors, tuple(stacked) if multiple else stacked[0]
+
+    def _evaluate_group(self, update_function, group, kwargs):
+        '''
+        returns a dictionary of the results of a group of authors, which
+        are evaluated together if possible, and if they were
+        '''
+        inputs = dict(self._cal_dts, **kwargs)
+        size = 0
+        if len(group) > 1:
+            try:
+                size = len(group) * np.prod(np.broadcast_shapes(
+                    *[np.shape(i) for i in inputs.values()]))
+            except ValueError:
+                size = np.inf
+
+        # stacking saves the overhead of each call, which only matters
+        # for small inputs. Larger stacked arrays are slower than
+        # evaluating each author in turn.
+        if 0 < size <= _stack_size:
+            # the values are stacked on an axis before those of the inputs
+            ndim = max([1] + [np.ndim(i) for i in inputs.values()])
+
+            self.Models = dict(self.Models)
+            self.Models['_stacked'] = _stack_vals(
+                [self.Models[i] for i in group], ndim)
+
+            try:
+                self.change_model('_stacked')
+                result = getattr(self, update_function)(**kwargs)
+                multiple = isinstance(result, tuple)
+                values = result if multiple else (result,)
+                stacked = all(np.ndim(i) == ndim + 1 and
+                              np.shape(i)[0] == len(group) for i in values)
+            except (ValueError, TypeError):
+                # the stacked values do not broadcast with the inputs
+                stacked = False
+
+            if stacked:
+                return {author: tuple(i[n] for i in values) if multiple
+                        else values[0][n]
+                        for n, author in enumerate(group)}, True
+
+        # the values do not broadcast with this model, so each author is
+        # evaluated separately
+        results = {}
+        for author in group:
+            self.change_model(author)
+            results[author] = getattr(self, update_function)(**kwargs)
+        return results, False
+
     def plot_all_models(self, update_function, xvalues=None, **kwargs):
         '''
         cycles through all the models and plots the result
@@ -97,11 +1002,10 @@ class BaseModelClass():
             **kwargs:
                 variables to be passed to the update function.
         '''
+        import matplotlib.pylab as plt
         fig, ax = plt.subplots(1)
-        for model in self.available_models():
-
-            self.change_model(model)
-            result = getattr(self, update_function)(**kwargs)
+        authors, results = self.evaluate_all(update_function, **kwargs)
+        for model, result in zip(authors, results):
             if xvalues is None:
                 ax.plot(result, label=model)
             else:
@@ -114,6 +1018,7 @@ class BaseModelClass():
         Lets you get a unique range of colours,
         and have repeats of colours
         '''
+        import matplotlib.pylab as plt
 
         colours = []
 
@@ -159,11 +1064,12 @@ class BaseModelClass():
             if 'not_implimented' in self.Models[author]['model']:
                 author_list.remove(author)
 
-        # does the filtering
+        # does the filtering, keeping authors without the field
         if Filter is not None:
-            for c, author in enumerate(author_list):
-                if self.Models[author][Filter] not in Filter_value:
-                    author_list.remove(author)
+            author_list = [
+                author for author in author_list
+                if Filter not in self.Models[author] or
+                self.Models[author][Filter] in Filter_value]
 
         # prints no models available
         if not author_list:
@@ -1,8 +1,25 @@
+import importlib
 
+# the classes are imported from their modules when first accessed
+_classes = {
+    'IntrinsicBandGap': 'bandgap_intrinsic',
+    'BandGap': 'bandgap',
+    'BandGapNarrowing': 'bandgap_narrowing',
+    'DOS': 'densityofstates',
+    'IntrinsicCarrierDensity': 'intrinsic_carrier_density',
+    'ThermalVelocity': 'thermal_velocity',
+}
 
-from .bandgap_intrinsic import IntrinsicBandGap
-from .bandgap import BandGap
-from .bandgap_narrowing import BandGapNarrowing
-from .densityofstates import DOS
-from .intrinsic_carrier_density import IntrinsicCarrierDensity
-from .thermal_velocity import ThermalVelocity
+
+def __getattr__(name):
+    if name in _classes:
+        value = getattr(
+            importlib.import_module('.' + _classes[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(
+        'module {0!r} has no attribute {1!r}'.format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_classes))
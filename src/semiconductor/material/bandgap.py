@@ -45,6 +45,13 @@ class BandGap(BaseModelClass):
         'Nd': 0,
     }
 
+    # the linked models, and the calculation details they depend on. The
+    # other details are passed when the models are updated.
+    _link_graph = (
+        ('iEg', ('material',)),
+        ('BGN', ('material',)),
+    )
+
     def __init__(self, **kwargs):
         # update any values in cal_dts
         # that are passed
@@ -53,13 +60,14 @@ class BandGap(BaseModelClass):
         # pass values to models
         self._update_links()
 
-    def _update_links(self):
-
+    def _build_iEg(self):
         self.iEg = IntrinsicBandGap(material=self._cal_dts['material'],
                                     author=self._cal_dts['iEg_author'],
                                     temp=self._cal_dts['temp'],
                                     multiplier=self._cal_dts['multiplier'],
                                     )
+
+    def _build_BGN(self):
         self.BGN = BandGapNarrowing(material=self._cal_dts['material'],
                                     author=self._cal_dts['BGN_author'],
                                     temp=self._cal_dts['temp'],
@@ -75,14 +83,19 @@ class BandGap(BaseModelClass):
         Calculates the band gap
         '''
         self.calculationdetails = kwargs
+        self._update_links()
 
         # just prints a warning if the model is for the incorrect
         # dopants
         dopant_model_list = self.BGN.available_models(
             'dopant', self._cal_dts['dopant'])
 
+        # the author used when none is given is the default
+        author = self._cal_dts['BGN_author'] or \
+            self.BGN.Models['default']['model']
+
         # check dopant and model line up
-        if self._cal_dts['BGN_author'] not in dopant_model_list:
+        if author not in dopant_model_list:
             sys.exit(
                 '''\nThe BGN author you have selected was not for your'''
                 ''' selected dopant.\n'''
@@ -1,5 +1,4 @@
 
-import matplotlib.pylab as plt
 import os
 import numpy as np
 from semiconductor.material import bandgap_intrinsic_models as iBg
@@ -80,6 +79,7 @@ class IntrinsicBandGap(BaseModelClass):
         Displays a plot of the models against that taken from a
         respected website (https://www.pvlighthouse.com.au/)
         '''
+        import matplotlib.pylab as plt
         plt.figure('Intrinsic bandgap')
         t = np.linspace(1, 500)
 
@@ -35,25 +35,23 @@ def Passler(vals, temp):
     returns Eg in eV
     """
 
-    if not isinstance(temp, np.ndarray):
-        temp = np.asarray([temp])
+    temp = np.atleast_1d(np.asarray(temp, dtype=float))
 
-    if np.all(temp == 0):
-        gamma = 0
-    else:
-        gamma = (1. - 3. * vals['delta']**2) / \
-            (np.exp(vals['theta'] / temp) - 1)
+    # at 0 K the exponential is infinite, so gamma goes to 0
+    with np.errstate(divide='ignore', over='ignore'):
+        gamma = (1. - 3. * vals.delta**2) / \
+            (np.exp(vals.theta / temp) - 1)
 
-    xi = 2. * temp / vals['theta']
+    xi = 2. * temp / vals.theta
 
     # Values for each sum component
-    No2 = np.pi**2. * xi**2. / (3. * (1 + vals['delta']**2))
-    No3 = (3. * vals['delta']**2 - 1) / 4. * xi**3
+    No2 = np.pi**2. * xi**2. / (3. * (1 + vals.delta**2))
+    No3 = (3. * vals.delta**2 - 1) / 4. * xi**3
     No4 = 8. / 3. * xi**4.
     No5 = xi**6.
 
-    E = vals['E0'] - vals['alpha'] * vals['theta'] * \
-        (gamma + 3. * vals['delta']**2 / 2 *
+    E = vals.E0 - vals.alpha * vals.theta * \
+        (gamma + 3. * vals.delta**2 / 2 *
          ((1. + No2 + No3 + No4 + No5)**(1. / 6.) - 1))
     return E
 
@@ -63,13 +61,9 @@ def Varshni(vals, temp):
     Passler's paper suggests that this model is for very
     high dispersion relations  Delta  = 5/4
     '''
-    if not isinstance(temp, np.ndarray):
-        temp = np.asarray([temp])
+    temp = np.atleast_1d(np.asarray(temp, dtype=float))
 
-    if np.all(temp == 0):
-        Eg = vals['E0']
-    else:
-        Eg = vals['E0'] - vals['alpha'] * temp**2 / (temp + vals['beta'])
+    Eg = vals.E0 - vals.alpha * temp**2 / (temp + vals.beta)
     return Eg
 
 
@@ -80,7 +74,7 @@ def Cubic_partial(vals, temp):
     Bludau in 1974 10.1063/1.1663501.
 
     inputs:
-        vals a dictionary containing the coefs for a fit in the from
+        vals a record containing the coefs for a fit in the from
             Eg = \sum_{i=0}^3 ai + bi \times temp + ci \times temp^2
         and the temp range for each coeffieinct given by "ti". It is assumed
         that the ith values apply up to this temperature value.
@@ -89,26 +83,24 @@ def Cubic_partial(vals, temp):
         returns the band gap in eV
     '''
 
-    # this line is to make sure the number is a numpy 1D array
-    # really this should be somewhere else, as a general function and not here
-    temp = np.asarray([temp * 1.]).flatten()
+    # this line is to make sure the number is a numpy array, keeping the
+    # shape of the temperature passed
+    temp = np.atleast_1d(np.asarray(temp, dtype=float))
 
     Eg = np.copy(temp)
 
+    A, B, C, T = [vals.series[i] for i in 'ABCT']
+
     for i in [2, 1, 0]:
 
-        index = temp < float(vals['T' + str(i)])
+        index = temp < T[i]
 
-        Eg[index] = vals['A' + str(i)] + \
-            vals['B' + str(i)] * temp[index] + \
-            vals['C' + str(i)] * temp[index]**2.
+        Eg[index] = A[i] + B[i] * temp[index] + C[i] * temp[index]**2.
 
-    if np.any(temp > vals['T2']):
+    if np.any(temp > T[2]):
         print('\nWarning:'
               '\n\tIntrinsic bandgap does not cover this temperature range\n')
-        index = temp > vals['T2']
-        Eg[index] = vals['A2'] + \
-            vals['B2'] * temp[index] + \
-            vals['C2'] * temp[index]**2.
+        index = temp > T[2]
+        Eg[index] = A[2] + B[2] * temp[index] + C[2] * temp[index]**2.
 
     return Eg
@@ -2,12 +2,11 @@
 # UTF-8
 
 import numpy as np
-import matplotlib.pylab as plt
 import os
 import configparser
 import scipy.constants as C
 
-from semiconductor.helper.helper import BaseModelClass
+from semiconductor.helper.helper import BaseModelClass, memoize
 from semiconductor.material import bandgap_narrowing_models as Bgn
 from semiconductor.general_functions import carrierfunctions as GF
 
@@ -68,6 +67,7 @@ class BandGapNarrowing(BaseModelClass):
         # initiate the first model
         self.change_model(self._cal_dts['author'])
 
+    @memoize()
     def update(self, **kwargs):
         '''
         Calculates the band gap narrowing
@@ -91,7 +91,9 @@ class BandGapNarrowing(BaseModelClass):
                                  nxc=self._cal_dts['nxc'],
                                  temp=self._cal_dts['temp'])
 
-        doping = np.array(np.abs(self._cal_dts['Na'] - self._cal_dts['Nd']))
+        # the doping takes the broadcast shape of all the inputs
+        doping = np.broadcast_to(
+            np.abs(self._cal_dts['Na'] - self._cal_dts['Nd']), ne.shape)
 
         return getattr(Bgn, self.model)(
             self.vals,
@@ -114,8 +116,7 @@ class BandGapNarrowing(BaseModelClass):
         if not isinstance(mult, np.ndarray):
             mult = np.asarray([mult])
 
-        assert ni.shape == mult.shape or ni.shape[0] == 1
-
+        # numpy raises an error if the shapes can not be broadcast
         return ni * mult
 
     def ni_multiplier(self, **kwargs):
@@ -130,6 +131,7 @@ class BandGapNarrowing(BaseModelClass):
         return np.exp(BGN / vt / 2.)
 
     def check_models(self):
+        import matplotlib.pylab as plt
         plt.figure('Bandgap narrowing')
         Nd = 0.
         dn = 1e14
@@ -204,6 +206,7 @@ def check_Schenk(fig, ax):
     ax.semilogx()
 
 if __name__ == '__main__':
+    import matplotlib.pylab as plt
 
     bgn = BandGapNarrowing()
     bgn.check_models()
@@ -25,17 +25,13 @@ def apparent_BGN(vals, doping, **kargs):
     returns the band gap narrowing in eV
     '''
 
-    if type(doping).__module__ != np.__name__:
-        doping = np.array(doping)
+    doping = np.asarray(doping, dtype=float)
 
-    BGN = np.zeros(np.array(doping).shape)
-
-    index = doping > vals['n_onset']
-
-    # making sure there are values to assign
-    if np.sum(index) > 0:
-        BGN[index] = (
-            vals['de_slope'] * np.log(doping[index] / vals['n_onset']))
+    # only doping above the onset narrows the band gap
+    with np.errstate(divide='ignore'):
+        BGN = np.where(doping > vals.N_onset,
+                       vals.de_slope * np.log(doping / vals.N_onset),
+                       0.)
 
     return BGN
 
@@ -44,7 +40,7 @@ def not_implimented(vals, doping, **kargs):
     '''
     model not implemented, returning 0 values
     '''
-    return np.zeros(doping.shape)
+    return np.zeros(np.shape(doping))
 
 
 def BGN(vals, doping, **kargs):
@@ -58,15 +54,13 @@ def BGN(vals, doping, **kargs):
     '''
     # BGN = np.zeros(doping.shape)
 
-    bgn = vals['de_slope']\
-        * np.power(np.log(doping / vals['N_onset']), vals['b'])\
-        + vals['de_offset']
+    with np.errstate(divide='ignore'):
+        bgn = vals.de_slope\
+            * np.power(np.log(doping / vals.N_onset), vals.b)\
+            + vals.de_offset
 
     # ensures no negitive values
-    if bgn.size > 1:
-        bgn[bgn < 0] = 0
-
-    return bgn
+    return np.maximum(bgn, 0)
 
 
 def Schenk(vals, Nd, Na, ne, nh, temp, **args):
@@ -81,63 +75,66 @@ def Schenk(vals, Nd, Na, ne, nh, temp, **args):
     '''
 
     # makes the values unitless
-    ne = (vals['aex']**3.) * ne
-    nh = (vals['aex']**3.) * nh
-    Na = (vals['aex']**3.) * Na
-    Nd = (vals['aex']**3.) * Nd
+    ne = (vals.aex**3.) * ne
+    nh = (vals.aex**3.) * nh
+    Na = (vals.aex**3.) * Na
+    Nd = (vals.aex**3.) * Nd
 
     n_sum = ne + nh
     n_ionic = Na + Nd
 
-    n_p = vals['alphae'] * ne + vals['alphah'] * nh
+    n_p = vals.alphae * ne + vals.alphah * nh
 
     # cacualtes curly T, to give linear dependence with temp
-    vals['t'] = Const.k * temp / vals['ryex'] / Const.e
+    t = Const.k * temp / vals.Ryex / Const.e
 
-    delta_Ec = ridged_shift(vals, n_sum, n_p, ne, 'e')\
-        + ionic_shift(vals, n_sum, n_p, n_ionic, 'e')
-    delta_EV = ridged_shift(vals, n_sum, n_p, nh, 'h')\
-        + ionic_shift(vals, n_sum, n_p, n_ionic, 'h')
+    delta_Ec = ridged_shift(vals, t, n_sum, n_p, ne, 'e')\
+        + ionic_shift(vals, t, n_sum, n_p, n_ionic, 'e')
+    delta_EV = ridged_shift(vals, t, n_sum, n_p, nh, 'h')\
+        + ionic_shift(vals, t, n_sum, n_p, n_ionic, 'h')
 
     # print(delta_Ec, delta_EV)
     return delta_Ec + delta_EV
 
 
-def ridged_shift(vals, n_sum, n_p, num_carrier, carrier):
+def ridged_shift(vals, t, n_sum, n_p, num_carrier, carrier):
     '''
     The rigid quasi-particle shift for a band
     the subscript a represents a carrier value (electron or hole)
     '''
 
+    c = vals.carriers[carrier]
+
     delta = -(
         (4. * Const.pi)**3. * n_sum**2. *
         (
-            (48. * num_carrier / Const.pi / vals['g' + carrier])**(1. / 3.)
-            + vals['c' + carrier] * np.log(1. + vals['d' + carrier] *
-                                           n_p**vals['p' + carrier]))
-        + (8. * Const.pi * vals['alpha' + carrier] / vals['g' + carrier])
-        * num_carrier * vals['t']**2.
-        + np.sqrt(8. * Const.pi * n_sum) * vals['t']**(5. / 2.)
+            (48. * num_carrier / Const.pi / c.g)**(1. / 3.)
+            + c.c * np.log(1. + c.d * n_p**c.p))
+        + (8. * Const.pi * c.alpha / c.g)
+        * num_carrier * t**2.
+        + np.sqrt(8. * Const.pi * n_sum) * t**(5. / 2.)
     ) / (
-        (4. * Const.pi)**3. * n_sum**2. + vals['t']**3. + vals['b' + carrier] *
-        np.sqrt(n_sum) * vals['t']**2. + 40. * n_sum**1.5 * vals['t'])
-    return -vals['ryex'] * delta
+        (4. * Const.pi)**3. * n_sum**2. + t**3. + c.b *
+        np.sqrt(n_sum) * t**2. + 40. * n_sum**1.5 * t)
+    return -vals.Ryex * delta
 
 
-def ionic_shift(vals, n_sum, n_p, n_ionic, carrier):
+def ionic_shift(vals, t, n_sum, n_p, n_ionic, carrier):
     '''
     The ionic quasi-particle shift for a band
     '''
 
-    U = n_sum**2. / vals['t']**3.
+    c = vals.carriers[carrier]
+
+    U = n_sum**2. / t**3.
 
     delta = -n_ionic * (1. + U) / (
-        np.sqrt(vals['t'] * n_sum / 2. / Const.pi) *
+        np.sqrt(t * n_sum / 2. / Const.pi) *
         (
-            1. + vals['h' + carrier] * np.log(1. + np.sqrt(n_sum) / vals['t'])
+            1. + c.h * np.log(1. + np.sqrt(n_sum) / t)
         )
-        + vals['j' + carrier] * U * n_p**.75 *
-        (1. + vals['k' + carrier] * n_p**vals['q' + carrier])
+        + c.j * U * n_p**.75 *
+        (1. + c.k * n_p**c.q)
     )
 
-    return -vals['ryex'] * delta
+    return -vals.Ryex * delta
@@ -2,11 +2,10 @@
 # UTF-8
 
 import numpy as np
-import matplotlib.pylab as plt
 import sys
 import os
 
-from semiconductor.helper.helper import BaseModelClass
+from semiconductor.helper.helper import BaseModelClass, memoize
 from semiconductor.material import densityofstates_models as dos_models
 from semiconductor.material.bandgap_intrinsic import IntrinsicBandGap as Egi
 
@@ -57,6 +56,7 @@ class DOS(BaseModelClass):
         # initiate the first model
         self.change_model(self._cal_dts['author'])
 
+    @memoize('Nc', 'Nv')
     def update(self, **kwargs):
         '''
         a function to update the density of states
@@ -105,6 +105,7 @@ class DOS(BaseModelClass):
         return self.Nc, self.Nv
 
     def check_models(self):
+        import matplotlib.pylab as plt
         temp = np.logspace(0, np.log10(600))
         num = len(self.available_models())
 
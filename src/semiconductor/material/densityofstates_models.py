@@ -13,10 +13,10 @@ def Couderc(vals, temp, **kwargs):
     polynomial. 
     '''
 
-    dc_value = vals['ac'] * temp**3 + vals['bc'] * \
-        temp**2 + vals['cc'] * temp + vals['dc']
-    dv_value = vals['av'] * temp**3 + vals['bv'] * \
-        temp**2 + vals['cv'] * temp + vals['dv']
+    dc_value = vals['Ac'] * temp**3 + vals['Bc'] * \
+        temp**2 + vals['Cc'] * temp + vals['Dc']
+    dv_value = vals['Av'] * temp**3 + vals['Bv'] * \
+        temp**2 + vals['Cv'] * temp + vals['Dv']
 
     # The constant is
     coef = (2. * const.pi / const.h / const.h * const.k * const.m_e)
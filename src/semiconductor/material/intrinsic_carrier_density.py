@@ -2,11 +2,10 @@
 # UTF-8
 
 import numpy as np
-from pylab import *
 import os
 import scipy.constants as Const
 from semiconductor.material.bandgap_intrinsic import IntrinsicBandGap
-from semiconductor.helper.helper import BaseModelClass
+from semiconductor.helper.helper import BaseModelClass, memoize
 from semiconductor.material import ni_models
 
 
@@ -57,6 +56,7 @@ class IntrinsicCarrierDensity(BaseModelClass):
         # initiate the first model
         self.change_model(self._cal_dts['author'])
 
+    @memoize('ni')
     def update(self, **kwargs):
         '''
         a function to update the intrinsic BandGap
@@ -99,6 +99,7 @@ class IntrinsicCarrierDensity(BaseModelClass):
         '''
         Displays a plot of all the models against experimental data
         '''
+        import matplotlib.pylab as plt
         # fig = plt.figure('Intrinsic carriers')
         fig, ax = plt.subplots(1)
         fig.suptitle('Intrinsic carrier concentration')
@@ -10,13 +10,11 @@ def ni_temp(vals, temp, **kargs):
      given by
     """
 
-    if not isinstance(temp, np.ndarray):
-        temp = np.asarray([temp])
+    temp = np.atleast_1d(np.asarray(temp, dtype=float))
 
-    if np.all(temp == 0):
-        ni = 0
-    else:
-        ni = vals['a'] * (temp)**vals['power'] * \
+    # at 0 K the exponential goes to 0
+    with np.errstate(divide='ignore'):
+        ni = vals['A'] * (temp)**vals['power'] * \
             np.exp(- vals['eg'] / temp)
 
     return ni
@@ -28,14 +26,10 @@ def ni_temp_eg(vals, temp,  Eg, *args):
      Heinke3 and Macfarlane et a1.31 as cited by Green,3
     """
 
-    if not isinstance(temp, np.ndarray):
-        temp = np.asarray([temp])
+    temp = np.atleast_1d(np.asarray(temp, dtype=float))
 
-    if np.all(temp == 0):
-        ni = 0
-    else:
-        print('\n\n', type(vals['A']), vals['A'])
-        print(type(vals['power']), vals['power'])
+    # at 0 K the exponential goes to 0
+    with np.errstate(divide='ignore'):
         ni = vals['A'] * temp**vals['power'] * \
             np.exp(- Eg * Const.e / 2. / Const.k / temp)
 
@@ -2,7 +2,7 @@
 import os
 import numpy as np
 import scipy.constants as Const
-from semiconductor.helper.helper import BaseModelClass
+from semiconductor.helper.helper import BaseModelClass, memoize
 from semiconductor.material import vel_th_models
 from semiconductor.material.bandgap_intrinsic import IntrinsicBandGap as Egi
 
@@ -48,6 +48,7 @@ class ThermalVelocity(BaseModelClass):
         # initiate the first model
         self.change_model(self._cal_dts['author'])
 
+    @memoize('vel_th_e', 'vel_th_h')
     def update(self, **kwargs):
         '''
         a function to update the thermal velocity
@@ -9,20 +9,20 @@ def Green_1990(vals, temp, Egratio, **kargs):
      inputs:
         vals: (dic)
             the effect mass values
-        temp: (float)
+        temp: (array like)
             the temperature in kelvin
 
     outputs:
-        vel_th_c: (float)
+        vel_th_c: (array like)
             the termal velocity for the conduction in cm/s
-        vel_th_v: (float)
+        vel_th_v: (array like)
             the termal velocity for the valance band in cm/s
     """
 
     # the values relative to the rest mass
-    ml = vals['ml'] * const.m_e
+    ml = vals.ml * const.m_e
 
-    mt = vals['mt'] * Egratio * const.m_e
+    mt = vals.mt * Egratio * const.m_e
 
     delta = np.sqrt((ml - mt) / ml)
     # conduction band effective mass
@@ -31,8 +31,9 @@ def Green_1990(vals, temp, Egratio, **kargs):
 
     vel_th_c = np.sqrt(8 * const.k * temp / np.pi / mth_c)
     # valance band effective mass, its a 7 order poynomial fit
-    mth_v = np.sum(
-        [vals['meth_v' + str(i)] * temp**i for i in range(8)]) * const.m_e
+    mth_v = sum(
+        coef * temp**i
+        for i, coef in enumerate(vals.series['meth_v'])) * const.m_e
 
     vel_th_v = np.sqrt(8 * const.k * temp / np.pi / mth_v)
 
@@ -45,4 +46,4 @@ def constants(vals, **kwargs):
     Returns a constant value
     """
 
-    return vals['vth_e'], vals['vth_h']
+    return vals.vth_e, vals.vth_h
@@ -1,5 +1,4 @@
 import numpy as np
-import matplotlib.pylab as plt
 import sys
 import os
 import scipy.constants as Const
@@ -226,6 +225,7 @@ class EscapeProbability(BaseModelClass):
 
 
 if __name__ == "__main__":
+    import matplotlib.pylab as plt
     a = EscapeProbability()
 
     a.double_side_polished(0, 0)
@@ -1,5 +1,4 @@
 import numpy as np
-from matplotlib.pylab import *
 import sys
 import os
 import scipy.constants as const
@@ -11,6 +10,9 @@ from semiconductor.helper.helper import BaseModelClass
 
 import inspect
 
+# numpy 2 renamed trapz to trapezoid
+_trapz = getattr(np, 'trapezoid', None) or np.trapz
+
 
 class SpontaneousRadiativeEmission(BaseModelClass):
 
@@ -43,17 +45,21 @@ class SpontaneousRadiativeEmission(BaseModelClass):
         self.calculationdetails = kwargs
         self._update_links()
 
-    def _update_links(self):
-        '''
-        updates the models used, or takes a passed class
-        '''
+    # the linked models, and the calculation details they depend on
+    _link_graph = (
+        ('optics', ('material', 'temp', 'optics_k_author',
+                    'optics_n_author')),
+        ('ni', ('material', 'temp', 'ni_author')),
+    )
 
+    def _build_optics(self):
         self._optics = opticalproperties.TabulatedOpticalProperties(
             material=self._cal_dts['material'],
             temp=self._cal_dts['temp'],
             abs_author=self._cal_dts['optics_k_author'],
             ref_author=self._cal_dts['optics_n_author'])
 
+    def _build_ni(self):
         self._ni = ni.IntrinsicCarrierDensity(
             material=self._cal_dts['material'],
             author=self._cal_dts['ni_author'],
@@ -196,26 +202,37 @@ class luminescence_emission(BaseModelClass):
         doping=1e16,  # the doping in cm^-3
         )
 
+    # the linked models and values, and the calculation details they
+    # depend on
+    _link_graph = (
+        ('x', ('width', 'nxc')),
+        ('sre', ('material', 'temp', 'optics_k_author', 'optics_n_author',
+                 'ni_author')),
+        ('esc', ('material', 'temp', 'optics_k_author', 'optics_n_author',
+                 'wafer_opitcs', 'detection_side', 'x', 'sre')),
+    )
+
     def __init__(self, **kwargs):
 
         self.calculationdetails = kwargs
 
         self._index = None
 
-        self._update_x_dist()
         self._update_links()
 
-    def _update_x_dist(self):
+    def _build_x(self):
         '''
-        updates the distance
+        updates the distance, which only changes with the width and
+        number of excess carrier values
         '''
         self._x = np.linspace(0, self._cal_dts['width'],
                               self._cal_dts['nxc'].shape[0])
+        return self._x
 
-    def _update_links(self):
+    def _build_sre(self):
         '''
-        A function where the links to other
-        instances's is completely refreshed.
+        the spontaneous emission, and its optical constants at the
+        wavelengths used
         '''
         self._sre = SpontaneousRadiativeEmission(
             temp=self._cal_dts['temp'],
@@ -227,6 +244,7 @@ class luminescence_emission(BaseModelClass):
 
         # I got lasy, so i'm using the previous classes stuff
         self._optics = self._sre._optics
+        self._wavelength = self._optics.wavelength
 
         if self._index is None:
             self._index = self._optics.wavelength > 0
@@ -239,6 +257,10 @@ class luminescence_emission(BaseModelClass):
 
         self._sre._optics = self._optics
 
+    def _build_esc(self):
+        '''
+        the escape probability from each depth
+        '''
         self._esc = absorptance.EscapeProbability(
             material=self._cal_dts['material'],
             optics_k_author=self._cal_dts['optics_k_author'],
@@ -269,8 +291,12 @@ class luminescence_emission(BaseModelClass):
         i.e. optical cosntants, ni, an escape fraction
         """
 
-        self._index = self._optics.wavelength > wl_min
-        self._index *= self._optics.wavelength < wl_max
+        self._index = self._wavelength > wl_min
+        self._index *= self._wavelength < wl_max
+
+        # the optical constants are remade for these wavelengths
+        self._invalidate_link('sre')
+        self._update_links()
 
     def _update_escape(self):
         """
@@ -293,7 +319,6 @@ class luminescence_emission(BaseModelClass):
         # ensure inputs are good
         if bool(kwargs):
             self.calculationdetails = kwargs
-            self._update_x_dist()
             self._update_links()
 
         # cacualte the generated PL
@@ -305,7 +330,7 @@ class luminescence_emission(BaseModelClass):
         assert self._cal_dts['nxc'].shape == self._x.shape, (
             "nxc is different length to x spacing")
 
-        Spectral_PL = np.trapz(
+        Spectral_PL = _trapz(
             (
                 (sre * self._escapeprob).T *
                 self._cal_dts['nxc'] *
@@ -322,4 +347,4 @@ class luminescence_emission(BaseModelClass):
         currently this does NOTHING
         """
         spectral = self.calculate_spectral(**kwargs)
-        return np.trapz(spectral, self._optics.wavelength)
+        return _trapz(spectral, self._optics.wavelength)
@@ -1,4 +1,25 @@
+import importlib
 
+# the classes are imported from their modules when first accessed
+_classes = {
+    'Intrinsic': 'intrinsic',
+    'Radiative': 'intrinsic',
+    'Auger': 'intrinsic',
+    'SRH': 'extrinsic',
+    'DPSS': 'defect_parameters',
+    'EffectiveLifetime': 'effective_lifetime',
+}
 
-from .intrinsic import Intrinsic, Radiative, Auger
-from .extrinsic import SRH
+
+def __getattr__(name):
+    if name in _classes:
+        value = getattr(
+            importlib.import_module('.' + _classes[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(
+        'module {0!r} has no attribute {1!r}'.format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_classes))
@@ -0,0 +1,365 @@
+#!/usr/local/bin/python
+# UTF-8
+
+import os
+import numpy as np
+import scipy.constants as const
+from concurrent.futures import ProcessPoolExecutor
+
+from semiconductor.helper.helper import BaseModelClass
+from semiconductor.general_functions.carrierfunctions import get_carriers
+from semiconductor.recombination.extrinsic import SRH
+
+
+class DPSS(BaseModelClass):
+    '''
+    Fits measured Shockley Read Hall lifetimes to find the defect
+    parameter solution surface (DPSS): the energy level of the defect, Et,
+    and the ratio of its capture cross sections, k = sigma_e / sigma_h.
+
+    The SRH lifetime of a curve is linear in the electron capture time
+    constant, tau_e, for a given Et and k:
+
+        tau = tau_e (k' A + B)
+        A = nxc (ne + ne1) / (ne nh - nieff^2)
+        B = nxc (nh + nh1) / (ne nh - nieff^2)
+
+    where k' = k vth_e / vth_h. So, for each Et and k, the tau_e that
+    minimises the relative error of a curve has a closed form, found from
+    sums of A and B over the excess carrier densities. These sums are
+    calculated for every Et at once, and the surface of every Et and k
+    follows from them without looping over the excess carrier densities
+    again.
+
+    Several curves of the same defect, measured at different dopings or
+    temperatures, are combined by adding their residuals. The curves of a
+    defect share Et and k, but each has its own tau_e.
+
+    The carrier densities, effective intrinsic carrier density and thermal
+    velocities are taken from an SRH model, so the measured lifetimes
+    should only be due to the defect being fitted.
+
+    inputs:
+        1. material: (str, Si)
+            The elemental name for the material
+        2. temp: (float Kelvin, 300)
+            The temperature of a curve, if not provided with the curve
+        3. Na: (float cm^-3)
+            The number of acceptor dopants of a curve, if not provided
+            with the curve
+        4. Nd: (float cm^-3)
+            The number of donar dopants of a curve, if not provided with
+            the curve
+        5. vth_author: (str)
+            Author for the thermal velocity model to be used
+        6. ni_author: (str)
+            Author for the intrinsic carrier density
+        7. BGN_author: (str)
+            Author for the band gap narrowing model
+        8. Et: (array like eV)
+            The defect energy levels, from the mid gap, to evaluate
+        9. k: (array like)
+            The capture cross section ratios to evaluate
+    '''
+
+    _cal_dts = {
+        'material': 'Si',
+        'temp': 300.,
+        'Na': 1e16,
+        'Nd': 0,
+        'vth_author': None,
+        'ni_author': None,
+        'BGN_author': None,
+        'Et': np.linspace(-0.55, 0.55, 1101),
+        'k': np.logspace(-5, 5, 201),
+    }
+
+    # the linked models, and the calculation details they depend on
+    _link_graph = (
+        ('srh', ('material', 'vth_author', 'ni_author', 'BGN_author')),
+    )
+
+    # the number of golden section steps taken to refine k
+    _search_steps = 40
+
+    def __init__(self, **kwargs):
+        self.calculationdetails = kwargs
+        self._update_links()
+
+    def _build_srh(self):
+        self.srh = SRH(material=self._cal_dts['material'],
+                       vth_author=self._cal_dts['vth_author'],
+                       ni_author=self._cal_dts['ni_author'],
+                       BGN_author=self._cal_dts['BGN_author'])
+
+    def _sums(self, nxc, tau, **kwargs):
+        '''
+        returns the sums over the excess carrier densities of a curve that
+        the least squares fit of each Et is found from, with the shape
+        (5, Et), the ratio of the thermal velocities and the number of
+        points.
+        '''
+        if bool(kwargs):
+            self.calculationdetails = kwargs
+        self._update_links()
+
+        nxc = np.asarray(nxc, dtype=float)
+        w = 1. / np.asarray(tau, dtype=float)
+
+        srh = self.srh
+        srh.calculationdetails = {
+            'temp': self._cal_dts['temp'],
+            'Na': self._cal_dts['Na'],
+            'Nd': self._cal_dts['Nd'],
+            'nxc': nxc}
+        srh._update_links()
+
+        ne, nh = get_carriers(Na=self._cal_dts['Na'],
+                              Nd=self._cal_dts['Nd'],
+                              nxc=nxc,
+                              temp=self._cal_dts['temp'],
+                              material=self._cal_dts['material'],
+                              ni=srh.nieff)
+
+        # the levels are along the first axis, the excess carriers along
+        # the second. The inverse measured lifetime is included so the
+        # error is relative.
+        Et = np.asarray(self._cal_dts['Et'], dtype=float)[:, None]
+        Vt = const.k * self._cal_dts['temp'] / const.e
+        base = nxc * w / (ne * nh - srh.nieff**2)
+        A = base * (ne + srh.nieff * np.exp(Et / Vt))
+        B = base * (nh + srh.nieff * np.exp(-Et / Vt))
+
+        sums = np.stack([A.sum(axis=1),
+                         B.sum(axis=1),
+                         np.einsum('ij,ij->i', A, A),
+                         np.einsum('ij,ij->i', A, B),
+                         np.einsum('ij,ij->i', B, B)])
+
+        return sums, np.squeeze(srh.vel_th_e / srh.vel_th_h), nxc.size
+
+    @staticmethod
+    def _residual(sums, kp, N):
+        '''
+        the electron capture time constant and mean squared relative error
+        of the least squares fit of tau_e (k' A + B) / tau = 1, for the
+        sums of each Et and the values of k', which are broadcast
+        together.
+        '''
+        SA, SB, SAA, SAB, SBB = sums
+        S1 = kp * SA + SB
+        S2 = kp * (kp * SAA + 2. * SAB) + SBB
+        return S1 / S2, np.maximum(1. - S1**2 / S2 / N, 0)
+
+    def surface(self, nxc, tau, **kwargs):
+        '''
+        calculates the defect parameter solution surface of a single
+        lifetime curve.
+
+        inputs:
+            nxc: (array like cm^-3)
+                The excess carrier densities of the curve
+            tau: (array like s)
+                The measured SRH lifetimes
+            **kwargs:
+                any of the calculation details, such as the temperature
+                and doping of the curve
+
+        output:
+            tau_e: (array s)
+                the electron capture time constant that best fits the
+                curve, with the shape (Et, k)
+            residual: (array)
+                the mean squared relative error of the fit, with the shape
+                (Et, k)
+        '''
+        sums, ratio, N = self._sums(nxc, tau, **kwargs)
+        return self._residual(
+            sums[..., None],
+            np.asarray(self._cal_dts['k'], dtype=float) * ratio, N)
+
+    def dpss(self, nxc, tau, **kwargs):
+        '''
+        calculates the defect parameter solution curve of a single lifetime
+        curve: the k and tau_e that best fit the curve for each Et.
+
+        For a given Et, the k' that minimises the error solves
+
+            k' (SA SAB - SB SAA) = SB SAB - SA SBB
+
+        where SA, SB, SAA, SAB and SBB are the sums of A, B, A^2, AB and
+        B^2, so the curve is exact rather than limited to the grid of k.
+        Where this does not give a positive k, the best k on the grid is
+        used.
+
+        inputs:
+            as for surface
+
+        output:
+            k: (array)
+                the capture cross section ratio of each Et
+            tau_e: (array s)
+                the electron capture time constant of each Et
+        '''
+        sums, ratio, N = self._sums(nxc, tau, **kwargs)
+        k = np.asarray(self._cal_dts['k'], dtype=float)
+        return self._dpss(
+            sums, ratio, N, self._residual(sums[..., None], k * ratio, N)[1])
+
+    def _dpss(self, sums, ratio, N, residual):
+        SA, SB, SAA, SAB, SBB = sums
+        with np.errstate(divide='ignore', invalid='ignore'):
+            kp = (SB * SAB - SA * SBB) / (SA * SAB - SB * SAA)
+
+        invalid = ~np.isfinite(kp) | ~(kp > 0)
+        kp[invalid] = np.asarray(self._cal_dts['k'], dtype=float)[
+            np.argmin(residual[invalid], axis=1)] * ratio
+
+        return kp / ratio, self._residual(sums, kp, N)[0]
+
+    def fit(self, curves, **kwargs):
+        '''
+        finds the energy level and capture cross section ratio that best
+        fit several lifetime curves of the same defect.
+
+        The residuals of the curves are averaged over the grid of Et and
+        k. For each Et, k is then refined by a golden section search
+        between the neighbours of its best value on the grid, and the Et
+        with the smallest refined residual is taken.
+
+        inputs:
+            curves: (list of dict)
+                each curve has the excess carrier densities, nxc, and the
+                measured lifetimes, tau, and may provide calculation
+                details, such as its temperature and doping.
+            **kwargs:
+                any of the calculation details, used for curves that do
+                not provide them
+
+        output: (dict)
+            Et: (float eV)
+                the best energy level, from the mid gap
+            k: (float)
+                the best capture cross section ratio
+            tau_e: (array s)
+                the electron capture time constant of each curve at the
+                best Et and k
+            residual: (float)
+                the mean squared relative error of the best fit
+            surface: (array)
+                the mean of the curves residuals, with the shape (Et, k)
+            dpss_k: (array)
+                the best k for each Et of each curve, with the shape
+                (curves, Et)
+            dpss_tau_e: (array s)
+                the tau_e of dpss_k, with the shape (curves, Et)
+        '''
+        if bool(kwargs):
+            self.calculationdetails = kwargs
+        defaults = dict(self._cal_dts)
+
+        k = np.asarray(self._cal_dts['k'], dtype=float)
+
+        surface = 0.
+        fitted, dpss_k, dpss_tau_e = [], [], []
+        for curve in curves:
+            details = dict(defaults)
+            details.update(curve)
+            sums, ratio, N = self._sums(**details)
+            residual = self._residual(sums[..., None], k * ratio, N)[1]
+
+            _k, _tau_e = self._dpss(sums, ratio, N, residual)
+            dpss_k.append(_k)
+            dpss_tau_e.append(_tau_e)
+            fitted.append((sums, ratio, N))
+            surface = surface + residual
+        surface = surface / len(curves)
+
+        self.calculationdetails = defaults
+
+        def combined(log_k):
+            return sum(self._residual(sums, np.exp(log_k) * ratio, N)[1]
+                       for sums, ratio, N in fitted) / len(fitted)
+
+        # a golden section search of each Et, between the neighbours of
+        # the best k on the grid
+        j = np.argmin(surface, axis=1)
+        lower = np.log(k[np.maximum(j - 1, 0)])
+        upper = np.log(k[np.minimum(j + 1, k.size - 1)])
+        golden = (np.sqrt(5.) - 1.) / 2.
+        for n in range(self._search_steps):
+            x1 = upper - golden * (upper - lower)
+            x2 = lower + golden * (upper - lower)
+            smaller = combined(x1) < combined(x2)
+            upper = np.where(smaller, x2, upper)
+            lower = np.where(smaller, lower, x1)
+        log_k = (lower + upper) / 2.
+
+        # keep the grid value where it is better, such as at its edges
+        residual = combined(log_k)
+        grid = surface[np.arange(j.size), j] <= residual
+        log_k[grid] = np.log(k[j[grid]])
+        residual[grid] = surface[np.arange(j.size), j][grid]
+
+        i = np.argmin(residual)
+        best_k = np.exp(log_k[i])
+
+        return {
+            'Et': self._cal_dts['Et'][i],
+            'k': best_k,
+            'tau_e': np.array([
+                self._residual(sums[:, i], best_k * ratio, N)[0]
+                for sums, ratio, N in fitted]),
+            'residual': residual[i],
+            'surface': surface,
+            'dpss_k': np.array(dpss_k),
+            'dpss_tau_e': np.array(dpss_tau_e),
+        }
+
+    def fit_samples(self, samples, max_workers=None, **kwargs):
+        '''
+        fits the curves of several independent samples, spreading the
+        samples over a pool of processes.
+
+        inputs:
+            samples: (list)
+                the curves of each sample, as taken by fit
+            max_workers: (int, optional)
+                the number of processes. Defaults to the number of
+                processors. A value of 1 fits the samples in this process.
+            **kwargs:
+                any of the calculation details
+
+        output:
+            results: (list of dict)
+                the fit of each sample, as returned by fit
+        '''
+        if bool(kwargs):
+            self.calculationdetails = kwargs
+
+        samples = list(samples)
+        if max_workers == 1 or len(samples) < 2:
+            return [self.fit(i) for i in samples]
+
+        # each process fits a block of samples with its own model, so the
+        # model is only built once for each block
+        blocks = min(len(samples), (max_workers or os.cpu_count() or 1) * 4)
+        chunks = [samples[i::blocks] for i in range(blocks)]
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            fitted = list(executor.map(
+                _fit_block,
+                [(dict(self._cal_dts), i) for i in chunks]))
+
+        results = [None] * len(samples)
+        for n, block in enumerate(fitted):
+            results[n::blocks] = block
+        return results
+
+
+def _fit_block(args):
+    '''
+    fits a block of samples in a worker process
+    '''
+    details, samples = args
+    model = DPSS(**details)
+    return [model.fit(i) for i in samples]
@@ -0,0 +1,324 @@
+#!/usr/local/bin/python
+# UTF-8
+
+import numpy as np
+import scipy.constants as const
+
+from semiconductor.helper.helper import BaseModelClass
+from semiconductor.general_functions.carrierfunctions import get_carriers
+from semiconductor.recombination.intrinsic import Radiative, Auger
+from semiconductor.recombination.extrinsic import SRH
+from semiconductor.electrical.mobility import Mobility
+
+
+class EffectiveLifetime(BaseModelClass):
+    '''
+    Calculates the effective lifetime of a wafer from its radiative,
+    Auger, Shockley Read Hall and surface recombination.
+
+    One model of each mechanism is kept, and only rebuilt when its
+    material or author changes. The other calculation details are passed
+    when the lifetimes are calculated, so the doping, excess carrier
+    density and temperature can be arrays, which are broadcast together.
+    The intrinsic carrier density and dark carriers are calculated once
+    and shared by the mechanisms.
+
+    The surface recombination is provided by a surface recombination
+    velocity, S, or a saturation current density, J0. Each is either a
+    (front, back) tuple or list, or a single value used for both surfaces
+    of the wafer. For S, the lifetime is that of the slowest decaying
+    distribution of carriers diffusing to the surfaces, from the ambipolar
+    diffusivity, D:
+
+        1 / tau_s = x^2 D / W^2
+        tan(x) = x (a_f + a_b) / (x^2 - a_f a_b),  a = S W / D
+
+    where x is the root in (0, pi]. For equal surfaces this is close to
+    tau_s = W / (2 S) + W^2 / (pi^2 D). For J0:
+
+        1 / tau_s = (J0_f + J0_b) (ne nh - nieff^2) / (q nieff^2 W nxc)
+
+    If both are provided, their recombination is added.
+
+    inputs
+        1. material: (str, Si)
+            The elemental name for the material
+        2. temp: (float Kelvin, 300)
+            The temperature of the material
+        3. Na: (array like cm^-3)
+            The number of acceptor dopants
+        4. Nd: (array like cm^-3)
+            The number of donar dopants
+        5. nxc: (array like cm^-3)
+            The number of excess carriers
+        6. ni_author: (str)
+            Author for the intrinsic carrier density
+        7. rad_author, aug_author: (str)
+            Authors for the radiative and Auger recombination
+        8. defect: (str or list)
+            The defect, or defects, for the SRH recombination
+        9. Nt: (float or array like cm^-3)
+            The number of defects. A list of defects can have a value for
+            each defect.
+        10. vth_author, BGN_author: (str)
+            Authors for the thermal velocity and band gap narrowing used
+            for the SRH and surface recombination
+        11. mob_author: (str)
+            Author for the mobility, used for the diffusion of carriers
+            to the surfaces
+        12. S: (float, array like or (front, back) cm s^-1)
+            The surface recombination velocity of both surfaces, or of
+            the front and back surfaces. The values are broadcast with
+            the doping and excess carrier densities.
+        13. J0: (float, array like or (front, back) A cm^-2)
+            The saturation current density of both surfaces, or of the
+            front and back surfaces, as for S
+        14. W: (float cm)
+            The thickness of the wafer
+    '''
+
+    _cal_dts = {
+        'material': 'Si',
+        'temp': 300.,
+        'Na': 1e16,
+        'Nd': 0,
+        'nxc': 1e15,
+        'ni_author': None,
+        'rad_author': None,
+        'aug_author': None,
+        'defect': None,
+        'Nt': 1e10,
+        'vth_author': None,
+        'BGN_author': None,
+        'mob_author': None,
+        'S': None,
+        'J0': None,
+        'W': 0.018,
+    }
+
+    # the linked models, and the calculation details they depend on. The
+    # other details are passed when the lifetimes are calculated.
+    _link_graph = (
+        ('Radiative', ('material', 'rad_author')),
+        ('Auger', ('material', 'aug_author')),
+        ('SRH', ('material', 'defect')),
+        ('Mobility', ('material', 'mob_author')),
+    )
+
+    def __init__(self, **kwargs):
+        self.calculationdetails = kwargs
+        self._update_links()
+
+    def _build_Radiative(self):
+        self.Radiative = Radiative(material=self._cal_dts['material'],
+                                   author=self._cal_dts['rad_author'])
+
+    def _build_Auger(self):
+        self.Auger = Auger(material=self._cal_dts['material'],
+                           author=self._cal_dts['aug_author'])
+
+    def _build_SRH(self):
+        defect = self._cal_dts['defect']
+        if isinstance(defect, (list, tuple)):
+            defect = None
+        self.SRH = SRH(material=self._cal_dts['material'], defect=defect)
+
+    def _build_Mobility(self):
+        self.Mobility = Mobility(material=self._cal_dts['material'],
+                                 author=self._cal_dts['mob_author'])
+
+    def tau(self, **kwargs):
+        '''
+        Returns the effective lifetime
+        '''
+        return self.breakdown(**kwargs)['effective']
+
+    def itau(self, **kwargs):
+        '''
+        Returns the inverse of the effective lifetime
+        '''
+        return 1. / self.tau(**kwargs)
+
+    def breakdown(self, **kwargs):
+        '''
+        Returns the lifetime of each recombination mechanism, and the
+        effective lifetime.
+
+        inputs:
+            kwargs: (optional)
+                any of the calculation details
+
+        output: (dict)
+            radiative, auger, intrinsic, SRH, surface and effective
+            lifetimes in s. A mechanism that is not included has an
+            infinite lifetime.
+        '''
+        if bool(kwargs):
+            self.calculationdetails = kwargs
+        self._update_links()
+
+        nxc = self._cal_dts['nxc']
+        itau = {}
+
+        # the SRH recombination, which also provides the intrinsic and
+        # effective intrinsic carrier densities
+        details = {i: self._cal_dts[i] for i in (
+            'temp', 'Na', 'Nd', 'nxc', 'Nt', 'ni_author', 'vth_author',
+            'BGN_author')}
+        defect = self._cal_dts['defect']
+        if isinstance(defect, (list, tuple)):
+            itau['SRH'] = self.SRH.tau_all(defect, **details)[2]
+        else:
+            itau['SRH'] = self.SRH.itau(**details)
+
+        ni, nieff = self.SRH.ni, self.SRH.nieff
+
+        # the intrinsic recombination, from the shared dark carriers
+        details = {i: self._cal_dts[i] for i in ('temp', 'ni_author',
+                                                  'Na', 'Nd')}
+        self.Radiative.calculationdetails = details
+        self.Auger.calculationdetails = details
+
+        ne0, nh0 = get_carriers(Na=self._cal_dts['Na'],
+                                Nd=self._cal_dts['Nd'],
+                                nxc=0,
+                                temp=self._cal_dts['temp'],
+                                material=self._cal_dts['material'],
+                                ni=ni)
+
+        itau['radiative'] = 1. / self.Radiative.tau_from_carriers(
+            nxc, ne0, nh0)
+        itau['auger'] = 1. / self.Auger.tau_from_carriers(nxc, ne0, nh0)
+        itau['intrinsic'] = itau['radiative'] + itau['auger']
+
+        itau['surface'] = self._itau_surface(nieff)
+
+        itau['effective'] = itau['intrinsic'] + itau['SRH'] + \
+            itau['surface']
+
+        # every term has the shape of the effective lifetime, even where
+        # there is no surface recombination or the inputs were scalar
+        shape = np.shape(itau['effective'])
+        itau = {i: np.broadcast_to(j, shape) for i, j in itau.items()}
+
+        with np.errstate(divide='ignore'):
+            return {i: 1. / j for i, j in itau.items()}
+
+    def _itau_surface(self, nieff):
+        '''
+        returns the inverse lifetime of the surface recombination
+        '''
+        S, J0 = self._cal_dts['S'], self._cal_dts['J0']
+        W = self._cal_dts['W']
+        nxc = self._cal_dts['nxc']
+
+        itau = np.zeros(np.shape(nxc))
+        if S is None and J0 is None:
+            return itau
+
+        ne, nh = get_carriers(Na=self._cal_dts['Na'],
+                              Nd=self._cal_dts['Nd'],
+                              nxc=nxc,
+                              temp=self._cal_dts['temp'],
+                              material=self._cal_dts['material'],
+                              ni=nieff)
+
+        if S is not None:
+            mob_ambi = self.Mobility.both(
+                ne=ne, nh=nh,
+                Na=self._cal_dts['Na'],
+                Nd=self._cal_dts['Nd'],
+                nxc=nxc,
+                temp=self._cal_dts['temp'])[3]
+
+            S_f, S_b = self._surfaces(S)
+            if mob_ambi is None:
+                print('Warning: the mobility model does not provide the '
+                      'ambipolar mobility, so the diffusion of carriers '
+                      'to the surfaces is neglected')
+                itau = itau + (S_f + S_b) / W
+            else:
+                D = mob_ambi * const.k * self._cal_dts['temp'] / const.e
+                itau = itau + self._itau_diffusion(S_f, S_b, W, D)
+
+        if J0 is not None:
+            J0_f, J0_b = self._surfaces(J0)
+            itau = itau + (J0_f + J0_b) * (ne * nh - nieff**2) / (
+                const.e * nieff**2 * W * nxc)
+
+        return itau
+
+    @staticmethod
+    def _surfaces(value):
+        '''
+        returns the values of the front and back surfaces, from a (front,
+        back) tuple or list, or a value used for both
+        '''
+        if isinstance(value, (list, tuple)):
+            if len(value) != 2:
+                raise ValueError(
+                    'A list or tuple of surface values must be (front, '
+                    'back), not {0} values'.format(len(value)))
+            return (np.asarray(value[0], dtype=float),
+                    np.asarray(value[1], dtype=float))
+
+        value = np.asarray(value, dtype=float)
+        return value, value
+
+    @staticmethod
+    def _itau_diffusion(S_f, S_b, W, D, tol=1e-10, max_iter=50):
+        '''
+        returns the inverse lifetime of carriers diffusing to the front
+        and back surfaces, with the shape of the broadcast inputs.
+
+        The root of tan(x) = x (a_f + a_b) / (x^2 - a_f a_b) in (0, pi] is
+        the root of
+
+            x - arctan(a_f / x) - arctan(a_b / x)
+
+        which increases with x and is concave, so Newton's method
+        converges to it from below without overshooting. It is started
+        from the approximate lifetime
+
+            W / (S_f + S_b) + (1 + 3 r^2) W^2 / (pi^2 D)
+
+        where r = (S_f - S_b) / (S_f + S_b), which is close for equal
+        surfaces, r = 0, and a single recombining surface, r = 1.
+        '''
+        S_f, S_b, D = np.broadcast_arrays(S_f, S_b, D)
+        shape = D.shape
+        D = D.reshape(-1)
+
+        a_f, a_b = (S_f.reshape(-1) * W / D), (S_b.reshape(-1) * W / D)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            r = np.where(np.isinf(a_f + a_b), np.isinf(a_f) != np.isinf(a_b),
+                         (a_f - a_b) / (a_f + a_b))
+            x = np.pi / np.sqrt(np.pi**2 / (a_f + a_b) + 1. + 3. * r**2)
+
+        # the elements that have not converged, where a surface recombines
+        recombines = a_f + a_b > 0
+        x[~recombines] = 0.
+        index = np.flatnonzero(recombines)
+        _x, _a_f, _a_b = x[index], a_f[index], a_b[index]
+
+        iterations = 0
+        while index.size > 0 and iterations < max_iter:
+            iterations += 1
+
+            with np.errstate(divide='ignore'):
+                step = (_x - np.arctan2(_a_f, _x) - np.arctan2(_a_b, _x)) / (
+                    1. + 1. / (_x**2 / _a_f + _a_f) +
+                    1. / (_x**2 / _a_b + _a_b))
+
+            # a start above the root is kept positive
+            _x = np.maximum(_x - step, _x / 2.)
+            x[index] = _x
+
+            converged = np.abs(step) <= tol * _x
+            if np.any(converged):
+                keep = ~converged
+                index, _x = index[keep], _x[keep]
+                _a_f, _a_b = _a_f[keep], _a_b[keep]
+
+        return (x**2 * D / W**2).reshape(shape)
@@ -3,9 +3,9 @@ import numpy as np
 import sys
 import os
 import scipy.constants as const
-import matplotlib.pylab as plt
 
-from semiconductor.helper.helper import BaseModelClass, class_or_value
+from semiconductor.helper.helper import (
+    BaseModelClass, class_or_value, ParameterRecord, _token, memoize)
 from semiconductor.general_functions.carrierfunctions import get_carriers
 from semiconductor.material.intrinsic_carrier_density import IntrinsicCarrierDensity as ni
 from semiconductor.material.thermal_velocity import ThermalVelocity as Vel_th
@@ -68,6 +68,16 @@ class SRH(BaseModelClass):
 
     author_list = 'SRH.yaml'
 
+    # the linked models and values, and the calculation details they
+    # depend on
+    _link_graph = (
+        ('ni', ('material', 'temp', 'ni_author')),
+        ('vth', ('material', 'temp', 'vth_author')),
+        ('BGN', ('material', 'BGN_author')),
+        ('nieff', ('temp', 'BGN', 'Na', 'Nd', 'ni')),
+        ('taus', ('Nt', 'author', 'vth')),
+    )
+
     def __init__(self, **kwargs):
         # update any values in cal_dts
         # that are passed
@@ -81,43 +91,76 @@ class SRH(BaseModelClass):
 
         # get the models ready
         self._int_model(author_file)
+
+        # the intrinsic carrier density and thermal velocities for each
+        # temperature and author
+        self._ni_cache = {}
+        self._vth_cache = {}
+
         # initiate the a defect
         self._change_model(self._cal_dts['defect'])
-        self._update_links()
-        self._cal_taun_taup()
-
-    def _update_links(self):
 
+    def _linked_value(self, cache, author, clas):
+        '''
+        returns the value of a linked model and its author, or the provided
+        value. These are only calculated once for each material,
+        temperature and author.
+        '''
+        key = (self._cal_dts['material'], _token(author),
+               _token(self._cal_dts['temp']))
+        if key not in cache:
+            cache[key] = class_or_value(
+                author, clas, 'update',
+                material=self._cal_dts['material'],
+                temp=self._cal_dts['temp'])
+        return cache[key]
+
+    def _build_ni(self):
         # update the links if provided. Else continue with the
         # provided or calculated number
-        self.ni, self._cal_dts['ni_author'] = class_or_value(
-            self._cal_dts['ni_author'],
-            ni,
-            'update',
-            material=self._cal_dts['material'],
-            temp=self._cal_dts['temp'])
-
-        vels, self._cal_dts['vth_author'] = class_or_value(
-            self._cal_dts['vth_author'],
-            Vel_th,
-            'update',
-            material=self._cal_dts['material'],
-            temp=self._cal_dts['temp'])
+        self.ni, self._cal_dts['ni_author'] = self._linked_value(
+            self._ni_cache, self._cal_dts['ni_author'], ni)
+        return self.ni
 
-        self.vel_th_e, self.vel_th_h = vels
+    def _build_vth(self):
+        vels, self._cal_dts['vth_author'] = self._linked_value(
+            self._vth_cache, self._cal_dts['vth_author'], Vel_th)
 
-        nieff_mult, self._cal_dts['BGN_author'] = class_or_value(
-            self._cal_dts['BGN_author'],
-            BandGapNarrowing,
-            'ni_multiplier',
-            material=self._cal_dts['material'],
-            temp=self._cal_dts['temp'],
-            nxc=[0],
-            Na=self._cal_dts['Na'],
-            Nd=self._cal_dts['Nd'],)
+        self.vel_th_e, self.vel_th_h = vels
+        return vels
+
+    def _build_BGN(self):
+        # the model is kept, so only the multiplier is calculated when the
+        # doping changes
+        author = self._cal_dts['BGN_author']
+        if isinstance(author, str) or author is None:
+            self.BGN = BandGapNarrowing(material=self._cal_dts['material'],
+                                        author=author)
+            self._cal_dts['BGN_author'] = self.BGN.calculationdetails[
+                'author']
+        else:
+            self.BGN = None
+
+    def _build_nieff(self):
+        if self.BGN is None:
+            # a provided multiplier
+            nieff_mult = class_or_value(
+                self._cal_dts['BGN_author'], BandGapNarrowing,
+                'ni_multiplier')[0]
+        else:
+            nieff_mult = self.BGN.ni_multiplier(
+                temp=self._cal_dts['temp'],
+                nxc=[0],
+                Na=self._cal_dts['Na'],
+                Nd=self._cal_dts['Nd'])
 
         self.nieff = self.ni * nieff_mult
 
+    def _build_taus(self):
+        # user defined lifetimes do not have capture cross sections
+        if self.vals['sigma_e'] is not None:
+            self._cal_taun_taup()
+
     def _cal_taun_taup(self):
         '''
         Determines the SRH lifetime values
@@ -142,6 +185,10 @@ class SRH(BaseModelClass):
         if 'vth_author' in self.vals.keys():
             self._cal_dts['vth_author'] = self.vals['vth_author']
 
+        # the values are reloaded, so the lifetimes must be recalculated
+        # even if the defect is unchanged
+        self._invalidate_link('taus')
+
         # get the values from the model
         self._update_links()
 
@@ -156,17 +203,19 @@ class SRH(BaseModelClass):
 
         if 'defect' in kwargs:
             self._change_model(self._cal_dts['defect'])
-            self._cal_taun_taup()
 
-        # if change in a model update the values
-        if 'author' in ''.join(kwargs.keys()):
-            self._update_links()
-            self._cal_taun_taup()
+        # rebuild the links whose calculation details have changed
+        self._update_links()
 
-        if 'Na' in ''.join(kwargs.keys()) or 'Nd'in ''.join(kwargs.keys()):
-            self._update_links()
-            self._cal_taun_taup()
+        return self._lifetime()
 
+    @memoize()
+    def _lifetime(self):
+        '''
+        the lifetime of the current defect. When the cache is enabled,
+        this is only calculated once for the defect's values and the
+        calculation details.
+        '''
         return self._tau(self._cal_dts['nxc'],
                          self.vals['tau_e'],
                          self.vals['tau_h'],
@@ -175,6 +224,237 @@ class SRH(BaseModelClass):
     def itau(self, **kwargs):
         return 1. / self.tau(**kwargs)
 
+    def tau_all(self, defects=None, **kwargs):
+        '''
+        reports the lifetime of several defects for the same excess
+        carrier densities, and their combined lifetime.
+
+        The values of the defects are stacked into arrays, so each group
+        of defects that use the same thermal velocity is calculated at
+        once. The intrinsic carrier densities and carriers are shared by
+        all defects. A defect that does not provide a thermal velocity
+        author uses the current one, as in tau.
+
+        inputs:
+            defects: (list, optional)
+                the defects to evaluate, defaults to all available
+                defects
+            Nt: (float or array like, optional)
+                the number of each defect. An array provides a value for
+                each defect
+            **kwargs:
+                any of the other calculation details
+
+        output:
+            defects: (list)
+                the defects, in the order of the lifetimes
+            tau: (array)
+                the lifetime of each defect, with the defects along the
+                first axis and the shape of the excess carriers after it
+            itau: (array)
+                the sum of the inverse lifetimes of the defects
+        '''
+        defects = list(defects or self.available_models())
+
+        Nt = kwargs.pop('Nt', self._cal_dts['Nt'])
+        Nt = np.broadcast_to(np.asarray(Nt, dtype=float), (len(defects),))
+
+        if bool(kwargs):
+            self.calculationdetails = kwargs
+
+        # the shared values
+        self._update_links()
+
+        groups = {}
+        for n, defect in enumerate(defects):
+            groups.setdefault(
+                self.Models[defect].get(
+                    'vth_author', self._cal_dts['vth_author']), []).append(n)
+
+        ndim = max(1, np.ndim(self._cal_dts['nxc']),
+                   np.ndim(self._cal_dts['Na']), np.ndim(self._cal_dts['Nd']),
+                   np.ndim(self.nieff))
+        tau = [None] * len(defects)
+
+        for vth_author, index in groups.items():
+            if vth_author == self._cal_dts['vth_author']:
+                vel_th_e, vel_th_h = self.vel_th_e, self.vel_th_h
+            else:
+                vel_th_e, vel_th_h = self._linked_value(
+                    self._vth_cache, vth_author, Vel_th)[0]
+
+            # the values of the defects, along an axis before the carriers
+            def stack(key):
+                return np.array([self.Models[defects[i]][key]
+                                 for i in index], dtype=float).reshape(
+                                     (-1,) + (1,) * ndim)
+
+            N = Nt[index].reshape((-1,) + (1,) * ndim)
+            values = self._tau(self._cal_dts['nxc'],
+                               1. / N / stack('sigma_e') / vel_th_e,
+                               1. / N / stack('sigma_h') / vel_th_h,
+                               stack('et'))
+
+            for n, i in enumerate(index):
+                tau[i] = values[n]
+
+        tau = np.stack(tau)
+
+        return defects, tau, np.sum(1. / tau, axis=0)
+
+    def tau_map(self, Na=None, Nd=None, nxc=None, **kwargs):
+        '''
+        reports the lifetime of the current defect for each doping and
+        excess carrier density.
+
+        The dopings are placed along the first axis and the excess carrier
+        densities along the second, so the map is calculated at once, and
+        only the band gap narrowing is recalculated for the dopings. The
+        doping and excess carrier densities are only used for the map, and
+        are restored afterwards.
+
+        inputs:
+            Na: (array like cm^-3, optional)
+                The acceptor density of each doping
+            Nd: (array like cm^-3, optional)
+                The donor density of each doping. Na and Nd are broadcast
+                together, and default to the current values.
+            nxc: (array like cm^-3, optional)
+                The excess carrier densities
+            **kwargs:
+                any of the other calculation details
+
+        output:
+            tau: (array)
+                the lifetime, with the shape (dopings, nxc)
+        '''
+        Na, Nd = np.broadcast_arrays(
+            np.atleast_1d(self._cal_dts['Na'] if Na is None else Na),
+            np.atleast_1d(self._cal_dts['Nd'] if Nd is None else Nd))
+        nxc = self._cal_dts['nxc'] if nxc is None else nxc
+
+        previous = {i: self._cal_dts[i] for i in ('Na', 'Nd', 'nxc')}
+        try:
+            return self.tau(Na=Na.reshape(-1, 1), Nd=Nd.reshape(-1, 1),
+                            nxc=np.reshape(nxc, (1, -1)), **kwargs)
+        finally:
+            self.calculationdetails = previous
+            self._update_links()
+
+    def tau_levels(self, levels, **kwargs):
+        '''
+        reports the lifetime of a defect with several levels, such as
+        Au_d and Au_a, for the given excess carrier density.
+
+        The occupation of the charge states of the defect, and the
+        recombination through each level, are calculated together with the
+        Sah-Shockley model. For a single level this is the same as tau.
+
+        inputs:
+            levels: (list)
+                the defects that are the levels of the defect, in the order
+                electrons are captured. That is, starting with the level
+                between the most positive charge state and the next, which
+                is normally the lowest level, e.g. ['Au_d', 'Au_a'].
+            **kwargs:
+                any of the calculation details. Nt is the number of the
+                defect, shared by the levels.
+
+        output:
+            tau: (array)
+                the lifetime, with the broadcast shape of nxc, Na and Nd
+        '''
+        U, occupation = self._sah_shockley(levels, kwargs)
+        return self._cal_dts['nxc'] / U
+
+    def occupation(self, levels, **kwargs):
+        '''
+        reports the fraction of a defect with several levels in each
+        charge state, for the given excess carrier density.
+
+        inputs:
+            as for tau_levels
+
+        output:
+            fractions: (array)
+                the fraction of the defect in each charge state, along the
+                first axis, starting with the most positive charge state.
+                There is one more state than levels.
+        '''
+        U, occupation = self._sah_shockley(levels, kwargs)
+        return occupation
+
+    def _sah_shockley(self, levels, kwargs):
+        '''
+        returns the recombination rate through a defect with several
+        levels, and the fraction of the defect in each charge state.
+
+        In steady state the net capture of electrons and holes through
+        each level is equal, so the ratio of the neighbouring states k + 1
+        and k is
+
+            N_k+1 / N_k = (c_e^k ne + c_h^k nh1^k) / (c_h^k nh + c_e^k ne1^k)
+
+        where c are the capture coefficients, sigma vth. The recombination
+        through level k is
+
+            U_k = N_k c_e^k c_h^k (ne nh - nieff^2) / (c_h^k nh + c_e^k ne1^k)
+
+        and the total recombination is the sum over the levels.
+        '''
+        if bool(kwargs):
+            self.calculationdetails = kwargs
+
+        # the shared values
+        self._update_links()
+
+        ne, nh = get_carriers(Na=self._cal_dts['Na'],
+                              Nd=self._cal_dts['Nd'],
+                              nxc=self._cal_dts['nxc'],
+                              temp=self._cal_dts['temp'],
+                              material=self._cal_dts['material'],
+                              ni=self.nieff
+                              )
+
+        # the values of the levels, along an axis before the carriers
+        ndim = max(ne.ndim, np.ndim(self.nieff))
+        shape = (-1,) + (1,) * ndim
+
+        models = [self.Models[i] for i in levels]
+        vels = [self._linked_value(
+            self._vth_cache,
+            i.get('vth_author', self._cal_dts['vth_author']), Vel_th)[0]
+            for i in models]
+
+        def stack(values):
+            return np.array(values, dtype=float).reshape(shape)
+
+        c_e = stack([i['sigma_e'] for i in models]) * \
+            stack([i[0] for i in vels])
+        c_h = stack([i['sigma_h'] for i in models]) * \
+            stack([i[1] for i in vels])
+        Et = stack([i['et'] for i in models])
+
+        # the escape from the levels
+        nh1 = self.nieff * \
+            np.exp(-Et * const.e / (const.k * self._cal_dts['temp']))
+        ne1 = self.nieff * \
+            np.exp(Et * const.e / (const.k * self._cal_dts['temp']))
+
+        # the logarithm of the population of each state relative to the
+        # first, which are normalised after removing the largest so the
+        # products of the ratios can not overflow
+        ratio = np.log(c_e * ne + c_h * nh1) - np.log(c_h * nh + c_e * ne1)
+        population = np.concatenate(
+            [np.zeros((1,) + ratio.shape[1:]), np.cumsum(ratio, axis=0)])
+        population = np.exp(population - np.max(population, axis=0))
+        occupation = population / np.sum(population, axis=0)
+
+        U = self._cal_dts['Nt'] * (ne * nh - self.nieff**2) * np.sum(
+            occupation[:-1] * c_e * c_h / (c_h * nh + c_e * ne1), axis=0)
+
+        return U, occupation
+
     def _tau(self, nxc, tau_e, tau_h, Et):
         """
         The Shockley Read Hall lifetime for a defect level
@@ -217,7 +497,7 @@ class SRH(BaseModelClass):
         '''
         temp = self.vals
         # assign the new values
-        self.vals = {
+        self.vals = ParameterRecord.compile({
             'et': Et or temp['et'],
             'sigma_e': sigma_e or temp['sigma_e'],
             'sigma_h': sigma_h or temp['sigma_h'],
@@ -225,7 +505,7 @@ class SRH(BaseModelClass):
             'notes': 'User defined value',
             'tau_e': np.array([tau_e]) or temp['tau_e'],
             'tau_h': np.array([tau_h]) or temp['tau_h'],
-        }
+        })
 
         # the or above doens't work for zeros
         if Et == 0:
@@ -247,7 +527,11 @@ class SRH(BaseModelClass):
                  }
             )
 
+        # the values have changed, so remove any cached results
+        self.invalidate_cache()
+
     def _plot_all(self):
+        import matplotlib.pylab as plt
         fig, ax = plt.subplots(1, 2, figsize=(16, 6))
         # ax = plt.add_subplot(111)
         counter = 0
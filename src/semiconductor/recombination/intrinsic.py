@@ -1,6 +1,5 @@
 
 import numpy as np
-import matplotlib.pylab as plt
 import os
 import configparser
 
@@ -43,6 +42,13 @@ class Intrinsic(BaseModelClass):
         'Nd': 1e16,
     }
 
+    # the linked models, and the calculation details they depend on. The
+    # other details are passed when the lifetimes are calculated.
+    _link_graph = (
+        ('Radiative', ('material', 'rad_author')),
+        ('Auger', ('material', 'aug_author')),
+    )
+
     def __init__(self, **kwargs):
         # update any values in cal_dts
         # that are passed
@@ -50,8 +56,7 @@ class Intrinsic(BaseModelClass):
         # pass values to models
         self._update_links()
 
-    def _update_links(self):
-
+    def _build_Radiative(self):
         self.Radiative = Radiative(
             material=self._cal_dts['material'],
             author=self._cal_dts['rad_author'],
@@ -61,6 +66,7 @@ class Intrinsic(BaseModelClass):
             Nd=self._cal_dts['Nd'],
         )
 
+    def _build_Auger(self):
         self.Auger = Auger(
             material=self._cal_dts['material'],
             author=self._cal_dts['aug_author'],
@@ -81,11 +87,24 @@ class Intrinsic(BaseModelClass):
         Returns the inverse of the intrinsic carrier lifetime
         '''
         self.calculationdetails = kwargs
-        if 'author' in ''.join(kwargs.keys()):
-            self._update_links()
+        self._update_links()
+
+        details = {i: self._cal_dts[i] for i in ('temp', 'ni_author',
+                                                  'Na', 'Nd')}
+        self.Radiative.calculationdetails = details
+        self.Auger.calculationdetails = details
+
+        # the dark carriers are shared by both mechanisms
+        ne0, nh0 = get_carriers(
+            Na=self._cal_dts['Na'],
+            Nd=self._cal_dts['Nd'],
+            nxc=0,
+            ni_author=self._cal_dts['ni_author'],
+            temp=self._cal_dts['temp']
+        )
 
-        itau = self.Radiative.itau(nxc, **kwargs) +\
-            self.Auger.itau(nxc, **kwargs)
+        itau = 1. / self.Radiative.tau_from_carriers(nxc, ne0, nh0) +\
+            1. / self.Auger.tau_from_carriers(nxc, ne0, nh0)
 
         return itau
 
@@ -123,7 +142,9 @@ class Radiative(BaseModelClass):
 
     def tau(self, nxc, **kwargs):
         self.calculationdetails = kwargs
-        self.change_model(self._cal_dts['author'])
+
+        if 'author' in kwargs.keys():
+            self.change_model(self._cal_dts['author'])
 
         ne0, nh0 = get_carriers(
             Na=self._cal_dts['Na'],
@@ -133,6 +154,12 @@ class Radiative(BaseModelClass):
             temp=self._cal_dts['temp']
         )
 
+        return self.tau_from_carriers(nxc, ne0, nh0)
+
+    def tau_from_carriers(self, nxc, ne0, nh0):
+        '''
+        returns the lifetime for the provided dark carrier densities
+        '''
         Blow = self._get_Blow()
 
         return getattr(radmdls, self.model)(
@@ -224,6 +251,12 @@ class Auger(BaseModelClass):
             temp=self._cal_dts['temp']
         )
 
+        return self.tau_from_carriers(nxc, ne0, nh0)
+
+    def tau_from_carriers(self, nxc, ne0, nh0):
+        '''
+        returns the lifetime for the provided dark carrier densities
+        '''
         return getattr(augmdls, self.model)(
             self.vals, nxc, ne0, nh0, temp=self._cal_dts['temp'])
 
@@ -231,6 +264,7 @@ class Auger(BaseModelClass):
         return 1. / self.tau(nxc, **kwargs)
 
     def check(self, author, fig=None, ax=None):
+        import matplotlib.pylab as plt
         if ax is None:
             fig, ax = plt.subplots(1)
         self.change_model(author, self.Models)
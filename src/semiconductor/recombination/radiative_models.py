@@ -6,7 +6,7 @@ def none(vals, nxc, **kwargs):
     '''
     Returns an infinite lifetime
     '''
-    return np.ones(nxc.shape[0]) * np.inf
+    return np.ones(np.shape(nxc)) * np.inf
 
 
 def Roosbroeck(vals, nxc, nh0, ne0, Blow, **kwargs):
@@ -16,14 +16,12 @@ def Roosbroeck(vals, nxc, nh0, ne0, Blow, **kwargs):
         proportional to the produce of the carrier, correct to the
         background conccentraion of carriers.
     '''
-    if np.all(nxc == 0):
-        nxc += 1
+    # avoid dividing zero by zero
+    nxc = np.where(nxc == 0, 1., nxc)
 
     nh = nh0 + nxc
     ne = ne0 + nxc
 
-    print(Blow, ne, nh, ne0, nh0)
-
     R = Blow * (ne * nh - ne0 * nh0)
     # print R
     return nxc / R
@@ -59,7 +57,7 @@ def Roosbroeck_with_screening(vals, nxc, nh0, ne0, Blow, temp):
     This is the roosbroeck model that accounts for many things
     It needs temperature, nxc, doping and blow to be defined
     """
-    B = Roosbroeck_with_screening_B(vals, nxc, np.amax([nh0, ne0]), temp, Blow)
+    B = Roosbroeck_with_screening_B(vals, nxc, np.maximum(nh0, ne0), temp, Blow)
     tau = Roosbroeck(vals, nxc, nh0, ne0, Blow=B)
     return tau
 